@@ -0,0 +1,127 @@
+import numpy as np
+from scipy.signal import correlate, correlation_lags
+
+from music.onset_detection import detect_onsets
+
+# samples averaged into one envelope value before correlating
+DEFAULT_DECIMATION = 32
+
+
+def attack_envelope(data, decimation=DEFAULT_DECIMATION):
+    """Decimated, rectified first difference of the amplitude envelope.
+
+    Averages ``|data|`` over blocks of ``decimation`` samples and keeps only
+    the rises, so clicks and plucks line up regardless of their level or decay.
+    """
+    data = np.abs(np.asarray(data, dtype=np.float32))
+    n_blocks = len(data) // decimation
+    envelope = data[:n_blocks * decimation].reshape((n_blocks, decimation)).mean(axis=1)
+    return np.maximum(np.diff(envelope, prepend=0), 0)
+
+
+def correlation_lag(reference, signal, max_lag=None, centre=0):
+    """Lag (in samples, with sub-sample refinement) that best aligns ``signal`` to ``reference``.
+
+    Uses an FFT cross-correlation. A positive lag means ``signal`` is late
+    relative to ``reference``. ``max_lag`` limits the search to
+    ``[centre - max_lag, centre + max_lag]``.
+    """
+    correlation = correlate(signal, reference, mode='full', method='fft')
+    lags = correlation_lags(len(signal), len(reference), mode='full')
+    if max_lag is not None:
+        keep = np.abs(lags - centre) <= max_lag
+        correlation, lags = correlation[keep], lags[keep]
+    best = int(np.argmax(correlation))
+    lag = float(lags[best])
+    # parabolic interpolation around the peak
+    if 0 < best < len(correlation) - 1:
+        left, centre, right = correlation[best - 1:best + 2]
+        curvature = left - 2 * centre + right
+        if curvature < 0:
+            lag += 0.5 * (left - right) / curvature
+    return lag
+
+
+def estimate_offset(reference, signal, sr, decimation=DEFAULT_DECIMATION, max_offset=None):
+    """Offset in seconds of ``signal`` relative to ``reference``, from their attack envelopes."""
+    env_sr = sr / decimation
+    max_lag = None if max_offset is None else int(np.ceil(max_offset * env_sr))
+    lag = correlation_lag(attack_envelope(reference, decimation), attack_envelope(signal, decimation), max_lag)
+    return lag / env_sr
+
+
+def estimate_alignment(reference, signal, sr, decimation=DEFAULT_DECIMATION, window_seconds=10.0,
+                       max_deviation=0.1):
+    """Estimate the offset and drift of ``signal`` relative to ``reference``.
+
+    The global offset comes from a cross-correlation of the whole attack
+    envelopes. Half-overlapping windows are then correlated within
+    ``max_deviation`` seconds of it, which should stay below half a beat so
+    that windows cannot lock onto a neighbouring click, and a straight line is
+    fitted through the local offsets. Returns ``(offset, drift)`` such that
+    time ``t`` in ``reference`` corresponds to ``t + offset + drift * t`` in
+    ``signal``.
+    """
+    env_sr = sr / decimation
+    reference_env = attack_envelope(reference, decimation)
+    signal_env = attack_envelope(signal, decimation)
+    offset = correlation_lag(reference_env, signal_env) / env_sr
+
+    window = int(window_seconds * env_sr)
+    search = int(np.ceil(max_deviation * env_sr))
+    shift = int(round(offset * env_sr))
+    centres, offsets = [], []
+    for start in range(0, len(reference_env) - window + 1, max(window // 2, 1)):
+        reference_window = reference_env[start:start + window]
+        signal_start = max(start + shift - search, 0)
+        signal_window = signal_env[signal_start:start + shift + window + search]
+        if not reference_window.any() or not signal_window.any():
+            continue
+        lag = correlation_lag(reference_window, signal_window, max_lag=search, centre=start + shift - signal_start)
+        centres.append((start + window / 2) / env_sr)
+        offsets.append((lag + signal_start - start) / env_sr)
+
+    if len(centres) < 2:
+        return offset, 0.0
+    drift, intercept = np.polyfit(centres, offsets, 1)
+    return intercept, drift
+
+
+def beat_grid_from_clicks(click_times, duration=None):
+    """Fit a regular beat grid to detected metronome clicks.
+
+    Each click is assigned a beat number from the median inter-click interval
+    and a line is fitted through (beat number, time), so missed or jittery
+    clicks do not distort the grid. The grid is extended to ``duration``
+    seconds when given.
+    """
+    click_times = np.sort(np.asarray(click_times, dtype=float))
+    if len(click_times) < 2:
+        raise ValueError("At least two metronome clicks are needed to build a beat grid")
+    period = np.median(np.diff(click_times))
+    beat_numbers = np.round((click_times - click_times[0]) / period)
+    period, start = np.polyfit(beat_numbers, click_times, 1)
+
+    first = -np.floor(start / period)
+    last = beat_numbers[-1] if duration is None else np.floor((duration - start) / period)
+    return start + period * np.arange(first, last + 1)
+
+
+def align_beat_grid(metronome, guitar, sr, decimation=DEFAULT_DECIMATION, align=False):
+    """Build the guitar track's beat grid from the metronome track.
+
+    Clicks are detected in the metronome and regularised with
+    ``beat_grid_from_clicks``. Both tracks are exported on the same session
+    timeline, so by default the grid is used as it is. With ``align`` it is
+    mapped into the guitar's timeline with the offset and drift from
+    ``estimate_alignment``, for tracks exported with different start times;
+    a correlation cannot tell that apart from a player who is steadily early
+    or late, so such timing is then shifted out of the errors. Returns
+    ``(beat_times, offset, drift)``, with no offset or drift unless aligned.
+    """
+    click_times = detect_onsets(metronome) / sr
+    offset, drift = estimate_alignment(metronome, guitar, sr, decimation) if align else (0.0, 0.0)
+    grid = beat_grid_from_clicks(click_times, duration=len(metronome) / sr)
+    beat_times = grid + offset + drift * grid
+    beat_times = beat_times[(beat_times >= 0) & (beat_times <= len(guitar) / sr)]
+    return beat_times, offset, drift
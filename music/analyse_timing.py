@@ -1,59 +1,314 @@
 import matplotlib.pyplot as plt
 import numpy as np
+import argparse
+import datetime
+import glob
 import os
+import subprocess
+import tempfile
+import wave
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pydub import AudioSegment
 
 import numpy as np
 import matplotlib.pyplot as plt
 from pydub import AudioSegment
+from pydub.utils import mediainfo
 from scipy.signal import find_peaks
 
-def load_audio(file_path):
-    """Load an audio file using PyDub and convert to numpy array."""
-    audio = AudioSegment.from_file(file_path)
-    data = np.array(audio.get_array_of_samples())
-    if audio.channels == 2:
-        data = data.reshape((-1, 2)).sum(axis=1)
-    return data, audio.frame_rate
+from music.alignment import align_beat_grid
+from music.audio_cache import DEFAULT_CACHE_DIR, AudioCache
+from music.onset_detection import (DEFAULT_FRAME_LENGTH, DEFAULT_HOP_LENGTH, novelty_curve, novelty_curve_from_blocks,
+                                   pick_onsets)
+from music.results_store import ResultsStore
+from music.sequencer import pcm_to_float
+from music.tempo import estimate_beat_times
+
+# samples per block when streaming audio from disk
+DEFAULT_BLOCK_SIZE = 1 << 16
+# block overlap of streamed analysis, one onset-detection frame, so that nothing at a block edge is missed
+DEFAULT_BLOCK_OVERLAP = DEFAULT_FRAME_LENGTH
+# characters of ffmpeg's error output quoted when a decode fails
+FFMPEG_ERROR_TAIL = 500
+AUDIO_EXTENSIONS = ('.flac', '.wav', '.m4a', '.mp3', '.ogg', '.aiff')
+
+def load_audio(file_path, cache=None):
+    """Load an audio file as a mono float32 numpy array.
+
+    Samples are scaled to [-1, 1] per channel and channels are summed, as in
+    ``load_audio_blocks``, whether or not a cache is used. With an
+    ``AudioCache`` the decoded PCM is kept on disk and a repeat load skips
+    decoding entirely.
+    """
+    pcm, sr = decode_pcm(file_path, cache)
+    return pcm.sum(axis=1, dtype=np.float32), sr
+
+def decode_pcm(file_path, cache=None):
+    """Return ``(pcm, sr)`` with ``pcm`` a (frames, channels) float32 array, decoding on a cache miss."""
+    if cache is not None:
+        key = cache.key_for(file_path)
+        cached = cache.open(key)
+        if cached is None:
+            sr, channels, frames = _open_decoder(file_path, DEFAULT_BLOCK_SIZE)
+            for _ in cache.store(key, frames, sr, channels):
+                pass
+            cached = cache.open(key)
+        if cached is not None:
+            return cached
+    # no cache, or the entry was larger than the whole cache
+    sr, channels, frames = _open_decoder(file_path, DEFAULT_BLOCK_SIZE)
+    chunks = list(frames)
+    return (np.concatenate(chunks) if chunks else np.empty((0, channels), dtype=np.float32)), sr
 
 def detect_peaks(data):
     """Detect peaks in the audio data."""
     peaks, _ = find_peaks(data, height=np.max(data)*0.5)  # Adjust height as needed
     return peaks
 
+def load_audio_blocks(file_path, block_size=DEFAULT_BLOCK_SIZE, overlap=DEFAULT_BLOCK_OVERLAP, cache=None):
+    """Stream an audio file as fixed-size mono float32 blocks.
+
+    Returns ``(blocks, sr)`` where ``blocks`` is a generator of
+    ``(start, block)`` pairs: ``start`` is the index of the block's first sample
+    and consecutive blocks share ``overlap`` samples. Samples are scaled to
+    [-1, 1] per channel and channels are summed, as in ``load_audio``. Only one
+    block (plus one decoder read) is held in memory at a time. With an
+    ``AudioCache``, cached takes are read from their memory map and uncached
+    ones are written to the cache as they stream.
+    """
+    if not 0 <= overlap < block_size:
+        raise ValueError(f"Overlap must be in [0, {block_size}): {overlap}")
+    if cache is not None:
+        key = cache.key_for(file_path)
+        cached = cache.open(key)
+        if cached is not None:
+            pcm, sr = cached
+            frames = (pcm[i:i + block_size] for i in range(0, len(pcm), block_size))
+        else:
+            sr, channels, frames = _open_decoder(file_path, block_size)
+            frames = cache.store(key, frames, sr, channels)
+    else:
+        sr, _, frames = _open_decoder(file_path, block_size)
+    chunks = (frame.sum(axis=1, dtype=np.float32) for frame in frames)
+    return _fixed_blocks(chunks, block_size, overlap), sr
+
+def _open_decoder(file_path, frames_per_read):
+    """Return ``(sr, channels, frames)`` where ``frames`` yields (n, channels) float32 chunks.
+
+    Integer PCM WAVs are read with the standard library; anything it does
+    not support, such as 32-bit float or WAVE_FORMAT_EXTENSIBLE exports, is
+    decoded by ffmpeg like the other formats.
+    """
+    if file_path.lower().endswith('.wav'):
+        try:
+            with wave.open(file_path, 'rb') as wav:
+                sr, channels = wav.getframerate(), wav.getnchannels()
+            return sr, channels, _read_wav_chunks(file_path, frames_per_read)
+        except wave.Error:
+            pass
+    info = mediainfo(file_path)
+    channels = int(info['channels'])
+    return int(info['sample_rate']), channels, _read_ffmpeg_chunks(file_path, channels, frames_per_read)
+
+def _read_wav_chunks(file_path, frames_per_read):
+    """Yield float32 chunks decoded with the standard library wave module."""
+    with wave.open(file_path, 'rb') as wav:
+        channels, width = wav.getnchannels(), wav.getsampwidth()
+        while True:
+            raw = wav.readframes(frames_per_read)
+            if not raw:
+                return
+            yield pcm_to_float(raw, width).reshape((-1, channels))
+
+def _read_ffmpeg_chunks(file_path, channels, frames_per_read):
+    """Yield float32 chunks piped from an ffmpeg decoder process.
+
+    Raises a ``ValueError`` with the end of ffmpeg's error output if it
+    fails, rather than ending the take early. That output goes to a
+    temporary file, as ffmpeg may write a line per bad frame of a corrupt
+    file and would block on a full pipe that is only read at the end.
+    """
+    command = [AudioSegment.converter, '-v', 'error', '-i', file_path,
+               '-f', 'f32le', '-acodec', 'pcm_f32le', 'pipe:1']
+    frame_bytes = 4 * channels
+    with tempfile.TemporaryFile() as stderr, \
+            subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr) as process:
+        try:
+            pending = b''
+            while True:
+                raw = process.stdout.read(frames_per_read * frame_bytes)
+                if not raw:
+                    break
+                raw = pending + raw
+                usable = len(raw) - len(raw) % frame_bytes
+                pending = raw[usable:]
+                yield np.frombuffer(raw[:usable], dtype='<f4').reshape((-1, channels))
+            if process.wait() != 0:
+                stderr.seek(0)
+                errors = stderr.read().decode(errors='replace').strip()
+                raise ValueError(f"ffmpeg failed to decode {file_path} (exit code {process.returncode}): "
+                                 f"{errors[-FFMPEG_ERROR_TAIL:]}")
+        finally:
+            process.kill()
+
+def _fixed_blocks(chunks, block_size, overlap):
+    """Regroup variable-length chunks into ``(start, block)`` pairs of ``block_size`` samples."""
+    step = block_size - overlap
+    buffer = np.empty(0, dtype=np.float32)
+    start = 0
+    for chunk in chunks:
+        buffer = np.concatenate((buffer, chunk.astype(np.float32, copy=False)))
+        while len(buffer) >= block_size:
+            yield start, buffer[:block_size]
+            buffer = buffer[step:]
+            start += step
+    # the final partial block, unless it is entirely covered by the previous one
+    if len(buffer) > (overlap if start else 0):
+        yield start, buffer
+
+def _with_last(iterable):
+    """Yield ``(item, is_last)`` pairs by looking one item ahead."""
+    iterator = iter(iterable)
+    try:
+        previous = next(iterator)
+    except StopIteration:
+        return
+    for item in iterator:
+        yield previous, False
+        previous = item
+    yield previous, True
+
+def detect_peaks_in_blocks(blocks, overlap=DEFAULT_BLOCK_OVERLAP, height=None, relative_height=0.5):
+    """Detect peaks over streamed ``(start, block)`` pairs from ``load_audio_blocks``.
+
+    ``height`` is an absolute threshold; when omitted each block uses
+    ``relative_height`` times its own maximum, so one loud section does not
+    mask the rest of the take. Each block only reports peaks in the part of
+    the overlap it owns, so peaks near block edges are neither lost nor
+    duplicated; ``overlap`` must be the one the blocks were loaded with.
+    Returns absolute sample indices.
+    """
+    found = []
+    owned_from = 0
+    for (start, block), is_last in _with_last(blocks):
+        owned_to = start + len(block) if is_last else start + len(block) - overlap // 2
+        threshold = height if height is not None else np.max(block) * relative_height
+        peaks, _ = find_peaks(block, height=threshold)
+        peaks = peaks + start
+        found.append(peaks[(peaks >= owned_from) & (peaks < owned_to)])
+        owned_from = owned_to
+    return np.concatenate(found) if found else np.empty(0, dtype=np.intp)
+
 def calculate_beat_times(duration, bpm=100):
     """Calculate the times for each beat based on BPM."""
     beat_time = 60 / bpm
     return np.arange(0, duration, beat_time)
 
-def find_closest_peaks(peaks, beat_times, sr):
+def match_beats_to_onsets(onset_times, beat_times, max_distance=None):
+    """Match every beat to its nearest onset in a single vectorized pass.
+
+    Uses a sorted search over the onset times instead of scanning all onsets
+    for every beat. Returns ``(matched_times, indices, errors)`` where
+    ``errors`` is the signed difference ``matched - beat``. When
+    ``max_distance`` (seconds) is given, beats with no onset inside that window
+    get ``NaN`` for their time and error and ``-1`` for their index.
+    """
+    onset_times = np.asarray(onset_times, dtype=float)
+    beat_times = np.asarray(beat_times, dtype=float)
+
+    if onset_times.size == 0:
+        nans = np.full(beat_times.shape, np.nan)
+        return nans, np.full(beat_times.shape, -1, dtype=np.intp), nans.copy()
+
+    order = None
+    if np.any(np.diff(onset_times) < 0):
+        order = np.argsort(onset_times, kind='stable')
+        onset_times = onset_times[order]
+
+    # candidates either side of each beat's insertion point
+    right = np.searchsorted(onset_times, beat_times)
+    left = np.clip(right - 1, 0, onset_times.size - 1)
+    right = np.clip(right, 0, onset_times.size - 1)
+    # ties go to the earlier onset, as argmin over the onsets would
+    use_right = np.abs(onset_times[right] - beat_times) < np.abs(beat_times - onset_times[left])
+    indices = np.where(use_right, right, left)
+
+    matched = onset_times[indices]
+    errors = matched - beat_times
+    if order is not None:
+        indices = order[indices]
+
+    if max_distance is not None:
+        missing = np.abs(errors) > max_distance
+        matched[missing] = np.nan
+        errors[missing] = np.nan
+        indices[missing] = -1
+
+    return matched, indices, errors
+
+def find_closest_peaks(peaks, beat_times, sr, max_distance=None):
     """Find the closest peak to each beat."""
-    peak_times = peaks / sr
-    closest_peaks = []
-    for beat in beat_times:
-        idx = (np.abs(peak_times - beat)).argmin()
-        closest_peaks.append(peak_times[idx])
+    closest_peaks, _, _ = match_beats_to_onsets(np.asarray(peaks) / sr, beat_times, max_distance)
     return closest_peaks
 
-def plot_waveform_with_peaks(data, sr, peaks, beat_times, closest_peaks):
-    """Plot the waveform, peaks, and closest peaks to beats."""
-    plt.figure(figsize=(14, 5))
-    times = np.arange(0, len(data)) / sr
-    plt.plot(times, data, label='Waveform')
+def minmax_envelope(data, n_columns, start=0, stop=None):
+    """Reduce ``data[start:stop]`` to ``n_columns`` (min, max) pairs in one vectorized pass.
+
+    Returns ``(edges, mins, maxs)`` where column ``i`` covers samples
+    ``edges[i]:edges[i + 1]``. Windows shorter than ``n_columns`` samples get
+    one column per sample.
+    """
+    stop = len(data) if stop is None else min(stop, len(data))
+    start = max(start, 0)
+    if stop <= start:
+        raise ValueError(f"Empty plot window: samples {start} to {stop}")
+    n_columns = min(n_columns, stop - start)
+    edges = np.linspace(start, stop, n_columns + 1).astype(np.intp)
+    window = np.asarray(data[start:stop])
+    mins = np.minimum.reduceat(window, edges[:-1] - start)
+    maxs = np.maximum.reduceat(window, edges[:-1] - start)
+    return edges, mins, maxs
+
+def plot_waveform_with_peaks(data, sr, peaks, beat_times, closest_peaks, width=1400, zoom=None,
+                             file_name='waveform.png'):
+    """Plot the waveform, peaks, and closest peaks to beats.
+
+    The waveform is drawn as a min/max envelope with one column per pixel of
+    ``width``, so the cost depends on the image size rather than the length of
+    the take. ``zoom`` is an optional ``(start, end)`` window in seconds.
+    """
+    start, stop = (0, len(data)) if zoom is None else (int(zoom[0] * sr), int(np.ceil(zoom[1] * sr)))
+    edges, mins, maxs = minmax_envelope(data, width, start, stop)
+    t0, t1 = edges[0] / sr, edges[-1] / sr
+
+    peaks = np.asarray(peaks)
+    peaks = peaks[(peaks >= edges[0]) & (peaks < edges[-1])]
+    beat_times = np.asarray(beat_times)
+    beat_times = beat_times[(beat_times >= t0) & (beat_times <= t1)]
+    closest_peaks = np.asarray(closest_peaks, dtype=float)
+    closest_peaks = closest_peaks[(closest_peaks >= t0) & (closest_peaks <= t1)]
+
+    plt.figure(figsize=(width / 100, 5), dpi=100)
+    plt.fill_between(edges[:-1] / sr, mins, maxs, step='post', linewidth=0, label='Waveform')
     plt.plot(peaks/sr, data[peaks], "x", label='Peaks')
-    for beat in beat_times:
-        plt.axvline(x=beat, color='blue', linestyle='--', linewidth=0.5)
-    for peak in closest_peaks:
-        plt.axvline(x=peak, color='red', linestyle='-', linewidth=2)
+    plt.vlines(beat_times, 0, 1, transform=plt.gca().get_xaxis_transform(), color='blue', linestyle='--',
+               linewidth=0.5)
+    plt.vlines(closest_peaks, 0, 1, transform=plt.gca().get_xaxis_transform(), color='red', linestyle='-',
+               linewidth=2)
+    plt.xlim(t0, t1)
     plt.title('Waveform with Beats and Closest Peaks')
     plt.xlabel('Time (s)')
     plt.ylabel('Amplitude')
     plt.legend()
-    plt.savefig('waveform.png')
+    plt.savefig(file_name)
+    plt.close()
 
 def analyze_timing_errors(beat_times, closest_peaks):
     """Analyze timing errors and provide statistics."""
-    data = closest_peaks - beat_times
+    data = np.asarray(closest_peaks) - beat_times
+    # beats with no onset inside the matching window are NaN
+    matched = ~np.isnan(data)
+    beat_times, data = np.asarray(beat_times)[matched], data[matched]
 
     # Scatter plot of individual errors
     fig, ax = plt.subplots()
@@ -66,30 +321,193 @@ def analyze_timing_errors(beat_times, closest_peaks):
     ax.set_title('Timing Errors Scatter Plot')
     ax.legend()
 
-    mean_error = np.mean(data)
-    std_deviation = np.std(data)
-
-    data_before = data[data < 0]
-    data_after = data[data >= 0]
-    mean_data_before = np.mean(data_before) if data_before.size > 0 else 0
-    mean_data_after = np.mean(data_after) if data_after.size > 0 else 0
-    std_before = np.std(data_before)
-    std_after = np.std(data_after)
+    stats = timing_error_stats(data)
 
     plt.savefig("barchaart.png")
-    return data, mean_error, std_deviation, mean_data_before, mean_data_after
+    return data, stats['mean_error'], stats['std_deviation'], stats['mean_error_before'], stats['mean_error_after']
+
+def timing_error_stats(errors):
+    """Summary statistics of signed timing errors, ignoring unmatched (NaN) beats."""
+    errors = np.asarray(errors, dtype=float)
+    errors = errors[~np.isnan(errors)]
+    before = errors[errors < 0]
+    after = errors[errors >= 0]
+    return {
+        'beats': errors.size,
+        'mean_error': np.mean(errors) if errors.size > 0 else 0.0,
+        'std_deviation': np.std(errors) if errors.size > 0 else 0.0,
+        'mean_error_before': np.mean(before) if before.size > 0 else 0.0,
+        'mean_error_after': np.mean(after) if after.size > 0 else 0.0,
+        'std_before': np.std(before) if before.size > 0 else 0.0,
+        'std_after': np.std(after) if after.size > 0 else 0.0,
+    }
+
+def analyse_file(file_path, bpm=None, max_distance=None, cache=None, tempo_map=False):
+    """Run the load -> onset detection -> error statistics pipeline on one take.
+
+    Audio is streamed block by block so that many files can be analysed side
+    by side without holding whole recordings in memory. Returns the
+    ``timing_error_stats`` of the take plus its path, duration, onset count
+    and per-beat expected times, matched onsets and errors. An ``AudioCache`` skips decoding on repeat runs.
+    Without a ``bpm`` the tempo (or, with ``tempo_map``, a piecewise tempo
+    map) is estimated from the take itself; the grid is then fitted to the
+    take's own onsets and ``relative`` is set in the result, as its mean
+    errors cannot show steady rushing or dragging.
+    """
+    blocks, sr = load_audio_blocks(file_path, overlap=DEFAULT_BLOCK_OVERLAP, cache=cache)
+    n_samples = 0
+
+    def counted(blocks):
+        nonlocal n_samples
+        for start, block in blocks:
+            n_samples = start + len(block)
+            yield start, block
+
+    novelty = novelty_curve_from_blocks(counted(blocks), overlap=DEFAULT_BLOCK_OVERLAP)
+    onsets = pick_onsets(novelty) * DEFAULT_HOP_LENGTH
+    duration = n_samples / sr
+    relative = bpm is None
+    if relative:
+        beat_times, bpm = estimate_beat_times(novelty, sr / DEFAULT_HOP_LENGTH, duration, tempo_map)
+    else:
+        beat_times = calculate_beat_times(duration, bpm=bpm)
+    matched, _, errors = match_beats_to_onsets(onsets / sr, beat_times, max_distance)
+
+    result = {'file': file_path, 'duration': duration, 'bpm': bpm, 'onsets': len(onsets),
+              'beat_times': beat_times, 'matched': matched, 'errors': errors, 'relative': relative}
+    result.update(timing_error_stats(errors))
+    return result
+
+def store_result(store, result):
+    """Append an ``analyse_file`` result to a ``ResultsStore``, replacing an earlier analysis of the take.
+
+    The take is identified by the content hash of its file, as in
+    ``AudioCache``, so takes with the same name in different folders are
+    kept apart and only a re-analysis of the same recording replaces one.
+    It is dated by the file's modification time.
+    """
+    take_id = AudioCache.key_for(result['file'])
+    recorded = datetime.datetime.fromtimestamp(os.path.getmtime(result['file']))
+    stats = {key: result[key] for key in timing_error_stats([])}
+    store.append(take_id, result['beat_times'], result['matched'], recorded, result['bpm'], stats, replace=True,
+                 file=os.path.abspath(result['file']))
+
+def find_audio_files(pattern):
+    """Expand a directory or glob pattern into a sorted list of audio files."""
+    if os.path.isdir(pattern):
+        return sorted(os.path.join(pattern, name) for name in os.listdir(pattern)
+                      if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS)
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+def analyse_batch(file_paths, bpm=None, max_distance=None, max_workers=None, cache=None, tempo_map=False):
+    """Analyse many takes over a process pool, yielding each result as soon as it finishes.
+
+    ``max_workers`` defaults to the number of CPUs. A take that fails to
+    analyse yields ``{'file': path, 'error': message}`` instead of stopping
+    the batch.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(analyse_file, path, bpm, max_distance, cache, tempo_map): path for path in file_paths}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield {'file': futures[future], 'error': str(e)}
+
+def summary_table(results):
+    """Format per-take results and a pooled summary row as a plain-text table.
+
+    Takes measured against an estimated grid are marked ``*``.
+    """
+    columns = ['bpm', 'beats', 'mean_error', 'std_deviation', 'mean_error_before', 'mean_error_after']
+    rows, failures = [], []
+    for result in sorted(results, key=lambda result: result['file']):
+        name = os.path.basename(result['file']) + (' *' if result.get('relative') else '')
+        if 'error' in result:
+            failures.append(f"{name}: failed: {result['error']}")
+        else:
+            rows.append([name] + [_format_stat(result[column]) for column in columns])
+
+    pooled = [result['errors'] for result in results if 'error' not in result]
+    if pooled:
+        stats = timing_error_stats(np.concatenate(pooled))
+        rows.append([f"ALL ({len(pooled)} takes)"] + [_format_stat(stats.get(column, '-')) for column in columns])
+
+    header = ['file'] + columns
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    lines = ['  '.join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in [header] + rows]
+    if any(result.get('relative') for result in results):
+        lines.append("* errors relative to a beat grid fitted to the take; pass --bpm for absolute errors")
+    return '\n'.join(lines + failures)
+
+def _format_stat(value):
+    return str(value) if isinstance(value, (str, int, np.integer)) else f"{value:.4f}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse the timing of recorded takes against a beat grid.")
+    parser.add_argument('paths', nargs='*', help="audio files, directories or glob patterns to analyse in parallel")
+    parser.add_argument('--bpm', type=float, default=None, help="fixed tempo (default: estimated from each take)")
+    parser.add_argument('--tempo-map', action='store_true',
+                        help="follow tempo changes within a take when estimating the tempo")
+    parser.add_argument('--max-distance', type=float, default=None,
+                        help="ignore beats with no onset within this many seconds")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: number of CPUs)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help="where decoded audio is cached")
+    parser.add_argument('--no-cache', action='store_true', help="always decode audio from scratch")
+    parser.add_argument('--results', default=None, metavar='DIR',
+                        help="append per-beat results to the results store in DIR")
+    parser.add_argument('--align-metronome', action='store_true',
+                        help="shift the metronome's beat grid onto the guitar track by cross-correlation, for "
+                             "tracks exported with different start times (this also removes steady rushing or "
+                             "dragging)")
+    args = parser.parse_args(argv)
+    cache = None if args.no_cache else AudioCache(args.cache_dir)
+
+    if args.paths:
+        file_paths = [path for pattern in args.paths for path in find_audio_files(pattern)]
+        store = None if args.results is None else ResultsStore(args.results)
+        results = []
+        try:
+            for result in analyse_batch(file_paths, args.bpm, args.max_distance, args.workers, cache,
+                                        args.tempo_map):
+                if 'error' in result:
+                    print(f"{result['file']}: failed: {result['error']}")
+                else:
+                    relative = ' (relative to the estimated grid)' if result['relative'] else ''
+                    print(f"{result['file']}: {result['beats']} beats, "
+                          f"mean error {result['mean_error']:+.4f}s{relative}")
+                    if store is not None:
+                        store_result(store, result)
+                results.append(result)
+        finally:
+            if store is not None:
+                store.close()
+        print(summary_table(results))
+        return
 
-def main():
     # Update these paths to where you saved your exported audio files
     this_dir = os.path.dirname(os.path.abspath(__file__))
     metronome_file_path = os.path.join(this_dir, "TimingExercise Metronome.flac")
     guitar_file_path = os.path.join(this_dir, "TimingExercise Guitar.flac")
 
-    data, sr = load_audio(guitar_file_path)
-    peaks = detect_peaks(data)
+    data, sr = load_audio(guitar_file_path, cache)
+    novelty = novelty_curve(data)
+    peaks = pick_onsets(novelty) * DEFAULT_HOP_LENGTH
     duration = len(data) / sr
-    beat_times = calculate_beat_times(duration, bpm=100)
-    closest_peaks = find_closest_peaks(peaks, beat_times, sr)
+    if os.path.exists(metronome_file_path):
+        # take the beat grid from the metronome's clicks, on the session timeline unless asked to align it
+        metronome, metronome_sr = load_audio(metronome_file_path, cache)
+        if metronome_sr != sr:
+            raise ValueError(f"Sample rates differ: metronome {metronome_sr} Hz, guitar {sr} Hz")
+        beat_times, offset, drift = align_beat_grid(metronome, data, sr, align=args.align_metronome)
+        if args.align_metronome:
+            print(f"Aligned metronome by offset {offset:+.4f}s, drift {drift * 1e6:+.1f} ppm")
+    elif args.bpm is None:
+        beat_times, bpm = estimate_beat_times(novelty, sr / DEFAULT_HOP_LENGTH, duration, args.tempo_map)
+        print(f"Estimated tempo {bpm:.1f} bpm; errors are relative to the estimated grid")
+    else:
+        beat_times = calculate_beat_times(duration, bpm=args.bpm)
+    closest_peaks = find_closest_peaks(peaks, beat_times, sr, args.max_distance)
 
     errors, mean_error, std_deviation, mean_error_before, mean_error_after = analyze_timing_errors(beat_times, closest_peaks)
 
@@ -0,0 +1,194 @@
+import json
+import os
+import re
+import wave
+from collections import namedtuple
+from collections.abc import Mapping
+from functools import lru_cache
+
+from music.chord_progression import ChordProgression
+from music.sample_bank import MUSIC_DIR
+from music.scale import all_scales
+
+AUDIO_DIR = os.path.join(MUSIC_DIR, 'audio')
+# written next to the assets; rebuilt for any file whose size or mtime changed
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+ACCIDENTALS = {'Sharp': '#', 'Flat': 'b', '': ''}
+CHORD_QUALITIES = {'major': 'Major', 'minor': 'Minor', 'dim': 'Dim'}
+
+# C.wav, CSharp.wav, BFlat.wav and the short form Gb.wav
+NOTE_PATTERN = re.compile(r'([A-G])(Sharp|Flat|#|b)?\.wav')
+# CMajor.m4a.wav, FSharpMinor.m4a.wav, Gdim.m4a.wav
+CHORD_PATTERN = re.compile(r'([A-G])(Sharp|Flat)?(Major|Minor|Dim)\.m4a\.wav', re.IGNORECASE)
+# 3.wav, Flat3.wav, Sharp10.wav
+INTERVAL_PATTERN = re.compile(r'(Sharp|Flat)?(\d+)\.wav')
+# High3.wav, Low3Flat.wav: a degree an octave above or below
+OCTAVE_INTERVAL_PATTERN = re.compile(r'(High|Low)(\d+)(Sharp|Flat)?\.wav')
+
+
+class Asset(namedtuple('Asset', ['kind', 'root', 'quality', 'octave', 'path', 'sample_rate', 'channels',
+                                 'sample_width', 'frames'])):
+    """One audio file of the sample library.
+
+    ``kind`` is ``'note'``, ``'chord'`` or ``'interval'``. ``root`` is the
+    note name (``'C#'``) of notes and chords, or the interval name (``'b3'``)
+    of intervals. ``quality`` is ``'Major'``, ``'Minor'`` or ``'Dim'`` for
+    chords and ``None`` otherwise. ``octave`` is ``+1``/``-1`` for the high and
+    low intervals. ``path`` is relative to the package directory, as the
+    ``SampleBank`` expects, followed by the WAV header fields.
+    """
+    __slots__ = ()
+
+    @property
+    def key(self):
+        return asset_key(self.kind, self.root, self.quality, self.octave)
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate
+
+
+def _accidental(name):
+    return ACCIDENTALS.get(name or '', name or '')
+
+
+def parse_asset_name(file_name):
+    """Parse a file name of ``audio/`` into ``(kind, root, quality, octave)``, or ``None`` if unrecognised."""
+    if match := NOTE_PATTERN.fullmatch(file_name):
+        return 'note', match[1] + _accidental(match[2]), None, 0
+    if match := CHORD_PATTERN.fullmatch(file_name):
+        return 'chord', match[1].upper() + _accidental(match[2]), CHORD_QUALITIES[match[3].lower()], 0
+    if match := INTERVAL_PATTERN.fullmatch(file_name):
+        return 'interval', _accidental(match[1]) + match[2], None, 0
+    if match := OCTAVE_INTERVAL_PATTERN.fullmatch(file_name):
+        return 'interval', _accidental(match[3]) + match[2], None, 1 if match[1] == 'High' else -1
+    return None
+
+
+def asset_key(kind, root, quality=None, octave=0):
+    """The sample key the generators use: ``'C#'``, ``'CSharpMajor'``, ``'b3'``, or ``'b3@+1'`` an octave up."""
+    if kind == 'chord':
+        return ChordProgression.note_mapping.get(root, root) + quality
+    if octave:
+        return f'{root}@{octave:+d}'
+    return root
+
+
+def _read_header(path):
+    with wave.open(path, 'rb') as wav:
+        return wav.getframerate(), wav.getnchannels(), wav.getsampwidth(), wav.getnframes()
+
+
+class AssetIndex(Mapping):
+    """Every recognised file of ``audio/``, as a read-only mapping from sample key to ``Asset``.
+
+    Built by ``scan``. Files whose names cannot be parsed or that are not
+    readable WAV files are listed in ``unrecognised`` with the reason.
+    """
+
+    def __init__(self, assets, unrecognised=None):
+        self._assets = {asset.key: asset for asset in assets}
+        self.unrecognised = dict(unrecognised or {})
+
+    @classmethod
+    def scan(cls, audio_dir=AUDIO_DIR, manifest=True):
+        """Index ``audio_dir``, reusing the entries of its manifest for unchanged files.
+
+        With ``manifest`` set the index is written back to
+        ``audio_dir/manifest.json``; a directory that cannot be written to
+        is simply scanned again next time.
+        """
+        manifest_path = os.path.join(audio_dir, MANIFEST_NAME)
+        previous = cls._read_manifest(manifest_path) if manifest else {}
+        relative_dir = os.path.relpath(audio_dir, MUSIC_DIR).replace(os.sep, '/')
+
+        files, assets, unrecognised = {}, [], {}
+        for entry in sorted(os.scandir(audio_dir), key=lambda entry: entry.name):
+            if not entry.is_file() or entry.name == MANIFEST_NAME or not entry.name.endswith('.wav'):
+                continue
+            stat = entry.stat()
+            record = previous.get(entry.name)
+            if record is None or record['size'] != stat.st_size or record['mtime_ns'] != stat.st_mtime_ns:
+                record = cls._describe(entry.path)
+                record.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            files[entry.name] = record
+            if 'error' in record:
+                unrecognised[entry.name] = record['error']
+            else:
+                assets.append(Asset(*record['name'], f'{relative_dir}/{entry.name}', *record['header']))
+
+        if manifest and files != previous:
+            try:
+                with open(manifest_path, 'w') as f:
+                    json.dump({'version': MANIFEST_VERSION, 'files': files}, f, indent=1)
+            except OSError:
+                pass
+        return cls(assets, unrecognised)
+
+    @staticmethod
+    def _read_manifest(path):
+        try:
+            with open(path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return manifest.get('files', {}) if manifest.get('version') == MANIFEST_VERSION else {}
+
+    @staticmethod
+    def _describe(path):
+        name = parse_asset_name(os.path.basename(path))
+        if name is None:
+            return {'error': "file name not recognised"}
+        try:
+            return {'name': list(name), 'header': list(_read_header(path))}
+        except (OSError, EOFError, wave.Error) as e:
+            return {'error': f"not a readable WAV file: {e}"}
+
+    def __getitem__(self, key):
+        return self._assets[key]
+
+    def __iter__(self):
+        return iter(self._assets)
+
+    def __len__(self):
+        return len(self._assets)
+
+    def files(self, *kinds, octave=None):
+        """A ``{key: path}`` table of the assets of ``kinds`` (all by default) for a ``SampleBank``.
+
+        ``octave`` restricts intervals to one octave, e.g. ``0`` for the
+        plain interval names produced by ``Scale.get_intervals``.
+        """
+        return {key: asset.path for key, asset in self._assets.items()
+                if (not kinds or asset.kind in kinds) and (octave is None or asset.octave == octave)}
+
+    def missing_for_scale(self, scale, kinds=('note', 'chord', 'interval')):
+        """Keys of the notes, chords and intervals ``scale`` can produce that have no asset."""
+        keys = []
+        if 'note' in kinds:
+            keys += scale.build_scale()
+        if 'interval' in kinds:
+            keys += scale.get_intervals()
+        if 'chord' in kinds:
+            # only the qualities that are recorded; the rest are synthesized
+            keys += [chord for chord in ChordProgression(scale).scale_chords()
+                     if chord.endswith(tuple(CHORD_QUALITIES.values()))]
+        return sorted({key for key in keys if key not in self._assets})
+
+    def validate(self, scales=None, kinds=('note', 'chord', 'interval')):
+        """Raise a ``ValueError`` naming every key that ``scales`` (default: ``all_scales()``) need but lack."""
+        missing = {}
+        for scale in all_scales() if scales is None else scales:
+            for key in self.missing_for_scale(scale, kinds):
+                missing.setdefault(key, str(scale).split(':')[0])
+        if missing:
+            details = ', '.join(f"{key} ({scale})" for key, scale in sorted(missing.items()))
+            raise ValueError(f"No audio asset for: {details}")
+
+
+@lru_cache(maxsize=None)
+def asset_index(audio_dir=AUDIO_DIR):
+    """The ``AssetIndex`` of ``audio_dir``, scanned once per process."""
+    return AssetIndex.scan(audio_dir)
@@ -0,0 +1,112 @@
+import asyncio
+
+from music.sequencer import DEFAULT_BLOCK_SECONDS, to_pcm16
+
+# mixed blocks allowed to wait for playback before mixing pauses
+DEFAULT_QUEUE_BLOCKS = 2
+# how often the end of the last block is polled for
+POLL_SECONDS = 0.01
+
+
+class PlaybackSession:
+    """Plays one stream of ``(time, key)`` events on the running asyncio event loop.
+
+    A producer mixes blocks with the ``Sequencer`` into a bounded queue and a
+    consumer hands them to ``play_buffer`` (e.g. ``simpleaudio.play_buffer``)
+    on an absolute clock, so neither side blocks the loop and mixing never
+    gets more than ``queue_blocks`` ahead of the audio. Several sessions can
+    run side by side in one process. ``start()`` returns the session's task,
+    which can be cancelled; ``pause()`` stops the current block and
+    ``resume()`` carries on with the next one. A ``TimingRecorder`` passed
+    as ``recorder`` gets the scheduled and actual start of every event. An
+    error raised by the events or while mixing ends the session and is
+    raised by its task once the blocks before it have played.
+    """
+
+    def __init__(self, sequencer, events, play_buffer, block_size=None, queue_blocks=DEFAULT_QUEUE_BLOCKS,
+                 latency=0.1, recorder=None):
+        self.sequencer = sequencer
+        self.events = events if recorder is None else recorder.track(events)
+        self.recorder = recorder
+        self.play_buffer = play_buffer
+        self.block_size = block_size or int(DEFAULT_BLOCK_SECONDS * sequencer.sample_rate)
+        self.queue_blocks = queue_blocks
+        self.latency = latency
+        self.task = None
+        self._running = asyncio.Event()
+        self._running.set()
+        self._paused_at = None
+        self._start = None
+        self._play_obj = None
+
+    def start(self):
+        """Schedule the session on the running loop and return its task."""
+        self.task = asyncio.get_running_loop().create_task(self.run())
+        return self.task
+
+    def cancel(self):
+        if self.task is not None:
+            self.task.cancel()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def pause(self):
+        if not self.paused:
+            self._paused_at = asyncio.get_running_loop().time()
+            self._running.clear()
+            self._stop_audio()
+
+    def resume(self):
+        if self.paused:
+            # shift the clock so that the next block starts straight away
+            if self._start is not None:
+                self._start += asyncio.get_running_loop().time() - self._paused_at
+            self._running.set()
+
+    def _stop_audio(self):
+        if self._play_obj is not None:
+            self._play_obj.stop()
+
+    async def run(self):
+        queue = asyncio.Queue(maxsize=self.queue_blocks)
+        producer = asyncio.create_task(self._produce(queue))
+        try:
+            await self._consume(queue)
+            await producer
+        finally:
+            producer.cancel()
+            self._stop_audio()
+
+    async def _produce(self, queue):
+        try:
+            for block in self.sequencer.stream(self.events, self.block_size):
+                # waits while the queue is full, which is what holds mixing back
+                await queue.put(block)
+        except Exception as e:
+            # the consumer raises it; otherwise it would wait for the end of the stream forever
+            await queue.put(e)
+            return
+        await queue.put(None)
+
+    async def _consume(self, queue):
+        loop = asyncio.get_running_loop()
+        block_seconds = self.block_size / self.sequencer.sample_rate
+        self._start = loop.time() + self.latency
+        k = 0
+        while (block := await queue.get()) is not None:
+            if isinstance(block, Exception):
+                raise block
+            await self._running.wait()
+            delay = self._start + k * block_seconds - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._running.wait()
+            self._play_obj = self.play_buffer(to_pcm16(block), 1, 2, self.sequencer.sample_rate)
+            if self.recorder is not None:
+                self.recorder.block_started(self._start + k * block_seconds, loop.time(), k * self.block_size,
+                                            (k + 1) * self.block_size, self.sequencer.sample_rate)
+            k += 1
+        while self._play_obj is not None and self._play_obj.is_playing():
+            await asyncio.sleep(POLL_SECONDS)
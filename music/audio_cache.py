@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.environ.get('MUSIC_AUDIO_CACHE',
+                                   os.path.join(os.path.expanduser('~'), '.cache', 'musicFaffing', 'audio'))
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+# bytes read at a time when hashing source files
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class AudioCache:
+    """On-disk cache of decoded PCM keyed by the content hash of the source file.
+
+    Each entry is a raw little-endian float32 file of shape (frames, channels),
+    opened with ``np.memmap``, next to a JSON file holding its sample rate,
+    channel count and frame count. Entries are evicted least recently used
+    first once the cache grows beyond ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(file_path):
+        """Hash the contents of ``file_path``, so renamed or copied takes share an entry."""
+        digest = hashlib.blake2b(digest_size=20)
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.f32', base + '.json'
+
+    def open(self, key):
+        """Return ``(pcm, sample_rate)`` for a cached entry, or ``None`` on a miss.
+
+        ``pcm`` is a read-only memory map, so nothing is read until it is used.
+        """
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            shape = (meta['frames'], meta['channels'])
+            pcm = np.memmap(data_path, dtype='<f4', mode='r', shape=shape) if meta['frames'] else \
+                np.empty(shape, dtype='<f4')
+        except (OSError, ValueError, KeyError):
+            return None
+        # the data file's mtime records when the entry was last used
+        os.utime(data_path)
+        return pcm, meta['sample_rate']
+
+    def store(self, key, chunks, sample_rate, channels):
+        """Write ``(frames, channels)`` float32 chunks to the cache while passing them through.
+
+        A generator: the entry is only published once ``chunks`` is exhausted,
+        so an interrupted decode never leaves a truncated entry behind.
+        """
+        data_path, meta_path = self._paths(key)
+        handle, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        frames = 0
+        try:
+            with os.fdopen(handle, 'wb') as f:
+                for chunk in chunks:
+                    chunk = np.asarray(chunk, dtype='<f4').reshape((-1, channels))
+                    f.write(chunk.tobytes())
+                    frames += len(chunk)
+                    yield chunk
+            os.replace(tmp_path, data_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        meta = {'sample_rate': sample_rate, 'channels': channels, 'frames': frames}
+        handle, tmp_meta_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(handle, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta_path, meta_path)
+        self.evict()
+
+    def size(self):
+        """Total bytes of cached PCM."""
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.f32'):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((name[:-4], stat.st_size, stat.st_mtime))
+        return entries
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in ``max_bytes``."""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            self.remove(key)
+            total -= size
+
+    def remove(self, key):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        for key, _, _ in self._entries():
+            self.remove(key)
@@ -0,0 +1,99 @@
+import time
+import wave
+
+
+class FinishedPlayback:
+    """Play object of a block that has already been handled in full."""
+
+    def is_playing(self):
+        return False
+
+    def wait_done(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class SimpleaudioBackend:
+    """Plays blocks on the default audio device. ``simpleaudio`` is imported on first use."""
+
+    # the OS mixes overlapping play_buffer calls, so each event can be played as its own buffer
+    mixes_streams = True
+
+    def __init__(self):
+        self._play_buffer = None
+
+    def __call__(self, audio_data, num_channels, bytes_per_sample, sample_rate):
+        if self._play_buffer is None:
+            import simpleaudio
+            self._play_buffer = simpleaudio.play_buffer
+        return self._play_buffer(audio_data, num_channels, bytes_per_sample, sample_rate)
+
+
+class WavFileBackend:
+    """Writes every block to one WAV file instead of playing it.
+
+    The format is taken from the first block. Call ``close()`` (or use the
+    backend as a context manager) to finish the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._wav = None
+
+    def __call__(self, audio_data, num_channels, bytes_per_sample, sample_rate):
+        if self._wav is None:
+            self._wav = wave.open(self.path, 'wb')
+            self._wav.setnchannels(num_channels)
+            self._wav.setsampwidth(bytes_per_sample)
+            self._wav.setframerate(sample_rate)
+        self._wav.writeframes(audio_data)
+        return FinishedPlayback()
+
+    def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class NullBackend:
+    """Discards the audio and records ``(time.monotonic(), frames)`` for every block in ``timings``."""
+
+    def __init__(self):
+        self.timings = []
+
+    def __call__(self, audio_data, num_channels, bytes_per_sample, sample_rate):
+        self.timings.append((time.monotonic(), len(audio_data) // (num_channels * bytes_per_sample)))
+        return FinishedPlayback()
+
+
+BACKENDS = {
+    'simpleaudio': SimpleaudioBackend,
+    'wav': WavFileBackend,
+    'null': NullBackend,
+}
+
+
+def get_backend(backend='simpleaudio', **kwargs):
+    """Resolve ``backend`` to a callable with the signature of ``simpleaudio.play_buffer``.
+
+    ``backend`` is the name of one of ``BACKENDS`` (constructed with
+    ``kwargs``, e.g. ``get_backend('wav', path='out.wav')``) or an object that
+    is already such a callable, which is returned unchanged. Raises a
+    ``ValueError`` if the backend is unknown or ``kwargs`` do not fit it.
+    """
+    if callable(backend):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown audio backend: {backend}; expected one of {', '.join(BACKENDS)}")
+    try:
+        return BACKENDS[backend](**kwargs)
+    except TypeError as e:
+        raise ValueError(f"Audio backend {backend!r} cannot be created with {kwargs}: {e}") from None
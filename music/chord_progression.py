@@ -1,4 +1,87 @@
-from music.scale import MajorScale, MinorScale
+from collections import namedtuple
+from functools import lru_cache
+
+from music.scale import Scale
+
+# semitones above the root, in root position
+CHORD_INTERVALS = {
+    'Major': (0, 4, 7),
+    'Minor': (0, 3, 7),
+    'Dim': (0, 3, 6),
+    'Aug': (0, 4, 8),
+    'Sus2': (0, 2, 7),
+    'Sus4': (0, 5, 7),
+    'Major7': (0, 4, 7, 11),
+    'Minor7': (0, 3, 7, 10),
+    'Dominant7': (0, 4, 7, 10),
+    'HalfDim7': (0, 3, 6, 10),
+    'Dim7': (0, 3, 6, 9),
+    'MinorMajor7': (0, 3, 7, 11),
+    'AugMajor7': (0, 4, 8, 11),
+}
+QUALITY_OF_INTERVALS = {intervals: quality for quality, intervals in CHORD_INTERVALS.items()}
+
+# qualities with a minor third get a lower case numeral
+MINOR_QUALITIES = {'Minor', 'Dim', 'Minor7', 'HalfDim7', 'Dim7', 'MinorMajor7'}
+NUMERAL_SUFFIXES = {'Dim': '°', 'Aug': '+', 'Major7': 'maj7', 'Minor7': '7', 'Dominant7': '7', 'HalfDim7': 'ø7',
+                    'Dim7': '°7', 'MinorMajor7': 'maj7', 'AugMajor7': '+maj7'}
+
+# the triad and seventh chord built on one scale degree; either is None if thirds cannot be stacked there
+DiatonicChord = namedtuple('DiatonicChord', ['root', 'numeral', 'triad', 'seventh'])
+
+
+def _stack_thirds(scale_degrees, i, n_notes):
+    """Semitones above degree ``i`` of ``n_notes`` notes stacked in thirds from it, or ``None``.
+
+    The next note is the one two degrees up, as in a seven-note scale, if
+    it is a minor or major third higher; otherwise any note of the scale a
+    minor or major third higher. If there is neither there is no chord.
+    """
+    pitch_classes = set(scale_degrees)
+    root = scale_degrees[i]
+    chord = [0]
+    while len(chord) < n_notes:
+        i = (i + 2) % len(scale_degrees)
+        third = (scale_degrees[i] - root - chord[-1]) % 12
+        if third not in (3, 4):
+            third = next((third for third in (3, 4) if (root + chord[-1] + third) % 12 in pitch_classes), None)
+            if third is None:
+                return None
+            i = scale_degrees.index((root + chord[-1] + third) % 12)
+        chord.append(chord[-1] + third)
+    return tuple(chord)
+
+
+def _numeral(scale_degrees, i):
+    """The Roman numeral of degree ``i``: its position in a seven-note scale, else its interval (``'bIII'``)."""
+    if len(scale_degrees) == 7:
+        return ChordProgression.roman_numerals[i]
+    interval = Scale.INTERVALS_FLAT[scale_degrees[i]]
+    return interval.rstrip('0123456789') + ChordProgression.roman_numerals[int(interval.lstrip('#b')) - 1]
+
+
+def roman_numeral(numeral, quality):
+    """``numeral`` written for a chord of ``quality``: lower case for a minor third, and a suffix such as ``°``."""
+    if quality in MINOR_QUALITIES:
+        numeral = numeral[:-len(numeral.lstrip('#b'))] + numeral.lstrip('#b').lower()
+    return numeral + NUMERAL_SUFFIXES.get(quality, '')
+
+
+@lru_cache(maxsize=None)
+def diatonic_chords(scale_degrees):
+    """The ``DiatonicChord`` on every degree of a scale given by its ``scale_degrees``.
+
+    Depends only on the kind of scale, not its root, so it is worked out
+    once per kind and shared by every progression. ``root`` is semitones
+    above the scale's root.
+    """
+    chords = []
+    for i, root in enumerate(scale_degrees):
+        numeral = _numeral(scale_degrees, i)
+        triad = QUALITY_OF_INTERVALS.get(_stack_thirds(scale_degrees, i, 3))
+        seventh = QUALITY_OF_INTERVALS.get(_stack_thirds(scale_degrees, i, 4)) if triad else None
+        chords.append(DiatonicChord(root, numeral, triad, seventh))
+    return tuple(chords)
 
 
 class ChordProgression:
@@ -12,36 +95,40 @@ class ChordProgression:
     }
 
     def __init__(self, scale):
-        self.scale = scale.build_scale()
+        self.scale = scale.scale_notes
         self.progression = []
+        # Chords built by stacking thirds on the scale, shared by every scale of the same kind
+        self.chords = diatonic_chords(scale.scale_degrees)
+        self.chord_qualities = [chord.triad for chord in self.chords]
 
-        # Adjust chord qualities based on the scale type
-        if isinstance(scale, MajorScale):
-            self.chord_qualities = ['M', 'm', 'm', 'M', 'M', 'm', 'd']
-        elif isinstance(scale, MinorScale):
-            self.chord_qualities = ['m', 'd', 'M', 'm', 'm', 'M', 'M']
-
-    def add_chord(self, scale_degree):
+    def chord(self, scale_degree, seventh=False):
+        """The (roman numeral, chord) built on a scale degree, a triad or with ``seventh`` a seventh chord."""
         if 1 <= scale_degree <= len(self.scale):
-            chord_root = self.scale[scale_degree - 1]
-            chord_quality = self.chord_qualities[scale_degree - 1]
+            diatonic = self.chords[scale_degree - 1]
+            chord_quality = diatonic.seventh if seventh else diatonic.triad
+            if chord_quality is None:
+                kind = 'seventh chord' if seventh else 'triad'
+                raise ValueError(f"No {kind} of stacked thirds on scale degree {scale_degree}")
 
             # Standardize chord root name
+            chord_root = self.scale[scale_degree - 1]
             chord_root = self.note_mapping.get(chord_root, chord_root)
 
-            roman_numeral = self.roman_numerals[scale_degree - 1]
-            if chord_quality == 'm':
-                roman_numeral = roman_numeral.lower()
-                chord = chord_root + 'Minor'
-            elif chord_quality == 'd':
-                chord = chord_root + 'Dim'
-            else:
-                chord = chord_root + 'Major'
-
-            self.progression.append((roman_numeral, chord))
+            return roman_numeral(diatonic.numeral, chord_quality), chord_root + chord_quality
         else:
             raise ValueError(f"Scale degree out of range: {scale_degree}")
 
+    def add_chord(self, scale_degree, seventh=False):
+        self.progression.append(self.chord(scale_degree, seventh))
+
+    def chord_degrees(self, seventh=False):
+        """The scale degrees (from 1) that have a triad, or with ``seventh`` a seventh chord."""
+        return [i + 1 for i, chord in enumerate(self.chords) if (chord.seventh if seventh else chord.triad)]
+
+    def scale_chords(self, seventh=False):
+        """The chord on every degree of the scale that has one, without adding them to the progression."""
+        return [self.chord(scale_degree, seventh)[1] for scale_degree in self.chord_degrees(seventh)]
+
     def get_progression(self):
         return ' - '.join([f"{func} ({chord})" for func, chord in self.progression])
 
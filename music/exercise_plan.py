@@ -0,0 +1,65 @@
+import numpy as np
+
+from music.sequencer import beat_events
+
+
+class ExercisePlan:
+    """A finite exercise worked out ahead of time, one entry per beat at ``bpm``.
+
+    ``labels`` are what the player is asked to play (notes, chords or
+    intervals, ``None`` for a rest) and ``keys`` the sample played on each
+    beat (``None`` when silent). Iterating a plan gives the ``(time, key)``
+    events consumed by the ``Sequencer``, so the same plan can be played,
+    rendered offline and used to grade a recording.
+    """
+
+    def __init__(self, labels, keys, bpm, start=0.0):
+        if len(labels) != len(keys):
+            raise ValueError(f"Labels and keys differ in length: {len(labels)} != {len(keys)}")
+        self.labels = tuple(labels)
+        self.keys = tuple(keys)
+        self.bpm = bpm
+        self.start = start
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __iter__(self):
+        return beat_events(self.keys, self.bpm, self.start)
+
+    def __repr__(self):
+        return f"ExercisePlan({len(self)} beats at {self.bpm} bpm)"
+
+    @property
+    def duration(self):
+        """Seconds from the start of the stream to the end of the last beat, silent or not."""
+        return self.start + len(self) * 60 / self.bpm
+
+    @property
+    def beat_times(self):
+        """Start time in seconds of every beat, silent or not."""
+        return self.start + np.arange(len(self)) * 60 / self.bpm
+
+    def expected_times(self):
+        """Times of the beats that sound, e.g. the ``expected`` column of a ``ResultsStore`` take."""
+        return self.beat_times[[key is not None for key in self.keys]]
+
+
+def random_choices(options, n, rng):
+    """``n`` independent uniform picks from ``options`` drawn in one call to ``rng``."""
+    if not len(options):
+        raise ValueError("Cannot choose from an empty sequence")
+    return [options[i] for i in rng.integers(len(options), size=n)]
+
+
+def random_sequences(options, lower_bound, upper_bound, n, rng):
+    """``n`` sequences of ``lower_bound..upper_bound`` distinct items of ``options``, in random order.
+
+    All lengths and orders are drawn up front: each sequence is the start of
+    one row of an ``argsort`` of uniform noise, i.e. a random permutation.
+    """
+    if not 0 <= lower_bound <= upper_bound <= len(options):
+        raise ValueError(f"Sequence length must be within 0..{len(options)}: {lower_bound}..{upper_bound}")
+    lengths = rng.integers(lower_bound, upper_bound + 1, size=n)
+    orders = np.argsort(rng.random((n, len(options))), axis=1)
+    return [[options[i] for i in order[:length]] for order, length in zip(orders, lengths)]
@@ -0,0 +1,132 @@
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+# events kept by a TimingRecorder; older ones are overwritten
+DEFAULT_CAPACITY = 4096
+PERCENTILES = (50, 95, 99)
+
+
+class TimingRecorder:
+    """Scheduled and actual start times of played events, kept in a fixed-size ring buffer.
+
+    Times are seconds on the monotonic clock. Playback loops either
+    ``record`` events directly, or pass their events through ``track`` and
+    call ``block_started`` whenever a mixed block is handed to the audio
+    backend, which places every event of the block relative to the block's
+    actual start. The start error of each block is kept too: every block
+    is handed to the backend separately, so it carries its own scheduling
+    and startup error even though those errors do not add up.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, clock=time.monotonic):
+        self.capacity = capacity
+        self.clock = clock
+        self._scheduled = np.zeros(capacity)
+        self._actual = np.zeros(capacity)
+        self.total = 0
+        self._block_errors = np.zeros(capacity)
+        self.blocks = 0
+        self._tracked = deque()
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def record(self, scheduled, actual=None):
+        """Note one event that should have started at ``scheduled`` and started at ``actual`` (default: now)."""
+        i = self.total % self.capacity
+        self._scheduled[i] = scheduled
+        self._actual[i] = self.clock() if actual is None else actual
+        self.total += 1
+
+    def track(self, events):
+        """Pass ``(time, key)`` events through unchanged, remembering their stream times for ``block_started``."""
+        for event in events:
+            self._tracked.append(event[0])
+            yield event
+
+    def block_started(self, scheduled, actual, block_start, block_end, sample_rate):
+        """Record the tracked events of the block of samples ``[block_start, block_end)`` of the stream.
+
+        ``scheduled`` and ``actual`` are the clock times the block should
+        have started and did start.
+        """
+        self._block_errors[self.blocks % self.capacity] = actual - scheduled
+        self.blocks += 1
+        while self._tracked and round(self._tracked[0] * sample_rate) < block_end:
+            offset = self._tracked.popleft() - block_start / sample_rate
+            self.record(scheduled + offset, actual + offset)
+
+    def _ordered(self):
+        n = len(self)
+        order = (np.arange(n) + (self.total - n)) % self.capacity
+        return self._scheduled[order], self._actual[order]
+
+    @property
+    def block_errors(self):
+        """Seconds each block started late (negative: early), oldest first."""
+        n = min(self.blocks, self.capacity)
+        return self._block_errors[(np.arange(n) + (self.blocks - n)) % self.capacity]
+
+    @property
+    def scheduled(self):
+        return self._ordered()[0]
+
+    @property
+    def actual(self):
+        return self._ordered()[1]
+
+    def summary(self):
+        """Latency, jitter and drift of the recorded events, in seconds.
+
+        ``latency_pNN`` are percentiles of how late events started,
+        ``jitter_pNN`` percentiles of their deviation from the median
+        latency, and ``drift`` the trend of the latency in seconds per
+        second of playback. ``block_error_pNN`` are percentiles of how far
+        from its scheduled time each block was handed to the backend.
+        """
+        scheduled, actual = self._ordered()
+        summary = {'events': len(scheduled), 'dropped': self.total - len(scheduled)}
+        if self.blocks:
+            block_errors = np.abs(self.block_errors)
+            summary['blocks'] = self.blocks
+            for p, error in zip(PERCENTILES, np.percentile(block_errors, PERCENTILES)):
+                summary[f'block_error_p{p}'] = float(error)
+            summary['max_block_error'] = float(block_errors.max())
+        if not len(scheduled):
+            return summary
+        lateness = actual - scheduled
+        deviation = np.abs(lateness - np.median(lateness))
+        for p, latency, jitter in zip(PERCENTILES, np.percentile(lateness, PERCENTILES),
+                                      np.percentile(deviation, PERCENTILES)):
+            summary[f'latency_p{p}'] = float(latency)
+            summary[f'jitter_p{p}'] = float(jitter)
+        summary['max_latency'] = float(lateness.max())
+        span = scheduled[-1] - scheduled[0]
+        summary['drift'] = float(np.polyfit(scheduled - scheduled[0], lateness, 1)[0]) if span > 0 else 0.0
+        return summary
+
+    def format_summary(self):
+        summary = self.summary()
+        if not summary['events']:
+            return "No events recorded"
+        lines = [f"Events: {summary['events']}" + (f" ({summary['dropped']} older dropped)" if summary['dropped'] else '')]
+        for name in ('latency', 'jitter'):
+            values = ', '.join(f"p{p} {summary[f'{name}_p{p}'] * 1000:.2f}" for p in PERCENTILES)
+            lines.append(f"{name.capitalize()} (ms): {values}")
+        lines.append(f"Drift: {summary['drift'] * 60000:.2f} ms/min")
+        if 'blocks' in summary:
+            values = ', '.join(f"p{p} {summary[f'block_error_p{p}'] * 1000:.2f}" for p in PERCENTILES)
+            lines.append(f"Block start error (ms): {values}")
+        return '\n'.join(lines)
+
+    def dump(self, path=None):
+        """Print the summary, or with a ``path`` write it and the raw times there as JSON."""
+        if path is None:
+            print(self.format_summary())
+            return
+        scheduled, actual = self._ordered()
+        with open(path, 'w') as f:
+            json.dump({'summary': self.summary(), 'scheduled': scheduled.tolist(), 'actual': actual.tolist()}, f)
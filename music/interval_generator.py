@@ -1,83 +1,133 @@
-import random
-import time
-import pyttsx3
-import simpleaudio as sa
+import numpy as np
 
+from music.assets import asset_index
+from music.async_engine import PlaybackSession
+from music.backends import get_backend
+from music.exercise_plan import ExercisePlan, random_choices, random_sequences
+from music.instrumentation import TimingRecorder
+from music.packed_bank import load_samples
+from music.sequencer import Sequencer, beat_events
 from music.scale import MajorScale
 
 
+# beats planned at a time for endless playback
+PLAN_CHUNK = 64
+
+
 class IntervalGenerator:
-    interval_files = {
-        '1': 'audio/1.wav',
-        'b1': 'audio/Flat1.wav',
-        '#1': 'audio/Sharp1.wav',
-        '2': 'audio/2.wav',
-        'b2': 'audio/Flat2.wav',
-        '#2': 'audio/Sharp2.wav',
-        '3': 'audio/3.wav',
-        'b3': 'audio/Flat3.wav',
-        '#3': 'audio/Sharp3.wav',
-        '4': 'audio/4.wav',
-        'b4': 'audio/Flat4.wav',
-        '#4': 'audio/Sharp4.wav',
-        '5': 'audio/5.wav',
-        'b5': 'audio/Flat5.wav',
-        '#5': 'audio/Sharp5.wav',
-        '6': 'audio/6.wav',
-        'b6': 'audio/Flat6.wav',
-        '#6': 'audio/Sharp6.wav',
-        '7': 'audio/7.wav',
-        'b7': 'audio/Flat7.wav',
-        '#7': 'audio/Sharp7.wav',
-    }
-
-    def __init__(self, scale, bpm):
+    def __init__(self, scale, bpm, samples=None, backend='simpleaudio', seed=None, backend_kwargs=None):
         self.scale = scale
         self.bpm = bpm
-        # self.engine = pyttsx3.init()
+        # all exercise content is drawn from here, so a seed makes a session reproducible
+        self.rng = np.random.default_rng(seed)
+        if samples is None:
+            # fail now rather than mid-session if the scale needs a sample that does not exist
+            assets = asset_index()
+            assets.validate([scale], kinds=('interval',))
+            # every interval is loaded up front (from the packed bank if it is current)
+            # so that playback does no file I/O
+            samples = load_samples(assets.files('interval', octave=0))
+        self.samples = samples
+        self.sequencer = Sequencer(self.samples)
+        # decoded and resampled before playback starts, so that playing only mixes
+        self.sequencer.preload()
+        # a backend name (see 'music.backends'), constructed with 'backend_kwargs', e.g. {'path': 'out.wav'},
+        # or a play_buffer-like callable
+        self.backend = get_backend(backend, **(backend_kwargs or {}))
+        # scheduled vs. actual start of every event played live, summarised when playback stops
+        self.timings = TimingRecorder()
+
+    def _play(self, events):
+        """Plays 'events' live until they run out or playback is interrupted, then prints the timing summary."""
+        try:
+            self.sequencer.play(events, self.backend, recorder=self.timings)
+        finally:
+            self.timings.dump()
 
     def generate_random_interval_from_scale(self):
         """Continuously generates a random interval from the given scale every beat,
         where the tempo is defined by 'bpm'(beats per minute),
         and plays the corresponding audio file."""
         print(f"Generating random intervals for: \"{self.scale}\"")
-        interval_seconds = 60 / self.bpm
+        self._play(beat_events(self._random_intervals(), self.bpm))
+
+    def interval_session(self, play_buffer=None):
+        """A 'PlaybackSession' of random intervals from the scale for an asyncio event loop;
+        'start()' it from a coroutine and cancel its task to stop. Its 'recorder' holds the
+        event timings."""
+        return PlaybackSession(self.sequencer, beat_events(self._random_intervals(), self.bpm),
+                               play_buffer or self.backend, recorder=TimingRecorder())
+
+    def plan_intervals(self, n_beats, seed=None):
+        """Plans 'n_beats' random intervals from the scale, one per beat at 'bpm', as an 'ExercisePlan'.
+        A 'seed' gives the same plan every time; without one the generator's own random state is used."""
+        rng = self.rng if seed is None else np.random.default_rng(seed)
+        intervals = random_choices(self.scale.scale_intervals, n_beats, rng)
+        return ExercisePlan(intervals, [self._playable(interval) for interval in intervals], self.bpm)
+
+    def render_intervals(self, path, n_beats, seed=None):
+        """Renders 'n_beats' random intervals from the scale, one per beat at 'bpm', to an audio file
+        without playing them."""
+        self.sequencer.render_to_file(self.plan_intervals(n_beats, seed), path)
 
+    def _random_intervals(self, verbose=True):
         while True:
-            interval = random.choice(self.scale.get_intervals())
-            print("Interval: ", interval, "; Note: ", (self.scale.build_scale()[self.scale.get_intervals().index(interval)]))
-            try:
-                # self.engine.say(interval)
-                # self.engine.runAndWait()
-                wave_obj = sa.WaveObject.from_wave_file(self.interval_files[interval])
-                play_obj = wave_obj.play()
-                play_obj.wait_done()  # Wait for the audio to finish playing
-            except Exception as e:
-                print(f"Failed to play the interval: {e}")
-            time.sleep(interval_seconds)
+            plan = self.plan_intervals(PLAN_CHUNK)
+            for interval, key in zip(plan.labels, plan.keys):
+                if verbose:
+                    print("Interval: ", interval, "; Note: ", self.scale.note_for_interval[interval])
+                yield key
 
     def generate_random_interval_sequence(self, lower_bound, upper_bound):
         """Generates and plays a random sequence of intervals from the scale.
 
+        Each interval of a sequence falls on its own beat and sequences are
+        separated by a silent beat.
+
         Arguments:
         lower_bound -- minimum number of intervals in a sequence
         upper_bound -- maximum number of intervals in a sequence
         """
-        interval_seconds = 60 / self.bpm
+        self._play(beat_events(self._random_sequences(lower_bound, upper_bound), self.bpm))
+
+    def interval_sequence_session(self, lower_bound, upper_bound, play_buffer=None):
+        """A 'PlaybackSession' of random interval sequences (see 'generate_random_interval_sequence')
+        for an asyncio event loop."""
+        events = beat_events(self._random_sequences(lower_bound, upper_bound), self.bpm)
+        return PlaybackSession(self.sequencer, events, play_buffer or self.backend, recorder=TimingRecorder())
+
+    def plan_interval_sequences(self, lower_bound, upper_bound, n_beats, seed=None):
+        """Plans 'n_beats' beats of random interval sequences (see 'generate_random_interval_sequence')
+        as an 'ExercisePlan'. The rests between sequences have a label of None."""
+        rng = self.rng if seed is None else np.random.default_rng(seed)
+        # every sequence takes at least one beat with its rest, so n_beats of them always suffice
+        sequences = random_sequences(self.scale.scale_intervals, lower_bound, upper_bound, n_beats, rng)
+        intervals = [interval for sequence in sequences for interval in sequence + [None]][:n_beats]
+        return ExercisePlan(intervals, [self._playable(interval) for interval in intervals], self.bpm)
 
+    def render_interval_sequence(self, path, lower_bound, upper_bound, n_beats, seed=None):
+        """Renders 'n_beats' beats of random interval sequences (see 'generate_random_interval_sequence')
+        to an audio file without playing them."""
+        self.sequencer.render_to_file(self.plan_interval_sequences(lower_bound, upper_bound, n_beats, seed), path)
+
+    def _random_sequences(self, lower_bound, upper_bound, verbose=True):
         while True:
-            sequence_length = random.randint(lower_bound, upper_bound)
-            sequence = random.sample(self.scale.get_intervals(), sequence_length)
-            print("Sequence:", sequence)
-
-            for interval in sequence:
-                try:
-                    wave_obj = sa.WaveObject.from_wave_file(self.interval_files[interval])
-                    play_obj = wave_obj.play()
-                    play_obj.wait_done()  # Wait for the audio to finish playing
-                except Exception as e:
-                    print(f"Failed to play the interval: {e}")
-            time.sleep(interval_seconds)
+            for sequence in random_sequences(self.scale.scale_intervals, lower_bound, upper_bound, PLAN_CHUNK,
+                                             self.rng):
+                if verbose:
+                    print("Sequence:", sequence)
+                for interval in sequence:
+                    yield self._playable(interval)
+                yield None
+
+    def _playable(self, interval):
+        """The interval's sample key, or None (a silent beat) for a rest or when there is no sample for it."""
+        if interval is None:
+            return None
+        if interval not in self.samples:
+            print(f"Failed to play the interval: no sample for {interval}")
+            return None
+        return interval
 
 # Example usage:
 if __name__ == "__main__":
@@ -4,7 +4,7 @@ import unittest
 from unittest.mock import patch, call, MagicMock
 
 from music.interval_generator import IntervalAudioGenerator
-from music.scale import MajorScale, MinorScale
+from music.scale import MajorScale, NaturalMinorScale
 
 class TestIntervalAudioGenerator(unittest.TestCase):
     @patch('simpleaudio.WaveObject.from_wave_file')
@@ -21,7 +21,7 @@ class TestIntervalAudioGenerator(unittest.TestCase):
     @patch('simpleaudio.WaveObject.from_wave_file')
     @patch('simpleaudio.PlayObject')
     def test_minor_scale_flats(self, mock_wave_object, mock_play_object):
-        scale = MinorScale('D', use_flats=True)  # D minor with flats
+        scale = NaturalMinorScale('D', use_flats=True)  # D minor with flats
         generator = IntervalAudioGenerator(scale, bpm=60, use_extended=False, octave_preference='both')
 
         for _ in range(10):
@@ -0,0 +1,156 @@
+from functools import lru_cache
+
+import numpy as np
+
+from music.chord_progression import ChordProgression
+
+# relative weights of moving from the chord on one degree (row, I to VII) to another (column)
+TRANSITIONS = {
+    # tonic -> predominant (ii, IV) -> dominant (V, vii°) -> tonic, with the deceptive V -> vi
+    'common_practice': [
+        [1, 2, 1, 3, 3, 2, 1],
+        [0, 0, 0, 1, 6, 0, 2],
+        [0, 0, 0, 2, 0, 4, 0],
+        [2, 2, 0, 0, 4, 0, 1],
+        [6, 0, 0, 0, 0, 2, 0],
+        [0, 3, 0, 3, 1, 0, 0],
+        [5, 0, 0, 0, 1, 0, 0],
+    ],
+    # I, IV and V as in a twelve-bar blues; any other chord falls back to them
+    'blues': [
+        [4, 0, 0, 3, 1, 0, 0],
+        [0, 0, 0, 0, 1, 0, 0],
+        [0, 0, 0, 1, 0, 0, 0],
+        [3, 0, 0, 1, 1, 0, 0],
+        [2, 0, 0, 2, 0, 0, 0],
+        [0, 0, 0, 1, 1, 0, 0],
+        [1, 0, 0, 0, 0, 0, 0],
+    ],
+}
+# relative weights of the first chord; both models start on the tonic
+STARTS = {
+    'common_practice': [1, 0, 0, 0, 0, 0, 0],
+    'blues': [1, 0, 0, 0, 0, 0, 0],
+}
+
+
+def _cumulative(weights):
+    """Rows of ``weights`` as cumulative probabilities ending in exactly 1; empty rows become uniform."""
+    weights = np.array(weights, dtype=float)
+    weights[weights.sum(axis=-1) == 0] = 1
+    cumulative = np.cumsum(weights, axis=-1)
+    cumulative /= cumulative[..., -1:]
+    cumulative[..., -1] = 1
+    return cumulative
+
+
+class ProgressionModel:
+    """A Markov chain over chords, sampled many progressions at a time.
+
+    ``transitions`` is a square matrix of non-negative weights from the
+    chord of each row to that of each column and ``start`` the weights of
+    the first chord (default: uniform). ``labels`` name the rows (default:
+    the scale degrees 1 to n). Progressions are sampled as integer codes,
+    row numbers of the matrix, in an ``int8`` array.
+    """
+
+    def __init__(self, transitions, start=None, labels=None):
+        self.transitions = np.array(transitions, dtype=float)
+        n = len(self.transitions)
+        if self.transitions.shape != (n, n) or not n:
+            raise ValueError(f"Transition matrix is not square: {self.transitions.shape}")
+        self.start = np.ones(n) if start is None else np.array(start, dtype=float)
+        if self.start.shape != (n,):
+            raise ValueError(f"Start weights do not match the transition matrix: {self.start.shape} != {(n,)}")
+        if (self.transitions < 0).any() or (self.start < 0).any():
+            raise ValueError("Transition and start weights must not be negative")
+        self.labels = tuple(range(1, n + 1)) if labels is None else tuple(labels)
+        if len(self.labels) != n:
+            raise ValueError(f"Expected {n} labels, got {len(self.labels)}")
+        self._cumulative = _cumulative(self.transitions)
+        self._start_cumulative = _cumulative(self.start)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def restricted(self, rows, labels=None):
+        """The chain among ``rows`` only, e.g. the degrees of a scale that have chords.
+
+        A chord left with no successor but itself, or none at all, continues
+        to any of the remaining ones with equal probability, so that the
+        chain does not get stuck repeating it.
+        """
+        rows = list(rows)
+        labels = [self.labels[row] for row in rows] if labels is None else labels
+        start = self.start[rows] if self.start[rows].any() else None
+        transitions = self.transitions[np.ix_(rows, rows)]
+        transitions[transitions.sum(axis=1) == np.diag(transitions)] = 1
+        return ProgressionModel(transitions, start, labels)
+
+    def sample(self, n_progressions, length, rng=None):
+        """Sample ``n_progressions`` progressions of ``length`` chords, as codes of shape ``(n_progressions, length)``.
+
+        All uniform draws are made at once; each step then advances every
+        progression together, so the cost in Python is one operation per
+        chord position however many progressions are sampled.
+        """
+        rng = np.random.default_rng(rng)
+        draws = rng.random((n_progressions, length))
+        codes = np.empty((n_progressions, length), dtype=np.int8)
+        if length:
+            codes[:, 0] = np.searchsorted(self._start_cumulative, draws[:, 0], side='right')
+        for step in range(1, length):
+            codes[:, step] = (self._cumulative[codes[:, step - 1]] <= draws[:, step, None]).sum(axis=1)
+        return codes
+
+    def decode(self, codes):
+        """The labels of an array of codes, e.g. ``decode(sample(...))`` for scale degrees."""
+        return np.asarray(self.labels)[codes]
+
+
+@lru_cache(maxsize=None)
+def _named_model(name):
+    return ProgressionModel(TRANSITIONS[name], STARTS[name])
+
+
+def get_model(model='common_practice'):
+    """Resolve ``model``, the name of one of ``TRANSITIONS``, a ``ProgressionModel`` or a 7 x 7 weight matrix."""
+    if isinstance(model, ProgressionModel):
+        return model
+    if isinstance(model, str):
+        if model not in TRANSITIONS:
+            raise ValueError(f"Unknown progression model: {model}")
+        return _named_model(model)
+    return ProgressionModel(model)
+
+
+def scale_model(scale, model='common_practice'):
+    """``model`` restricted to the degrees of ``scale`` that have chords, labelled by those degrees.
+
+    Rows are picked by each chord's Roman numeral, so the ``bIII`` of a
+    minor pentatonic (its second degree) takes the transitions of ``III``.
+    """
+    progression = ChordProgression(scale)
+    degrees = progression.chord_degrees()
+    numerals = [progression.chords[degree - 1].numeral.lstrip('#b') for degree in degrees]
+    rows = [ChordProgression.roman_numerals.index(numeral) for numeral in numerals]
+    return get_model(model).restricted(rows, labels=degrees)
+
+
+def sample_progressions(scale, n_progressions, length, model='common_practice', rng=None):
+    """Scale degrees (from 1) of ``n_progressions`` random progressions of ``length`` chords in ``scale``.
+
+    Returned as an ``int8`` array of shape ``(n_progressions, length)``;
+    ``chord_names`` turns it into chords.
+    """
+    scale_chain = scale_model(scale, model)
+    return scale_chain.decode(scale_chain.sample(n_progressions, length, rng)).astype(np.int8)
+
+
+def chord_names(scale, degrees, seventh=False):
+    """The chords of ``scale`` on an array of scale ``degrees``, as an array of the same shape."""
+    progression = ChordProgression(scale)
+    names = [''] * (len(progression.chords) + 1)
+    for degree in progression.chord_degrees(seventh):
+        names[degree] = progression.chord(degree, seventh)[1]
+    return np.array(names)[degrees]
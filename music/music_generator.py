@@ -1,131 +1,142 @@
 import random
-import time
 
-import pyttsx3
-import simpleaudio as sa
+import numpy as np
 
+from music.assets import asset_index
+from music.async_engine import PlaybackSession
+from music.backends import get_backend
 from music.chord_progression import ChordProgression
+from music.exercise_plan import ExercisePlan, random_choices
+from music.instrumentation import TimingRecorder
+from music.markov_progression import sample_progressions
+from music.packed_bank import load_samples
+from music.sequencer import Sequencer, beat_events
+from music.synthesis import SynthesisFallback
+
+
+# beats planned at a time for endless playback
+PLAN_CHUNK = 64
 
 
 class MusicGenerator:
-    note_files = {
-        'C': 'audio/C.wav',
-        'C#': 'audio/CSharp.wav',
-        'D': 'audio/D.wav',
-        'D#': 'audio/DSharp.wav',
-        'E': 'audio/E.wav',
-        'F': 'audio/F.wav',
-        'F#': 'audio/FSharp.wav',
-        'G': 'audio/G.wav',
-        'G#': 'audio/GSharp.wav',
-        'A': 'audio/A.wav',
-        'A#': 'audio/ASharp.wav',
-        'B': 'audio/B.wav',
-        'Bb': 'audio/BFlat.wav',
-        'Db': 'audio/DFlat.wav',
-        'Eb': 'audio/EFlat.wav',
-        'Gb': 'audio/GFlat.wav',
-    }
-
-    chord_files = {
-        'AMajor': 'audio/AMajor.m4a.wav',
-        'AMinor': 'audio/AMinor.m4a.wav',
-        'ASharpMajor': 'audio/ASharpMajor.m4a.wav',
-        'ASharpMinor': 'audio/ASharpMinor.m4a.wav',
-        'AFlatMajor': 'audio/AFlatMajor.m4a.wav',
-        'AFlatMinor': 'audio/AFlatMinor.m4a.wav',
-        'BMajor': 'audio/BMajor.m4a.wav',
-        'BMinor': 'audio/BMinor.m4a.wav',
-        'BFlatMajor': 'audio/BFlatMajor.m4a.wav',
-        'BFlatMinor': 'audio/BFlatMinor.m4a.wav',
-        'CMajor': 'audio/CMajor.m4a.wav',
-        'CMinor': 'audio/CMinor.m4a.wav',
-        'CSharpMajor': 'audio/CSharpMajor.m4a.wav',
-        'CSharpMinor': 'audio/CSharpMinor.m4a.wav',
-        'DMajor': 'audio/DMajor.m4a.wav',
-        'DMinor': 'audio/DMinor.m4a.wav',
-        'DSharpMajor': 'audio/DSharpMajor.m4a.wav',
-        'DSharpMinor': 'audio/DSharpMinor.m4a.wav',
-        'DFlatMajor': 'audio/DFlatMajor.m4a.wav',
-        'DFlatMinor': 'audio/DFlatMinor.m4a.wav',
-        'EMajor': 'audio/EMajor.m4a.wav',
-        'EMinor': 'audio/EMinor.m4a.wav',
-        'EFlatMajor': 'audio/EFlatMajor.m4a.wav',
-        'EFlatMinor': 'audio/EFlatMinor.m4a.wav',
-        'FMajor': 'audio/FMajor.m4a.wav',
-        'FMinor': 'audio/FMinor.m4a.wav',
-        'FSharpMajor': 'audio/FSharpMajor.m4a.wav',
-        'FSharpMinor': 'audio/FSharpMinor.m4a.wav',
-        'GMajor': 'audio/GMajor.m4a.wav',
-        'GMinor': 'audio/GMinor.m4a.wav',
-        'GSharpMajor': 'audio/GSharpMajor.m4a.wav',
-        'GSharpMinor': 'audio/GSharpMinor.m4a.wav',
-        'GFlatMajor': 'audio/GFlatMajor.m4a.wav',
-        'GFlatMinor': 'audio/GFlatMinor.m4a.wav',
-        
-        'ADim': "audio/ADim.m4a.wav",
-        'ASharpDim': "audio/ASharpDim.m4a.wav",
-        'AFlatDim': "audio/AFlatDim.m4a.wav",
-        'BDim': "audio/BDim.m4a.wav",
-        'BFlatDim': "audio/BFlatDim.m4a.wav",
-        'CDim': "audio/CDim.m4a.wav",
-        'CSharpDim': "audio/CSharpDim.m4a.wav",
-        'CFlatDim': "audio/CFlatDim.m4a.wav",
-        'DDim': "audio/DDim.m4a.wav",
-        'DSharpDim': "audio/DSharpDim.m4a.wav",
-        'DFlatDim': "audio/DFlatDim.m4a.wav",
-        'EDim': "audio/EDim.m4a.wav",
-        'EFlatDim': "audio/EFlatDim.m4a.wav",
-        'FDim': "audio/FDim.m4a.wav",
-        'FSharpDim': "audio/FSharpDim.m4a.wav",
-        'GDim': "audio/GDim.m4a.wav",
-        'GSharpDim': "audio/GDim.m4a.wav",
-        'GFlatDim': "audio/GFlatDim.m4a.wav",
-    }
-
-    def __init__(self, scale, bpm):
+    def __init__(self, scale, bpm, samples=None, backend='simpleaudio', seed=None, backend_kwargs=None):
         self.scale = scale
         self.bpm = bpm
-        self.engine = pyttsx3.init()
+        # all exercise content is drawn from here, so a seed makes a session reproducible
+        self.rng = np.random.default_rng(seed)
+        if samples is None:
+            # fail now rather than mid-session if a note or chord of a recorded quality is missing,
+            # e.g. because its file is misnamed, instead of quietly synthesizing it
+            assets = asset_index()
+            assets.validate([scale], kinds=('note', 'chord'))
+            # every recorded note and chord is loaded up front (from the packed bank if it is current)
+            # so that playback does no file I/O; anything nobody records, e.g. a seventh or augmented
+            # chord, is synthesized (and logged) rather than failing mid-session
+            samples = SynthesisFallback(load_samples(assets.files('note', 'chord')))
+        self.samples = samples
+        self.sequencer = Sequencer(self.samples)
+        # recorded samples, and whatever the scale needs synthesized, are converted before playback starts
+        scale_keys = [key for key in list(scale.scale_notes) + self._scale_chords() if key in self.samples]
+        self.sequencer.preload(list(self.samples) + scale_keys)
+        # a backend name (see 'music.backends'), constructed with 'backend_kwargs', e.g. {'path': 'out.wav'},
+        # or a play_buffer-like callable
+        self.backend = get_backend(backend, **(backend_kwargs or {}))
+        # scheduled vs. actual start of every event played live, summarised when playback stops
+        self.timings = TimingRecorder()
+        self._engine = None
+
+    @property
+    def engine(self):
+        """The text-to-speech engine, only started (and 'pyttsx3' only imported) when first used."""
+        if self._engine is None:
+            import pyttsx3
+            self._engine = pyttsx3.init()
+        return self._engine
+
+    def _play(self, events):
+        """Plays 'events' live until they run out or playback is interrupted, then prints the timing summary."""
+        try:
+            self.sequencer.play(events, self.backend, recorder=self.timings)
+        finally:
+            self.timings.dump()
 
     def generate_random_note_from_scale(self):
         """Continuously generates a random note from the given scale every beat, where the tempo is defined by 'bpm' (beats per minute),
-        and uses text-to-speech to speak the note name."""
-        interval_seconds = 60 / self.bpm
+        and plays the corresponding audio file."""
+        self._play(beat_events(self._random_notes(), self.bpm))
+
+    def note_session(self, play_buffer=None):
+        """A 'PlaybackSession' of random notes from the scale for an asyncio event loop;
+        'start()' it from a coroutine and cancel its task to stop. Its 'recorder' holds the
+        event timings."""
+        return PlaybackSession(self.sequencer, beat_events(self._random_notes(), self.bpm),
+                               play_buffer or self.backend, recorder=TimingRecorder())
 
+    def plan_notes(self, n_beats, seed=None):
+        """Plans 'n_beats' random notes from the scale, one per beat at 'bpm', as an 'ExercisePlan'.
+        Notes without a sample are silent. A 'seed' gives the same plan every time; without one the
+        generator's own random state is used."""
+        rng = self.rng if seed is None else np.random.default_rng(seed)
+        notes = random_choices(self.scale.scale_notes, n_beats, rng)
+        return ExercisePlan(notes, [note if note in self.samples else None for note in notes], self.bpm)
+
+    def render_notes(self, path, n_beats, seed=None):
+        """Renders 'n_beats' random notes from the scale, one per beat at 'bpm', to an audio file
+        without playing them."""
+        self.sequencer.render_to_file(self.plan_notes(n_beats, seed), path)
+
+    def _random_notes(self, verbose=True):
         while True:
-            note = random.choice(self.scale.build_scale())
-            print(note)
-            try:
-                wave_obj = sa.WaveObject.from_wave_file(self.note_files[note])
-                play_obj = wave_obj.play()
-            except Exception as e:
-                print(f"Failed to play the note: {e}")
-            time.sleep(interval_seconds)
+            plan = self.plan_notes(PLAN_CHUNK)
+            for note, key in zip(plan.labels, plan.keys):
+                if verbose:
+                    print(note)
+                if key is None:
+                    print(f"Failed to play the note: no sample for {note}")
+                yield key
 
     def generate_random_chord_from_scale(self):
         """Continuously generates a random chord from the given scale every beat, where the tempo is defined by 'bpm' (beats per minute),
         and plays the corresponding audio file."""
-        interval_seconds = 60 / self.bpm
+        self._play(beat_events(self._random_chords(), self.bpm))
+
+    def chord_session(self, play_buffer=None):
+        """A 'PlaybackSession' of random chords from the scale for an asyncio event loop;
+        'start()' it from a coroutine and cancel its task to stop. Its 'recorder' holds the
+        event timings."""
+        return PlaybackSession(self.sequencer, beat_events(self._random_chords(), self.bpm),
+                               play_buffer or self.backend, recorder=TimingRecorder())
 
+    def plan_chords(self, n_beats, seed=None):
+        """Plans 'n_beats' random chords from the scale, one per beat at 'bpm', as an 'ExercisePlan'.
+        Raises a ValueError if a planned chord has no sample."""
+        rng = self.rng if seed is None else np.random.default_rng(seed)
+        chords = random_choices(self._scale_chords(), n_beats, rng)
+        for chord in chords:
+            if chord not in self.samples:
+                raise ValueError(f"Failed to play the chord: no sample for {chord}")
+        return ExercisePlan(chords, chords, self.bpm)
+
+    def render_chords(self, path, n_beats, seed=None):
+        """Renders 'n_beats' random chords from the scale, one per beat at 'bpm', to an audio file
+        without playing them."""
+        self.sequencer.render_to_file(self.plan_chords(n_beats, seed), path)
+
+    def _random_chords(self, verbose=True):
         while True:
-            chord = self.generate_random_chord()
-            print(chord)
-            try:
-                wave_obj = sa.WaveObject.from_wave_file(self.chord_files[chord])
-                play_obj = wave_obj.play()
-                play_obj.wait_done()  # Wait for the audio to finish playing
-            except Exception as e:
-                raise ValueError(f"Failed to play the chord: {e}")
-            time.sleep(interval_seconds)
+            for chord in self.plan_chords(PLAN_CHUNK).keys:
+                if verbose:
+                    print(chord)
+                yield chord
+
+    def _scale_chords(self):
+        """The chord on each scale degree that has one."""
+        return ChordProgression(self.scale).scale_chords()
 
     def generate_random_chord(self):
         """Generates a random chord from the given scale."""
-        chord_progression = ChordProgression(self.scale)
-        scale_degree = random.randint(1, 7)
-        chord_progression.add_chord(scale_degree)
-        _, chord = chord_progression.progression[-1]
-        return chord
+        chords = self._scale_chords()
+        return chords[self.rng.integers(len(chords))]
 
     @staticmethod
     def generate_random_notes(n):
@@ -134,10 +145,10 @@ class MusicGenerator:
         return [random.choice(musical_alphabet) for _ in range(n)]
 
     @staticmethod
-    def generate_random_chord_progression(scale, n):
-        """Generate a random chord progression."""
+    def generate_random_chord_progression(scale, n, model='common_practice', seed=None):
+        """Generate a random chord progression of 'n' chords, moving between scale degrees as in
+        'model' (a name from 'music.markov_progression.TRANSITIONS' or a 'ProgressionModel')."""
         progression = ChordProgression(scale)
-        for _ in range(n):
-            scale_degree = random.randint(1, 7)
-            progression.add_chord(scale_degree)
+        for scale_degree in sample_progressions(scale, 1, n, model, seed)[0]:
+            progression.add_chord(int(scale_degree))
         return progression
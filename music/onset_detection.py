@@ -0,0 +1,137 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+DEFAULT_FRAME_LENGTH = 1024
+DEFAULT_HOP_LENGTH = 256
+# log compression applied to spectral magnitudes before differencing
+COMPRESSION = 100.0
+# floor added to frame energies before taking the log, roughly -100 dB
+ENERGY_FLOOR = 1e-10
+# frames transformed per FFT batch, bounds the size of the spectrogram in memory
+FRAMES_PER_BATCH = 1024
+
+
+def frame_signal(data, frame_length=DEFAULT_FRAME_LENGTH, hop_length=DEFAULT_HOP_LENGTH):
+    """Return a strided (n_frames, frame_length) view of the signal, without copying."""
+    data = np.asarray(data)
+    if len(data) < frame_length:
+        return np.empty((0, frame_length), dtype=data.dtype)
+    return sliding_window_view(data, frame_length)[::hop_length]
+
+
+def _frame_features(frames, method):
+    """Compress each frame to the feature that is differenced into a novelty curve."""
+    if method == 'energy':
+        return np.log(ENERGY_FLOOR + np.mean(np.square(frames, dtype=np.float64), axis=1))[:, None]
+    if method == 'flux':
+        window = np.hanning(frames.shape[1])
+        features = [np.log1p(COMPRESSION * np.abs(np.fft.rfft(frames[i:i + FRAMES_PER_BATCH] * window, axis=1)))
+                    for i in range(0, len(frames), FRAMES_PER_BATCH)]
+        return np.concatenate(features) if features else np.empty((0, frames.shape[1] // 2 + 1))
+    raise ValueError(f"Unknown novelty method: {method}")
+
+
+def _novelty_stream(chunks, method, frame_length, hop_length):
+    """Yield the novelty curve chunk by chunk from consecutive (non-overlapping) sample chunks.
+
+    Frames are centred on multiples of ``hop_length`` by padding half a frame of
+    silence at both ends, so frame ``i`` describes sample ``i * hop_length``.
+    Only the samples of one partially consumed frame are carried between chunks.
+    """
+    pad = np.zeros(frame_length // 2, dtype=np.float32)
+    carry = pad
+    previous = None
+    for chunk in _append(chunks, pad):
+        buffer = np.concatenate((carry, np.asarray(chunk, dtype=np.float32)))
+        frames = frame_signal(buffer, frame_length, hop_length)
+        if not len(frames):
+            carry = buffer
+            continue
+        features = _frame_features(frames, method)
+        if previous is None:
+            previous = features[:1]
+        steps = np.diff(np.concatenate((previous, features)), axis=0)
+        yield np.maximum(steps, 0).sum(axis=1)
+        previous = features[-1:]
+        carry = buffer[len(frames) * hop_length:]
+
+
+def _append(chunks, tail):
+    yield from chunks
+    yield tail
+
+
+def novelty_curve(data, method='flux', frame_length=DEFAULT_FRAME_LENGTH, hop_length=DEFAULT_HOP_LENGTH):
+    """Compute an onset-strength curve with one value per hop.
+
+    ``method`` is ``'flux'`` (half-wave rectified spectral flux) or
+    ``'energy'`` (rectified difference of log frame energy).
+    """
+    return _concatenate(_novelty_stream([data], method, frame_length, hop_length))
+
+
+def novelty_curve_from_blocks(blocks, overlap=0, method='flux', frame_length=DEFAULT_FRAME_LENGTH,
+                              hop_length=DEFAULT_HOP_LENGTH):
+    """Compute the same curve as ``novelty_curve`` from ``(start, block)`` pairs.
+
+    Accepts the output of ``analyse_timing.load_audio_blocks``; the ``overlap``
+    samples repeated at the start of each block are skipped.
+    """
+    chunks = (block if start == 0 else block[overlap:] for start, block in blocks)
+    return _concatenate(_novelty_stream(chunks, method, frame_length, hop_length))
+
+
+def _concatenate(parts):
+    parts = list(parts)
+    return np.concatenate(parts) if parts else np.empty(0)
+
+
+def _moving(values, before, after, reduce, fill):
+    """Apply ``reduce`` over the window [i - before, i + after] around every value."""
+    padded = np.pad(values, (before, after), constant_values=fill)
+    return reduce(sliding_window_view(padded, before + after + 1), axis=1)
+
+
+def pick_onsets(novelty, pre_max=3, post_max=3, pre_avg=10, post_avg=10, delta=0.07, wait=10):
+    """Pick onset frames from a novelty curve with an adaptive local threshold.
+
+    A frame is an onset when it is the maximum of the surrounding
+    ``[-pre_max, +post_max]`` frames, exceeds the mean of the surrounding
+    ``[-pre_avg, +post_avg]`` frames by at least ``delta`` (in units of the
+    curve's maximum) and comes at least ``wait`` frames after the previous onset.
+    """
+    novelty = np.asarray(novelty, dtype=float)
+    if not novelty.size or novelty.max() <= 0:
+        return np.empty(0, dtype=np.intp)
+    novelty = novelty / novelty.max()
+
+    local_max = _moving(novelty, pre_max, post_max, np.max, -np.inf)
+    local_sum = _moving(novelty, pre_avg, post_avg, np.sum, 0.0)
+    # average over the samples that actually exist near the edges
+    counts = _moving(np.ones_like(novelty), pre_avg, post_avg, np.sum, 0.0)
+    candidates = np.flatnonzero((novelty == local_max) & (novelty >= local_sum / counts + delta))
+
+    onsets = []
+    for frame in candidates:
+        if not onsets or frame - onsets[-1] > wait:
+            onsets.append(frame)
+    return np.array(onsets, dtype=np.intp)
+
+
+def detect_onsets(data, method='flux', frame_length=DEFAULT_FRAME_LENGTH, hop_length=DEFAULT_HOP_LENGTH,
+                  **pick_kwargs):
+    """Detect note onsets and return them as sample indices.
+
+    Works on the decimated novelty curve (one value per ``hop_length``
+    samples) instead of the raw samples; ``pick_kwargs`` are passed to
+    ``pick_onsets``.
+    """
+    novelty = novelty_curve(data, method, frame_length, hop_length)
+    return pick_onsets(novelty, **pick_kwargs) * hop_length
+
+
+def detect_onsets_in_blocks(blocks, overlap=0, method='flux', frame_length=DEFAULT_FRAME_LENGTH,
+                            hop_length=DEFAULT_HOP_LENGTH, **pick_kwargs):
+    """Streaming counterpart of ``detect_onsets`` for ``(start, block)`` pairs."""
+    novelty = novelty_curve_from_blocks(blocks, overlap, method, frame_length, hop_length)
+    return pick_onsets(novelty, **pick_kwargs) * hop_length
@@ -0,0 +1,155 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from music.sample_bank import MUSIC_DIR, Sample, SampleBank, read_sample
+from music.sequencer import DEFAULT_SAMPLE_RATE, sample_to_float, to_pcm16
+
+DEFAULT_BANK_PATH = os.path.join(MUSIC_DIR, 'audio', 'samples.bank')
+MAGIC = b'MUSBANK1'
+# magic, then the length of the JSON offset table that follows it
+HEADER = struct.Struct('<8sI')
+# PCM data starts on a multiple of this many bytes
+ALIGNMENT = 16
+# samples quieter than -60 dBFS at either end are cut...
+TRIM_THRESHOLD = 10 ** (-60 / 20)
+# ...apart from this much lead-in, so that attacks are not clipped
+TRIM_PAD_SECONDS = 0.002
+
+
+def trim_silence(data, sample_rate, threshold=TRIM_THRESHOLD, pad_seconds=TRIM_PAD_SECONDS):
+    """``data`` without the leading and trailing samples below ``threshold``, keeping ``pad_seconds`` before the first sound."""
+    loud = np.flatnonzero(np.abs(data) > threshold)
+    if not len(loud):
+        return data[:0]
+    return data[max(loud[0] - int(pad_seconds * sample_rate), 0):loud[-1] + 1]
+
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def build_packed_bank(files, path=DEFAULT_BANK_PATH, base_dir=MUSIC_DIR, sample_rate=DEFAULT_SAMPLE_RATE,
+                      max_workers=None):
+    """Convert every file of a ``{key: path}`` table into one packed bank file at ``path``.
+
+    Every sample is mixed to mono, resampled to ``sample_rate`` and
+    trimmed of silence, then stored as 16-bit PCM after a JSON table of
+    ``{key: [byte offset, frames]}``. The table also records the size and
+    mtime of each source so that ``load_samples`` can tell when the bank is
+    stale. Files that cannot be read are left out and returned.
+    """
+    keys = list(files)
+    sources = [os.path.join(base_dir, files[key]) for key in keys]
+
+    def convert(source):
+        try:
+            return to_pcm16(trim_silence(sample_to_float(read_sample(source), sample_rate), sample_rate))
+        except (OSError, EOFError, ValueError):
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        converted = list(executor.map(convert, sources))
+
+    entries, offset = {}, 0
+    for key, source, pcm in zip(keys, sources, converted):
+        if pcm is not None:
+            entries[key] = [offset, len(pcm) // 2, files[key], _source_signature(source)]
+            offset += len(pcm)
+    table = json.dumps({'sample_rate': sample_rate, 'entries': entries}).encode()
+    data_start = -(-(HEADER.size + len(table)) // ALIGNMENT) * ALIGNMENT
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(table)))
+        f.write(table.ljust(data_start - HEADER.size, b' '))
+        for pcm in converted:
+            if pcm is not None:
+                f.write(pcm)
+    os.replace(tmp_path, path)
+    return {key: files[key] for key, pcm in zip(keys, converted) if pcm is None}
+
+
+class PackedSampleBank(Mapping):
+    """A bank file written by ``build_packed_bank``, memory-mapped and read without copying.
+
+    Behaves like a ``SampleBank``: a read-only mapping from key to
+    ``Sample``, except that ``audio_data`` is a ``memoryview`` into the
+    mapped file rather than ``bytes``. Keys the bank was built without
+    raise ``KeyError``.
+    """
+
+    def __init__(self, path=DEFAULT_BANK_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, table_size = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"Not a packed sample bank: {path}")
+        table = json.loads(self._mmap[HEADER.size:HEADER.size + table_size])
+        self.sample_rate = table['sample_rate']
+        self.entries = table['entries']
+        self.missing = {}
+        self._data = memoryview(self._mmap)[-(-(HEADER.size + table_size) // ALIGNMENT) * ALIGNMENT:]
+
+    def __getitem__(self, key):
+        offset, frames = self.entries[key][:2]
+        return Sample(self._data[offset:offset + 2 * frames], 1, 2, self.sample_rate)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def is_current(self, files, base_dir=MUSIC_DIR):
+        """Whether the bank holds every entry of ``files``, built from the same, unchanged source files."""
+        for key, file in files.items():
+            entry = self.entries.get(key)
+            if entry is None or entry[2] != file:
+                return False
+            try:
+                if entry[3] != _source_signature(os.path.join(base_dir, file)):
+                    return False
+            except OSError:
+                return False
+        return True
+
+
+def load_samples(files, bank_path=DEFAULT_BANK_PATH, base_dir=MUSIC_DIR):
+    """The samples of a ``{key: path}`` table: from the packed bank if it is up to date, otherwise from the files."""
+    if os.path.exists(bank_path):
+        try:
+            bank = PackedSampleBank(bank_path)
+        except (OSError, ValueError):
+            pass
+        else:
+            if bank.is_current(files, base_dir):
+                return bank
+    return SampleBank(files, base_dir)
+
+
+def main(argv=None):
+    from music.assets import asset_index
+
+    parser = argparse.ArgumentParser(description="Pack every audio asset into one memory-mappable sample bank")
+    parser.add_argument('--output', default=DEFAULT_BANK_PATH, help="bank file to write")
+    parser.add_argument('--sample-rate', type=int, default=DEFAULT_SAMPLE_RATE, help="sample rate of the bank")
+    args = parser.parse_args(argv)
+
+    files = asset_index().files()
+    failed = build_packed_bank(files, args.output, sample_rate=args.sample_rate)
+    print(f"Packed {len(files) - len(failed)} samples into {args.output} ({os.path.getsize(args.output)} bytes)")
+    for key, file in failed.items():
+        print(f"Failed to pack {key}: {file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,11 @@
 from music.music_generator import MusicGenerator
-from music.scale import MajorScale, MinorScale
+from music.scale import MajorScale, NaturalMinorScale
 
 # Example usage:
 if __name__ == "__main__":
     # Create a scale instance, e.g., a C major scale
     major = MajorScale('C', use_flats=True)
-    minor = MinorScale('D', use_flats=True)
+    minor = NaturalMinorScale('D', use_flats=True)
     # Create a MusicGenerator instance
     generator = MusicGenerator(major, 15)
 
@@ -0,0 +1,227 @@
+import datetime
+import glob
+import os
+import sqlite3
+
+import numpy as np
+
+DEFAULT_RESULTS_DIR = os.environ.get('MUSIC_RESULTS_DIR',
+                                     os.path.join(os.path.expanduser('~'), '.local', 'share', 'musicFaffing',
+                                                  'results'))
+
+# one append-only file per column, all rows of all takes, named by column and generation
+COLUMNS = {
+    'beat_index': '<i4',
+    'expected': '<f8',
+    'actual': '<f8',
+    'error': '<f8',
+}
+
+PERIODS = {'day': '%Y-%m-%d', 'week': '%Y-W%W', 'month': '%Y-%m', 'year': '%Y'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS takes (
+    take_id TEXT PRIMARY KEY,
+    file TEXT,
+    recorded TEXT NOT NULL,
+    bpm REAL,
+    row_offset INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    beats INTEGER NOT NULL,
+    sum_error REAL NOT NULL,
+    sum_sq_error REAL NOT NULL,
+    mean_error REAL,
+    std_deviation REAL,
+    mean_error_before REAL,
+    mean_error_after REAL,
+    std_before REAL,
+    std_after REAL
+);
+CREATE INDEX IF NOT EXISTS takes_recorded ON takes (recorded);
+CREATE TABLE IF NOT EXISTS generation (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    number INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO generation VALUES (0, 0);
+"""
+
+
+class ResultsStore:
+    """Per-beat timing results of every analysed take, for trend queries without re-analysis.
+
+    Rows (beat index, expected time, actual time, signed error) are appended
+    to one raw binary file per column and read back through ``np.memmap``.
+    A SQLite index maps each take to its row range and recording date and
+    keeps the take's summary statistics, so trends over months come straight
+    from the index. Replacing a take leaves its old rows in the column files
+    until ``vacuum`` drops them, which ``append`` does by itself once they
+    outnumber the rows in use. ``vacuum`` writes the compacted columns as a
+    new generation of files and switches the index to them in one
+    transaction, so a crash leaves either the old or the new files in use.
+    """
+
+    def __init__(self, path=DEFAULT_RESULTS_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(path, 'index.sqlite'))
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+        # column files of other generations were left by an interrupted vacuum
+        current = {self._column_path(name) for name in COLUMNS}
+        for column_path in glob.glob(os.path.join(path, '*.col')):
+            if column_path not in current:
+                os.remove(column_path)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _generation(self):
+        return self.connection.execute('SELECT number FROM generation').fetchone()[0]
+
+    def _column_path(self, name, generation=None):
+        generation = self._generation() if generation is None else generation
+        return os.path.join(self.path, f'{name}.{generation}.col')
+
+    def _rows_in_use(self):
+        row = self.connection.execute('SELECT MAX(row_offset + row_count) FROM takes').fetchone()
+        return row[0] or 0
+
+    def _live_rows(self):
+        row = self.connection.execute('SELECT SUM(row_count) FROM takes').fetchone()
+        return row[0] or 0
+
+    def append(self, take_id, expected, actual, recorded=None, bpm=None, stats=None, replace=False, file=None):
+        """Store the expected and actual beat times of one take.
+
+        ``actual`` may hold NaN for beats without a matching onset. ``stats``
+        are the take's ``timing_error_stats``; ``recorded`` is a ``datetime``
+        (default: now) and ``file`` the path the take was read from. Re-adding an existing ``take_id`` raises ``ValueError``
+        unless ``replace`` is set, in which case the index points at the new rows
+        and the old ones are dropped by the next ``vacuum``.
+        """
+        expected = np.asarray(expected, dtype=float)
+        actual = np.asarray(actual, dtype=float)
+        if expected.shape != actual.shape:
+            raise ValueError(f"Expected and actual beat times differ in length: {expected.shape} != {actual.shape}")
+        exists = self.connection.execute('SELECT 1 FROM takes WHERE take_id = ?', (take_id,)).fetchone()
+        if exists and not replace:
+            raise ValueError(f"Take already stored: {take_id}")
+
+        error = actual - expected
+        matched = error[~np.isnan(error)]
+        recorded = (recorded or datetime.datetime.now()).isoformat(sep=' ', timespec='seconds')
+        columns = {'beat_index': np.arange(len(expected)), 'expected': expected, 'actual': actual, 'error': error}
+
+        offset = self._rows_in_use()
+        for name, dtype in COLUMNS.items():
+            with open(self._column_path(name), 'ab') as f:
+                # drop rows left behind by an append that never reached the index
+                f.truncate(offset * np.dtype(dtype).itemsize)
+                f.write(columns[name].astype(dtype).tobytes())
+
+        stats = stats or {}
+        with self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO takes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (take_id, file, recorded, bpm, offset, len(expected), len(matched), float(matched.sum()),
+                 float(np.square(matched).sum()), stats.get('mean_error'), stats.get('std_deviation'),
+                 stats.get('mean_error_before'), stats.get('mean_error_after'), stats.get('std_before'),
+                 stats.get('std_after')))
+        if exists and self._rows_in_use() > 2 * self._live_rows():
+            self.vacuum()
+
+    def vacuum(self):
+        """Rewrite the column files without the rows of replaced takes and return how many were dropped."""
+        total = self._rows_in_use()
+        dropped = total - self._live_rows()
+        if not dropped:
+            return 0
+        takes = self.connection.execute(
+            'SELECT take_id, row_offset, row_count FROM takes ORDER BY row_offset').fetchall()
+        keep = np.concatenate([np.arange(take['row_offset'], take['row_offset'] + take['row_count']) for take in takes])
+        columns = self._columns()
+        generation = self._generation()
+        for name, dtype in COLUMNS.items():
+            with open(self._column_path(name, generation + 1), 'wb') as f:
+                f.write(np.asarray(columns[name][keep], dtype=dtype).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        del columns
+        offsets = np.concatenate(([0], np.cumsum([take['row_count'] for take in takes])[:-1]))
+        with self.connection:
+            self.connection.executemany('UPDATE takes SET row_offset = ? WHERE take_id = ?',
+                                        [(int(offset), take['take_id']) for offset, take in zip(offsets, takes)])
+            self.connection.execute('UPDATE generation SET number = ?', (generation + 1,))
+        for name in COLUMNS:
+            os.remove(self._column_path(name, generation))
+        return dropped
+
+    def takes(self, since=None, until=None):
+        """Index rows of the takes recorded in ``[since, until)``, oldest first."""
+        query, params = 'SELECT * FROM takes', []
+        conditions = []
+        if since is not None:
+            conditions.append('recorded >= ?')
+            params.append(since.isoformat(sep=' '))
+        if until is not None:
+            conditions.append('recorded < ?')
+            params.append(until.isoformat(sep=' '))
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        return [dict(row) for row in self.connection.execute(query + ' ORDER BY recorded, take_id', params)]
+
+    def _columns(self):
+        total = self._rows_in_use()
+        if not total:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()}
+        return {name: np.memmap(self._column_path(name), dtype=dtype, mode='r', shape=(total,))
+                for name, dtype in COLUMNS.items()}
+
+    def beats(self, take_id):
+        """Per-beat columns of one take as a dict of arrays."""
+        row = self.connection.execute('SELECT row_offset, row_count FROM takes WHERE take_id = ?',
+                                      (take_id,)).fetchone()
+        if row is None:
+            raise KeyError(take_id)
+        start, stop = row['row_offset'], row['row_offset'] + row['row_count']
+        return {name: np.array(column[start:stop]) for name, column in self._columns().items()}
+
+    def query(self, since=None, until=None):
+        """Per-beat columns of every take recorded in ``[since, until)``, plus a ``take_id`` column."""
+        takes = self.takes(since, until)
+        columns = self._columns()
+        slices = [slice(take['row_offset'], take['row_offset'] + take['row_count']) for take in takes]
+        result = {name: np.concatenate([column[s] for s in slices]) if slices else np.empty(0, dtype=column.dtype)
+                  for name, column in columns.items()}
+        result['take_id'] = np.repeat([take['take_id'] for take in takes], [take['row_count'] for take in takes])
+        return result
+
+    def trend(self, period='week', since=None, until=None):
+        """Pooled mean and standard deviation of the timing error per ``period``.
+
+        ``period`` is one of ``'day'``, ``'week'``, ``'month'`` or ``'year'``.
+        Computed from the index alone, without reading any per-beat rows.
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Unknown period: {period}")
+        query = f"""
+            SELECT strftime('{PERIODS[period]}', recorded) AS period, COUNT(*) AS takes, SUM(beats) AS beats,
+                   SUM(sum_error) AS sum_error, SUM(sum_sq_error) AS sum_sq_error
+            FROM takes WHERE recorded >= ? AND recorded < ? GROUP BY period ORDER BY period
+        """
+        since = '' if since is None else since.isoformat(sep=' ')
+        until = '~' if until is None else until.isoformat(sep=' ')
+        trend = []
+        for row in self.connection.execute(query, (since, until)):
+            beats = row['beats']
+            mean = row['sum_error'] / beats if beats else 0.0
+            variance = row['sum_sq_error'] / beats - mean ** 2 if beats else 0.0
+            trend.append({'period': row['period'], 'takes': row['takes'], 'beats': beats,
+                          'mean_error': mean, 'std_deviation': float(np.sqrt(max(variance, 0.0)))})
+        return trend
@@ -0,0 +1,58 @@
+import os
+import wave
+from collections import namedtuple
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+
+# the generators' file tables are relative to the package directory
+MUSIC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Sample(namedtuple('Sample', ['audio_data', 'num_channels', 'bytes_per_sample', 'sample_rate'])):
+    """Raw PCM of one asset, in the argument order of ``simpleaudio.play_buffer``."""
+    __slots__ = ()
+
+
+def read_sample(path):
+    """Read a WAV file into an immutable ``Sample``."""
+    with wave.open(path, 'rb') as wav:
+        return Sample(wav.readframes(wav.getnframes()), wav.getnchannels(), wav.getsampwidth(),
+                      wav.getframerate())
+
+
+class SampleBank(Mapping):
+    """Every sample of a ``{key: path}`` table, read from disk once, up front and in parallel.
+
+    Behaves as a read-only mapping from key to ``Sample`` so that playback
+    does no file I/O. Entries whose file cannot be read are listed in
+    ``missing`` and raise ``KeyError`` when looked up.
+    """
+
+    def __init__(self, files, base_dir=MUSIC_DIR, max_workers=None):
+        keys = list(files)
+        paths = [os.path.join(base_dir, files[key]) for key in keys]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            loaded = list(executor.map(self._try_read, paths))
+        self._samples = {key: sample for key, sample in zip(keys, loaded) if sample is not None}
+        self.missing = {key: files[key] for key, sample in zip(keys, loaded) if sample is None}
+
+    @staticmethod
+    def _try_read(path):
+        try:
+            return read_sample(path)
+        except (OSError, EOFError, wave.Error):
+            return None
+
+    def __getitem__(self, key):
+        try:
+            return self._samples[key]
+        except KeyError:
+            if key in self.missing:
+                raise KeyError(f"Sample for {key!r} could not be loaded from {self.missing[key]}") from None
+            raise
+
+    def __iter__(self):
+        return iter(self._samples)
+
+    def __len__(self):
+        return len(self._samples)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from types import MappingProxyType
+
 
 class Scale:
     # notes
@@ -12,73 +14,131 @@ class Scale:
     INTERVALS_FLAT = {0: '1', 1: 'b2', 2: '2', 3: 'b3', 4: '3', 5: '4', 6: 'b5', 7: '5', 8: 'b6', 9: '6', 10: 'b7',
                       11: '7'}
 
-    def __init__(self, root, use_flats=False):
+    # semitones above C of every note name, sharp or flat
+    PITCH_CLASSES = {**{note: i for i, note in enumerate(FLAT_NOTES)}, **{note: i for i, note in enumerate(SHARP_NOTES)}}
+
+    # every distinct scale is built once and shared
+    _instances = {}
+
+    __slots__ = ('root', 'use_flats', 'notes', 'intervals', 'scale_notes', 'scale_intervals', 'note_for_interval',
+                 'degree_of_note', 'mask', '_args')
+    # semitones above the root; a class attribute of each kind of scale
+    scale_degrees = ()
+
+    def __new__(cls, root, use_flats=False):
+        key = (cls, root, use_flats)
+        scale = cls._instances.get(key)
+        if scale is None:
+            scale = super().__new__(cls)
+            scale._setup(root, use_flats)
+            scale = cls._instances.setdefault(key, scale)
+        return scale
+
+    def _setup(self, root, use_flats, args=None):
+        """Work out everything about the scale once; it cannot change afterwards."""
         if root not in self.SHARP_NOTES and root not in self.FLAT_NOTES:
             raise ValueError(f"Invalid root note: {root}")
-        self.root = root
-        self.use_flats = use_flats
-        self.scale_degrees = []
-        self.notes = self.FLAT_NOTES if use_flats else self.SHARP_NOTES
-        self.intervals = self.INTERVALS_FLAT if self.use_flats else self.INTERVALS_SHARP
+        # copies, so that nothing reached through a scale can change the shared class tables
+        notes = tuple(self.FLAT_NOTES if use_flats else self.SHARP_NOTES)
+        intervals = MappingProxyType(dict(self.INTERVALS_FLAT if use_flats else self.INTERVALS_SHARP))
+        root_index = self.PITCH_CLASSES[root]
+        scale_notes = tuple(notes[(root_index + semitone) % len(notes)] for semitone in self.scale_degrees)
+        scale_intervals = tuple(intervals[degree] for degree in self.scale_degrees)
+        # scale degrees count from 1, as in ChordProgression
+        degree_of_note = MappingProxyType({note: i for i, note in enumerate(scale_notes, 1)})
+        mask = 0
+        for semitone in self.scale_degrees:
+            mask |= 1 << (root_index + semitone) % 12
+        for name, value in (('root', root), ('use_flats', use_flats), ('notes', notes), ('intervals', intervals),
+                            ('scale_notes', scale_notes), ('scale_intervals', scale_intervals),
+                            ('note_for_interval', MappingProxyType(dict(zip(scale_intervals, scale_notes)))),
+                            ('degree_of_note', degree_of_note),
+                            ('mask', mask), ('_args', args or (root, use_flats))):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __reduce__(self):
+        # unpickling goes through __new__, so it returns the shared instance
+        return self.__class__, self._args
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}{self._args!r}"
 
     def build_scale(self):
         """Builds the scale based on scale degrees."""
-        root_index = self.notes.index(self.root)
-        return [self.notes[(root_index + semitone) % len(self.notes)] for semitone in self.scale_degrees]
+        return list(self.scale_notes)
 
     def get_intervals(self):
         """Returns the intervals of the scale."""
-        return [self.intervals[degree] for degree in self.scale_degrees]
+        return list(self.scale_intervals)
 
     def __str__(self):
         return f"{self.__class__.__name__} in {self.root}: " + ' '.join(self.build_scale())
 
+    @classmethod
+    def spell(cls, mask, use_flats=False):
+        """The note names of the pitch classes in ``mask``, with sharps or flats."""
+        notes = cls.FLAT_NOTES if use_flats else cls.SHARP_NOTES
+        return {notes[pitch_class] for pitch_class in range(12) if mask >> pitch_class & 1}
+
     def what_do_i_have_that_you_do_not(self, other_scale):
-        """Returns the set difference between this scale and another."""
-        my_notes = set(self.build_scale())
-        other_notes = set(other_scale.build_scale())
-        return my_notes.difference(other_notes)
+        """Returns the set difference between this scale and another, spelled as in this scale."""
+        return self.spell(self.mask & ~other_scale.mask, self.use_flats)
 
     def what_do_you_have_i_do_not(self, other_scale):
-        """Returns the set difference between this scale and another."""
-        my_notes = set(self.build_scale())
-        other_notes = set(other_scale.build_scale())
-        return other_notes.difference(my_notes)
+        """Returns the set difference between another scale and this one, spelled as in the other scale."""
+        return self.spell(other_scale.mask & ~self.mask, other_scale.use_flats)
 
     def union(self, other_scale:Scale):
-        """Returns the union of this scale and another."""
-        my_notes = set(self.build_scale())
-        # normalize the scale accidental convension
-        other_scale = other_scale.to_flats() if self.use_flats else other_scale.to_sharps()
-        other_notes = set(other_scale.build_scale())
+        """Returns the union of this scale and another, spelled as in this scale."""
+        return self.spell(self.mask | other_scale.mask, self.use_flats)
 
-        return my_notes.union(other_notes)
+    def intersection(self, other_scale:Scale):
+        """Returns the notes this scale shares with another, spelled as in this scale."""
+        return self.spell(self.mask & other_scale.mask, self.use_flats)
 
     def to_flats(self) -> Scale:
         """Converts the scale's notes from sharps to flats."""
-        flat_root = self.root
-        if not self.use_flats:
-            flat_root = self.FLAT_NOTES[self.SHARP_NOTES.index(self.root)]
-        return self.__class__(flat_root, use_flats=True)
+        return self._respelled(True)
 
     def to_sharps(self) -> Scale:
-        """Converts the scale's notes from sharps to flats."""
-        sharp_root = self.root
-        if self.use_flats:
-            sharp_root = self.SHARP_NOTES[self.FLAT_NOTES.index(self.root)]
-        return self.__class__(sharp_root, use_flats=False)
+        """Converts the scale's notes from flats to sharps."""
+        return self._respelled(False)
+
+    def _respelled(self, use_flats):
+        if use_flats == self.use_flats:
+            return self
+        # by pitch class, as the root may be spelled either way whatever use_flats says
+        notes_to = self.FLAT_NOTES if use_flats else self.SHARP_NOTES
+        return self.__class__(*self._respell_args(notes_to[self.PITCH_CLASSES[self.root]]), use_flats=use_flats)
+
+    def _respell_args(self, root):
+        return (root,)
 
 
 class PentatonicScale(Scale):
-    def __init__(self, scale_string, use_flats=False):
-        root, scale_type = self.parse_scale_string(scale_string)
-        super().__init__(root, use_flats)
-        if scale_type == 'm':
-            # Pentatonic minor: root, minor third, fourth, fifth, minor seventh
-            self.scale_degrees = [0, 3, 5, 7, 10]
-        else:
-            # Pentatonic major: root, major second, major third, fifth, major sixth
-            self.scale_degrees = [0, 2, 4, 7, 9]
+    __slots__ = ('scale_degrees',)
+
+    def __new__(cls, scale_string, use_flats=False):
+        key = (cls, scale_string, use_flats)
+        scale = cls._instances.get(key)
+        if scale is None:
+            root, scale_type = cls.parse_scale_string(scale_string)
+            scale = object.__new__(cls)
+            if scale_type == 'm':
+                # Pentatonic minor: root, minor third, fourth, fifth, minor seventh
+                object.__setattr__(scale, 'scale_degrees', (0, 3, 5, 7, 10))
+            else:
+                # Pentatonic major: root, major second, major third, fifth, major sixth
+                object.__setattr__(scale, 'scale_degrees', (0, 2, 4, 7, 9))
+            scale._setup(root, use_flats, (scale_string, use_flats))
+            scale = cls._instances.setdefault(key, scale)
+        return scale
 
     @staticmethod
     def parse_scale_string(scale_string):
@@ -88,79 +148,84 @@ class PentatonicScale(Scale):
         else:
             return scale_string, 'M'
 
+    def _respell_args(self, root):
+        return (root + 'm' if self._args[0].endswith('m') else root,)
+
 
 class MajorScale(Scale):
-    def __init__(self, root, use_flats=False):
-        super().__init__(root, use_flats)
-        # Major scale: root, major second, major third, perfect fourth, perfect fifth, major sixth, major seventh
-        self.scale_degrees = [0, 2, 4, 5, 7, 9, 11]
+    __slots__ = ()
+    # Major scale: root, major second, major third, perfect fourth, perfect fifth, major sixth, major seventh
+    scale_degrees = (0, 2, 4, 5, 7, 9, 11)
 
 
 class NaturalMinorScale(Scale):
-    def __init__(self, root, use_flats=False):
-        super().__init__(root, use_flats)
-        # Natural minor scale: root, major second, minor third, perfect fourth, perfect fifth, minor sixth, minor seventh
-        self.scale_degrees = [0, 2, 3, 5, 7, 8, 10]
+    __slots__ = ()
+    # Natural minor scale: root, major second, minor third, perfect fourth, perfect fifth, minor sixth, minor seventh
+    scale_degrees = (0, 2, 3, 5, 7, 8, 10)
 
 
 class HarmonicMinorScale(Scale):
-    def __init__(self, root, use_flats=False):
-        super().__init__(root, use_flats)
-        # Harmonic minor scale: root, major second, minor third, perfect fourth, perfect fifth, minor sixth, major seventh
-        self.scale_degrees = [0, 2, 3, 5, 7, 8, 11]
+    __slots__ = ()
+    # Harmonic minor scale: root, major second, minor third, perfect fourth, perfect fifth, minor sixth, major seventh
+    scale_degrees = (0, 2, 3, 5, 7, 8, 11)
 
 
 class MelodicMinorScale(Scale):
-    def __init__(self, root, use_flats=False):
-        super().__init__(root, use_flats)
-        # Melodic minor scale: root, major second, minor third, perfect fourth, perfect fifth, major sixth, major seventh
-        self.scale_degrees = [0, 2, 3, 5, 7, 9, 11]
+    __slots__ = ()
+    # Melodic minor scale: root, major second, minor third, perfect fourth, perfect fifth, major sixth, major seventh
+    scale_degrees = (0, 2, 3, 5, 7, 9, 11)
 
 
 class IonianScale(Scale):
-    def __init__(self, root, use_flats=False):
-        super().__init__(root, use_flats)
-        # Ionian mode (same as Major scale)
-        self.scale_degrees = [0, 2, 4, 5, 7, 9, 11]
+    __slots__ = ()
+    # Ionian mode (same as Major scale)
+    scale_degrees = (0, 2, 4, 5, 7, 9, 11)
 
 
 class DorianScale(Scale):
-    def __init__(self, root, use_flats=False):
-        super().__init__(root, use_flats)
-        # Dorian mode
-        self.scale_degrees = [0, 2, 3, 5, 7, 9, 10]
+    __slots__ = ()
+    # Dorian mode
+    scale_degrees = (0, 2, 3, 5, 7, 9, 10)
 
 
 class PhrygianScale(Scale):
-    def __init__(self, root, use_flats=False):
-        super().__init__(root, use_flats)
-        # Phrygian mode
-        self.scale_degrees = [0, 1, 3, 5, 7, 8, 10]
+    __slots__ = ()
+    # Phrygian mode
+    scale_degrees = (0, 1, 3, 5, 7, 8, 10)
 
 
 class LydianScale(Scale):
-    def __init__(self, root, use_flats=False):
-        super().__init__(root, use_flats)
-        # Lydian mode
-        self.scale_degrees = [0, 2, 4, 6, 7, 9, 11]
+    __slots__ = ()
+    # Lydian mode
+    scale_degrees = (0, 2, 4, 6, 7, 9, 11)
 
 
 class MixolydianScale(Scale):
-    def __init__(self, root, use_flats=False):
-        super().__init__(root, use_flats)
-        # Mixolydian mode
-        self.scale_degrees = [0, 2, 4, 5, 7, 9, 10]
+    __slots__ = ()
+    # Mixolydian mode
+    scale_degrees = (0, 2, 4, 5, 7, 9, 10)
 
 
 class AeolianScale(Scale):
-    def __init__(self, root, use_flats=False):
-        super().__init__(root, use_flats)
-        # Aeolian mode (same as Natural Minor scale)
-        self.scale_degrees = [0, 2, 3, 5, 7, 8, 10]
+    __slots__ = ()
+    # Aeolian mode (same as Natural Minor scale)
+    scale_degrees = (0, 2, 3, 5, 7, 8, 10)
 
 
 class LocrianScale(Scale):
-    def __init__(self, root, use_flats=False):
-        super().__init__(root, use_flats)
-        # Locrian mode
-        self.scale_degrees = [0, 1, 3, 5, 6, 8, 10]
+    __slots__ = ()
+    # Locrian mode
+    scale_degrees = (0, 1, 3, 5, 6, 8, 10)
+
+
+def all_scales():
+    """Every scale class on every root, in both sharp and flat spelling."""
+    scales = []
+    for use_flats, roots in ((False, Scale.SHARP_NOTES), (True, Scale.FLAT_NOTES)):
+        for root in roots:
+            for scale_class in Scale.__subclasses__():
+                if scale_class is PentatonicScale:
+                    scales += [PentatonicScale(root, use_flats), PentatonicScale(root + 'm', use_flats)]
+                else:
+                    scales.append(scale_class(root, use_flats))
+    return scales
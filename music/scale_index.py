@@ -0,0 +1,91 @@
+from functools import lru_cache
+
+import numpy as np
+
+from music.scale import Scale, all_scales
+
+# number of set bits of every 12-bit mask
+POPCOUNT = np.array([bin(mask).count('1') for mask in range(1 << 12)])
+# bit i of every pitch class, for turning masks into membership rows
+BITS = 1 << np.arange(12)
+
+
+def notes_mask(notes):
+    """The 12-bit pitch-class mask of ``notes``: an iterable of note names or pitch classes, or a mask already."""
+    if isinstance(notes, int):
+        return notes & 0xFFF
+    mask = 0
+    for note in notes:
+        mask |= 1 << (Scale.PITCH_CLASSES[note] if isinstance(note, str) else note % 12)
+    return mask
+
+
+class ScaleIndex:
+    """Every scale class on every root and spelling (see ``all_scales``), looked up by content.
+
+    The masks of all scales are held in one array, so each query is a
+    single vectorised comparison. Subset and superset results are cached
+    per query mask (there are only 4096) and returned as tuples in registry
+    order, so repeated queries, e.g. one per keystroke, are a dictionary
+    lookup.
+    """
+
+    def __init__(self, scales=None):
+        self.scales = tuple(all_scales() if scales is None else scales)
+        self.masks = np.array([scale.mask for scale in self.scales], dtype=np.int64)
+        self._by_mask = {}
+        for scale, mask in zip(self.scales, self.masks.tolist()):
+            self._by_mask.setdefault(mask, []).append(scale)
+        # one row of pitch-class membership per scale, for weighted scoring
+        self._members = (self.masks[:, None] & BITS) != 0
+        self._roots = np.array([Scale.PITCH_CLASSES[scale.root] for scale in self.scales])
+        self._supersets = {}
+        self._subsets = {}
+
+    def __len__(self):
+        return len(self.scales)
+
+    def exact(self, notes):
+        """Scales made of exactly ``notes``."""
+        return tuple(self._by_mask.get(notes_mask(notes), ()))
+
+    def scales_containing(self, notes):
+        """Scales that include every one of ``notes`` (supersets)."""
+        mask = notes_mask(notes)
+        if mask not in self._supersets:
+            self._supersets[mask] = self._select((self.masks & mask) == mask)
+        return self._supersets[mask]
+
+    def scales_within(self, notes):
+        """Scales whose notes are all among ``notes`` (subsets)."""
+        mask = notes_mask(notes)
+        if mask not in self._subsets:
+            self._subsets[mask] = self._select((self.masks & ~mask) == 0)
+        return self._subsets[mask]
+
+    def _select(self, selected):
+        return tuple(self.scales[i] for i in np.flatnonzero(selected))
+
+    def best_fit(self, notes, limit=10):
+        """Rank scales by how well they cover a melody, best first, as ``(scale, score)`` pairs.
+
+        ``notes`` may repeat; each note counts once per occurrence. The score
+        is the fraction of the melody's notes that are in the scale. Ties go
+        to scales with fewer notes outside the melody, then to scales rooted
+        on the melody's first note.
+        """
+        notes = list(notes)
+        if not notes:
+            return []
+        pitch_classes = [Scale.PITCH_CLASSES[note] if isinstance(note, str) else note % 12 for note in notes]
+        weights = np.bincount(pitch_classes, minlength=12)
+        scores = self._members @ weights / len(pitch_classes)
+        extra = POPCOUNT[self.masks & ~notes_mask(pitch_classes) & 0xFFF]
+        order = np.lexsort((self._roots != pitch_classes[0], extra, -scores))[:limit]
+        return [(self.scales[i], float(scores[i])) for i in order]
+
+
+@lru_cache(maxsize=None)
+def scale_index():
+    """The ``ScaleIndex`` of every scale, built once per process."""
+    return ScaleIndex()
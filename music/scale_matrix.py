@@ -0,0 +1,93 @@
+import numpy as np
+
+from music.scale import PentatonicScale, Scale
+
+# marks the unused columns of scales shorter than seven notes
+PAD = -1
+WIDTH = 7
+# the pitch classes C to B, for tables in every key
+ALL_ROOTS = np.arange(12)
+
+
+def _scale_types():
+    types = {}
+    for scale_class in Scale.__subclasses__():
+        if scale_class is PentatonicScale:
+            types['Pentatonic'] = PentatonicScale('C').scale_degrees
+            types['PentatonicMinor'] = PentatonicScale('Cm').scale_degrees
+        else:
+            types[scale_class.__name__[:-len('Scale')]] = scale_class.scale_degrees
+    return types
+
+
+# semitones above the root of every kind of scale, by name: 'Major', 'Dorian', 'PentatonicMinor', ...
+SCALE_TYPES = _scale_types()
+TYPE_NAMES = tuple(SCALE_TYPES)
+# one row of degrees per scale type, padded with PAD
+DEGREES = np.full((len(TYPE_NAMES), WIDTH), PAD, dtype=np.int8)
+for _i, _degrees in enumerate(SCALE_TYPES.values()):
+    DEGREES[_i, :len(_degrees)] = _degrees
+LENGTHS = (DEGREES != PAD).sum(axis=1)
+
+# note names indexed by pitch class; PAD (-1) picks the trailing empty string
+SPELLINGS = {False: np.array(Scale.SHARP_NOTES + ['']), True: np.array(Scale.FLAT_NOTES + [''])}
+
+
+def type_codes(scale_types):
+    """Row numbers in ``DEGREES`` of scale types given as names, ``Scale`` subclasses or row numbers, keeping the shape."""
+    if isinstance(scale_types, np.ndarray) and scale_types.dtype.kind in 'iu':
+        return scale_types
+    codes = []
+    for scale_type in np.ravel(np.asarray(scale_types, dtype=object)):
+        if isinstance(scale_type, (int, np.integer)):
+            codes.append(scale_type)
+            continue
+        name = scale_type.__name__[:-len('Scale')] if isinstance(scale_type, type) else scale_type
+        if name not in SCALE_TYPES:
+            raise ValueError(f"Unknown scale type: {scale_type}")
+        codes.append(TYPE_NAMES.index(name))
+    return np.array(codes, dtype=np.intp).reshape(np.shape(scale_types))
+
+
+def root_codes(roots):
+    """Pitch classes of roots given as note names or integers, keeping the shape."""
+    roots = np.asarray(roots)
+    if roots.dtype.kind in 'iu':
+        return roots % 12
+    return np.vectorize(Scale.PITCH_CLASSES.__getitem__, otypes=[np.intp])(roots)
+
+
+def scale_matrix(roots, scale_types):
+    """Pitch classes of many scales at once, as ``(matrix, lengths)``.
+
+    ``roots`` and ``scale_types`` are broadcast against each other, so
+    ``scale_matrix(ALL_ROOTS[:, None], TYPE_NAMES)`` is every scale type in
+    every key. ``matrix`` has that shape plus a last axis of ``WIDTH``
+    pitch classes, padded with ``PAD`` after the notes of shorter scales;
+    ``lengths`` gives the number of notes of each scale.
+    """
+    roots, codes = np.broadcast_arrays(root_codes(roots), type_codes(scale_types))
+    degrees = DEGREES[codes]
+    matrix = np.where(degrees == PAD, PAD, (roots[..., None] + degrees) % 12).astype(np.int8)
+    return matrix, LENGTHS[codes]
+
+
+def transpose(matrix, semitones):
+    """``matrix`` of pitch classes moved up by ``semitones`` (broadcast over its leading axes), padding kept."""
+    semitones = np.asarray(semitones)[..., None]
+    return np.where(matrix == PAD, PAD, (matrix + semitones) % 12).astype(np.int8)
+
+
+def masks(matrix):
+    """The 12-bit pitch-class mask (see ``Scale.mask``) of every row of ``matrix``."""
+    return np.where(matrix == PAD, 0, 1 << matrix.astype(np.int64)).sum(axis=-1)
+
+
+def spell(matrix, use_flats=False):
+    """Note names of a pitch-class matrix, with empty strings for the padding."""
+    return SPELLINGS[bool(use_flats)][matrix]
+
+
+def all_keys(scale_types=TYPE_NAMES):
+    """``scale_matrix`` of ``scale_types`` on every root: shape ``(12, len(scale_types), WIDTH)``."""
+    return scale_matrix(ALL_ROOTS[:, None], np.asarray(scale_types, dtype=object)[None, :])
@@ -0,0 +1,210 @@
+import os
+import time
+import wave
+from math import gcd
+
+import numpy as np
+
+# most of the recorded assets are 48 kHz mono
+DEFAULT_SAMPLE_RATE = 48000
+# seconds of audio mixed and handed to the player at a time
+DEFAULT_BLOCK_SECONDS = 0.5
+# headroom so that a few overlapping samples do not clip
+MIX_GAIN = 0.5
+
+
+def pcm_to_float(raw, width):
+    """Convert little-endian integer PCM bytes of ``width`` bytes per sample to float32 in [-1, 1]."""
+    if width == 1:
+        # 8 bit WAV is unsigned
+        return (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    if width == 3:
+        packed = np.frombuffer(raw, dtype=np.uint8).reshape((-1, 3))
+        samples = np.zeros((len(packed), 4), dtype=np.uint8)
+        samples[:, 1:] = packed
+        return samples.view('<i4').ravel().astype(np.float32) / 2 ** 31
+    return np.frombuffer(raw, dtype=f'<i{width}').astype(np.float32) / 2 ** (8 * width - 1)
+
+
+def sample_to_float(sample, sample_rate=DEFAULT_SAMPLE_RATE):
+    """Decode a ``Sample`` to a mono float32 array in [-1, 1] at ``sample_rate``."""
+    data = pcm_to_float(sample.audio_data, sample.bytes_per_sample)
+    data = data.reshape((-1, sample.num_channels)).mean(axis=1)
+    if sample.sample_rate != sample_rate:
+        from scipy.signal import resample_poly
+        divisor = gcd(sample_rate, sample.sample_rate)
+        data = resample_poly(data, sample_rate // divisor, sample.sample_rate // divisor).astype(np.float32)
+    return data
+
+
+def beat_events(keys, bpm, start=0.0):
+    """Pair each key with the time of its beat: ``(start + i * 60 / bpm, key)``.
+
+    A ``None`` key leaves its beat silent.
+    """
+    beat = 60 / bpm
+    for i, key in enumerate(keys):
+        if key is not None:
+            yield start + i * beat, key
+
+
+def to_pcm16(block):
+    """Convert a float block to 16-bit PCM bytes, clipping anything out of range."""
+    return (np.clip(block, -1, 1) * 32767).astype('<i2').tobytes()
+
+
+def write_audio(path, mix, sample_rate):
+    """Write a mono float mix as 16-bit PCM.
+
+    ``.wav`` files are written with the standard library. Other extensions
+    (e.g. ``.flac``) are encoded through pydub, which needs ffmpeg.
+    """
+    pcm = to_pcm16(mix)
+    if path.lower().endswith('.wav'):
+        with wave.open(path, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(sample_rate)
+            wav.writeframes(pcm)
+    else:
+        from pydub import AudioSegment
+        audio = AudioSegment(data=pcm, sample_width=2, frame_rate=sample_rate, channels=1)
+        audio.export(path, format=os.path.splitext(path)[1][1:].lower())
+
+
+class Sequencer:
+    """Mixes timed samples into one output stream on an absolute sample clock.
+
+    Events are ``(time, key)`` pairs where ``time`` is in seconds from the
+    start of the stream and ``key`` names a sample in ``samples`` (a mapping
+    of key to ``Sample``, such as a ``SampleBank``). Every event starts on the
+    sample nearest its time, and overlapping notes, chords and clicks are
+    summed, so the tempo does not depend on sample lengths or on how long
+    playback calls take.
+    """
+
+    def __init__(self, samples, sample_rate=DEFAULT_SAMPLE_RATE, gain=MIX_GAIN):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.gain = gain
+        self._buffers = {}
+        self._pcm = {}
+
+    def buffer(self, key):
+        """The decoded, resampled and scaled audio for ``key``, converted once and reused."""
+        if key not in self._buffers:
+            data = sample_to_float(self.samples[key], self.sample_rate) * self.gain
+            data.flags.writeable = False
+            self._buffers[key] = data
+        return self._buffers[key]
+
+    def preload(self, keys=None):
+        """Convert the samples of ``keys`` (default: every key of ``samples``) now rather than on first use.
+
+        Decoding and resampling are too slow for the playback thread or an
+        event loop, so generators preload everything they can play.
+        """
+        for key in self.samples if keys is None else keys:
+            self.buffer(key)
+
+    def stream(self, events, block_size=None):
+        """Yield consecutive float32 blocks of the mix of ``events``.
+
+        ``events`` may be infinite but must be in time order; it is only read
+        as far as the block being mixed. Samples that ring past the end of a
+        block carry over into the next one. The stream ends when the events
+        run out and the last sample has finished.
+        """
+        block_size = block_size or int(DEFAULT_BLOCK_SECONDS * self.sample_rate)
+        events = iter(events)
+        pending = next(events, None)
+        voices = []  # (first sample, audio) of everything still sounding
+        block_start = 0
+        while pending is not None or voices:
+            block_end = block_start + block_size
+            while pending is not None and round(pending[0] * self.sample_rate) < block_end:
+                voices.append((round(pending[0] * self.sample_rate), self.buffer(pending[1])))
+                pending = next(events, None)
+
+            block = np.zeros(block_size, dtype=np.float32)
+            for start, data in voices:
+                lo, hi = max(start, block_start), min(start + len(data), block_end)
+                if lo < hi:
+                    block[lo - block_start:hi - block_start] += data[lo - start:hi - start]
+            voices = [(start, data) for start, data in voices if start + len(data) > block_end]
+            yield block
+            block_start = block_end
+
+    def render(self, events, duration=None):
+        """Mix a finite sequence of events into a single float32 array in one pass.
+
+        The output is sized from the event times and sample lengths up
+        front and every sample is added in place, which is much cheaper than
+        streaming when the whole exercise is known. It lasts at least
+        ``duration`` seconds, by default the ``duration`` of ``events`` if it
+        has one (e.g. an ``ExercisePlan``), so that trailing silent beats are
+        kept.
+        """
+        if duration is None:
+            duration = getattr(events, 'duration', 0.0)
+        events = [(round(t * self.sample_rate), self.buffer(key)) for t, key in events]
+        length = max([round(duration * self.sample_rate)] + [start + len(data) for start, data in events])
+        mix = np.zeros(length, dtype=np.float32)
+        for start, data in events:
+            mix[start:start + len(data)] += data
+        return mix
+
+    def render_to_file(self, events, path):
+        """Render ``events`` offline and write the mix to ``path`` (see ``write_audio``)."""
+        write_audio(path, self.render(events), self.sample_rate)
+
+    def play(self, events, play_buffer, block_size=None, latency=0.1, recorder=None):
+        """Play ``events`` in real time through ``play_buffer``, e.g. a ``music.backends`` backend.
+
+        Every start time is a fixed offset from a monotonic start time
+        ``latency`` seconds ahead, so scheduling delays never accumulate into
+        tempo drift. A backend whose streams the OS mixes (``mixes_streams``,
+        such as ``SimpleaudioBackend``) gets the whole sample of each event
+        at its own time, so a note is never split between two buffers. Any
+        other backend, such as a file writer, gets the mix as consecutive
+        blocks of ``block_size`` samples. A ``TimingRecorder`` passed as
+        ``recorder`` gets the scheduled and actual start time of every event
+        (and of every block).
+        """
+        if getattr(play_buffer, 'mixes_streams', False):
+            self._play_events(events, play_buffer, latency, recorder)
+            return
+        block_size = block_size or int(DEFAULT_BLOCK_SECONDS * self.sample_rate)
+        if recorder is not None:
+            events = recorder.track(events)
+        start = time.monotonic() + latency
+        play_obj = None
+        for k, block in enumerate(self.stream(events, block_size)):
+            scheduled = start + k * block_size / self.sample_rate
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            play_obj = play_buffer(to_pcm16(block), 1, 2, self.sample_rate)
+            if recorder is not None:
+                recorder.block_started(scheduled, time.monotonic(), k * block_size, (k + 1) * block_size,
+                                       self.sample_rate)
+        if play_obj is not None:
+            play_obj.wait_done()
+
+    def _play_events(self, events, play_buffer, latency, recorder):
+        """Start each event's own PCM buffer at its scheduled time and wait for all of them to finish."""
+        start = time.monotonic() + latency
+        playing = []
+        for t, key in events:
+            if key not in self._pcm:
+                self._pcm[key] = to_pcm16(self.buffer(key))
+            scheduled = start + t
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            playing = [play_obj for play_obj in playing if play_obj.is_playing()]
+            playing.append(play_buffer(self._pcm[key], 1, 2, self.sample_rate))
+            if recorder is not None:
+                recorder.record(scheduled)
+        for play_obj in playing:
+            play_obj.wait_done()
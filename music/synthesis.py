@@ -0,0 +1,169 @@
+import logging
+import re
+from collections.abc import Mapping
+from functools import lru_cache
+
+import numpy as np
+
+from music.chord_progression import CHORD_INTERVALS, ChordProgression
+from music.sample_bank import Sample
+from music.scale import Scale
+from music.sequencer import DEFAULT_SAMPLE_RATE, to_pcm16
+
+logger = logging.getLogger(__name__)
+
+# seconds rendered per note or chord, about as long as the recorded samples
+DEFAULT_DURATION = 2.0
+# rendered buffers kept by render_pitches
+CACHE_SIZE = 256
+# MIDI number of the C that note names and chord roots are placed above
+BASE_MIDI = 60
+# peak level of a rendered buffer, leaving headroom for mixing
+PEAK = 0.5
+ATTACK_SECONDS = 0.005
+
+# 'CSharp' -> 'C#', the reverse of the spelling used in chord keys
+CHORD_ROOTS = {name: note for note, name in ChordProgression.note_mapping.items()}
+
+CHORD_KEY_PATTERN = re.compile(r'([A-G](?:Sharp|Flat)?)(' + '|'.join(sorted(CHORD_INTERVALS, key=len, reverse=True)) + ')')
+
+
+def midi_frequency(midi):
+    """Frequency in Hz of a MIDI note number (A4 = 69 = 440 Hz)."""
+    return 440.0 * 2 ** ((np.asarray(midi, dtype=float) - 69) / 12)
+
+
+def chord_pitches(root, quality, base_midi=BASE_MIDI):
+    """MIDI numbers of a root-position chord on ``root`` (a note name) in the octave from ``base_midi``."""
+    if quality not in CHORD_INTERVALS:
+        raise ValueError(f"Unknown chord quality: {quality}")
+    return tuple(base_midi + Scale.PITCH_CLASSES[root] + interval for interval in CHORD_INTERVALS[quality])
+
+
+def key_pitches(key, base_midi=BASE_MIDI):
+    """MIDI numbers for a sample key: a note name (``'F#'``) or a chord key (``'FSharpMinor7'``)."""
+    if key in Scale.PITCH_CLASSES:
+        return (base_midi + Scale.PITCH_CLASSES[key],)
+    match = CHORD_KEY_PATTERN.fullmatch(key)
+    if match is None:
+        raise ValueError(f"Cannot synthesize {key!r}: not a note or chord")
+    return chord_pitches(CHORD_ROOTS.get(match[1], match[1]), match[2], base_midi)
+
+
+def _attack(n, sample_rate):
+    """A linear fade-in over ``ATTACK_SECONDS`` so that a render does not start with a click."""
+    return np.minimum(np.arange(n) / (ATTACK_SECONDS * sample_rate), 1)
+
+
+def additive(frequencies, duration, sample_rate, harmonics=8, decay=2.0):
+    """Sum of decaying harmonic partials (amplitude ``1/k``) of all ``frequencies``.
+
+    Each harmonic is computed for every frequency and sample in one
+    broadcast; upper harmonics die away faster, as on a plucked string.
+    """
+    frequencies = np.asarray(frequencies, dtype=float)[:, None]
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    mix = np.zeros(len(t))
+    for k in range(1, harmonics + 1):
+        # partials above Nyquist would alias
+        audible = frequencies[frequencies[:, 0] * k < sample_rate / 2]
+        mix += np.sin(2 * np.pi * k * audible * t).sum(axis=0) * np.exp(-decay * np.sqrt(k) * t) / k
+    return mix * _attack(len(t), sample_rate)
+
+
+def karplus_strong(frequencies, duration, sample_rate, decay=0.996, seed=0):
+    """Plucked strings by Karplus–Strong, one period of every string computed at a time.
+
+    Within a period each output sample depends only on the previous period,
+    so the delay-line update is a vector operation rather than a loop over
+    samples.
+    """
+    n = int(duration * sample_rate)
+    rng = np.random.default_rng(seed)
+    mix = np.zeros(n)
+    for frequency in np.atleast_1d(frequencies):
+        # the two-point average delays the loop by another half sample
+        period = max(int(round(sample_rate / frequency - 0.5)), 2)
+        string = np.empty(n + period + 1)
+        noise = rng.uniform(-1, 1, period + 1)
+        # the filter keeps any DC offset of the burst forever
+        string[:period + 1] = noise - noise.mean()
+        for start in range(period + 1, len(string), period):
+            stop = min(start + period, len(string))
+            string[start:stop] = decay * 0.5 * (string[start - period:stop - period] +
+                                                string[start - period - 1:stop - period - 1])
+        mix += string[period + 1:]
+    return mix * _attack(n, sample_rate)
+
+
+METHODS = {'additive': additive, 'karplus_strong': karplus_strong}
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def render_pitches(pitches, duration=DEFAULT_DURATION, sample_rate=DEFAULT_SAMPLE_RATE, method='additive'):
+    """Render MIDI ``pitches`` (a tuple) sounding together, as a read-only float32 buffer peaking at ``PEAK``.
+
+    Results are cached by all arguments, so repeated notes and chords are
+    only synthesized once.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown synthesis method: {method}")
+    data = METHODS[method](midi_frequency(pitches), duration, sample_rate)
+    peak = np.abs(data).max()
+    data = (data * (PEAK / peak if peak > 0 else 0)).astype(np.float32)
+    data.flags.writeable = False
+    return data
+
+
+def synthesize(key, duration=DEFAULT_DURATION, sample_rate=DEFAULT_SAMPLE_RATE, method='additive'):
+    """A ``Sample`` of the note or chord named by a sample key (see ``key_pitches``)."""
+    data = render_pitches(key_pitches(key), duration, sample_rate, method)
+    return Sample(to_pcm16(data), 1, 2, sample_rate)
+
+
+class SynthesisFallback(Mapping):
+    """``samples`` (e.g. a ``SampleBank``) with any other note or chord key synthesized on demand.
+
+    Recorded samples always win. Iteration and ``len`` cover the recorded
+    samples only, but ``in`` and lookups accept every synthesizable key.
+    Each key that falls back to synthesis is logged once and listed in
+    ``synthesized``.
+    """
+
+    def __init__(self, samples, duration=DEFAULT_DURATION, sample_rate=DEFAULT_SAMPLE_RATE, method='additive'):
+        self.samples = samples
+        self.duration = duration
+        self.sample_rate = sample_rate
+        self.method = method
+        self._synthesized = {}
+
+    def __getitem__(self, key):
+        if key in self.samples:
+            return self.samples[key]
+        if key not in self._synthesized:
+            try:
+                self._synthesized[key] = synthesize(key, self.duration, self.sample_rate, self.method)
+            except (ValueError, TypeError):
+                raise KeyError(key) from None
+            logger.info("No recorded sample for %s; synthesizing it (%s)", key, self.method)
+        return self._synthesized[key]
+
+    @property
+    def synthesized(self):
+        """The keys synthesized so far, in the order they were first needed."""
+        return tuple(self._synthesized)
+
+    def __contains__(self, key):
+        if key in self.samples or key in self._synthesized:
+            return True
+        try:
+            key_pitches(key)
+        except (ValueError, TypeError):
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self.samples)
+
+    def __len__(self):
+        return len(self.samples)
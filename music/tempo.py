@@ -0,0 +1,113 @@
+import numpy as np
+
+
+def autocorrelation(x, max_lag=None):
+    """Autocorrelation of ``x`` for lags ``0..max_lag`` via a zero-padded FFT."""
+    x = np.asarray(x, dtype=float)
+    n = len(x)
+    max_lag = n - 1 if max_lag is None else min(max_lag, n - 1)
+    size = 1 << int(np.ceil(np.log2(max(2 * n - 1, 1))))
+    spectrum = np.fft.rfft(x, size)
+    return np.fft.irfft(spectrum * np.conj(spectrum), size)[:max_lag + 1]
+
+
+def _tempo_candidates(novelty, frame_rate, min_bpm, max_bpm, prior_bpm, prior_octaves):
+    """Weighted autocorrelation over the lags (in frames) of the allowed tempo range."""
+    novelty = np.asarray(novelty, dtype=float)
+    novelty = novelty - novelty.mean()
+    min_lag = max(int(np.floor(60 * frame_rate / max_bpm)), 1)
+    max_lag = int(np.ceil(60 * frame_rate / min_bpm))
+    acf = autocorrelation(novelty, max_lag + 1)
+    lags = np.arange(min_lag, min(max_lag, len(acf) - 2) + 1)
+    if not len(lags):
+        raise ValueError("Novelty curve is too short to estimate a tempo")
+    # a log-normal prior around prior_bpm discourages half and double tempo errors
+    bpms = 60 * frame_rate / lags
+    weights = np.exp(-0.5 * (np.log2(bpms / prior_bpm) / prior_octaves) ** 2)
+    return acf, lags, acf[lags] * weights
+
+
+def estimate_tempo(novelty, frame_rate, min_bpm=40, max_bpm=240, prior_bpm=120, prior_octaves=1.0):
+    """Estimate a global tempo in BPM from an onset-strength curve.
+
+    ``frame_rate`` is the number of novelty values per second (sample rate
+    over hop length). The strongest lag of the weighted autocorrelation is
+    refined by parabolic interpolation.
+    """
+    acf, lags, scores = _tempo_candidates(novelty, frame_rate, min_bpm, max_bpm, prior_bpm, prior_octaves)
+    lag = lags[np.argmax(scores)]
+    left, centre, right = acf[lag - 1:lag + 2]
+    curvature = left - 2 * centre + right
+    refined = lag + (0.5 * (left - right) / curvature if curvature < 0 else 0)
+    return 60 * frame_rate / refined
+
+
+def estimate_tempo_map(novelty, frame_rate, window_seconds=8.0, hop_seconds=2.0, **tempo_kwargs):
+    """Estimate the tempo in overlapping windows of the onset-strength curve.
+
+    Returns ``(times, bpms)`` with the centre time of every window, suitable
+    for ``beat_times_from_tempo_map``. Silent windows take the previous
+    estimate. ``tempo_kwargs`` are passed to ``estimate_tempo``.
+    """
+    novelty = np.asarray(novelty, dtype=float)
+    window = max(int(window_seconds * frame_rate), 1)
+    hop = max(int(hop_seconds * frame_rate), 1)
+    if len(novelty) <= window:
+        return np.array([len(novelty) / 2 / frame_rate]), np.array([estimate_tempo(novelty, frame_rate, **tempo_kwargs)])
+
+    starts = np.arange(0, len(novelty) - window + 1, hop)
+    times = (starts + window / 2) / frame_rate
+    bpms = np.full(len(starts), np.nan)
+    for i, start in enumerate(starts):
+        segment = novelty[start:start + window]
+        if np.ptp(segment) > 0:
+            bpms[i] = estimate_tempo(segment, frame_rate, **tempo_kwargs)
+    if np.all(np.isnan(bpms)):
+        raise ValueError("Novelty curve has no onsets to estimate a tempo from")
+    # carry estimates into silent windows
+    valid = ~np.isnan(bpms)
+    bpms = bpms[valid][np.maximum(np.cumsum(valid) - 1, 0)]
+    return times, bpms
+
+
+def estimate_beat_phase(novelty, frame_rate, bpm):
+    """Time in seconds of the first beat that best lines the beat grid up with the onsets."""
+    novelty = np.asarray(novelty, dtype=float)
+    period = 60 * frame_rate / bpm
+    offsets = np.arange(int(np.ceil(period)))
+    beats = np.arange(int(len(novelty) / period) + 1) * period
+    # novelty at every (candidate offset, beat) pair, summed over the beats
+    positions = np.rint(offsets[:, None] + beats[None, :]).astype(np.intp)
+    inside = positions < len(novelty)
+    scores = np.where(inside, novelty[np.minimum(positions, len(novelty) - 1)], 0).sum(axis=1)
+    return offsets[np.argmax(scores)] / frame_rate
+
+
+def beat_times_from_tempo_map(times, bpms, duration, start=0.0):
+    """Place beats from ``start`` to ``duration`` by integrating a piecewise tempo map.
+
+    The tempo is interpolated linearly between the map's ``times`` and held
+    constant beyond them.
+    """
+    grid = np.linspace(start, duration, max(int((duration - start) * 1000), 2))
+    beats_per_second = np.interp(grid, times, bpms) / 60
+    # cumulative beat count at each grid time (trapezoidal rule)
+    phase = np.concatenate(([0], np.cumsum(np.diff(grid) * (beats_per_second[1:] + beats_per_second[:-1]) / 2)))
+    return np.interp(np.arange(int(np.floor(phase[-1])) + 1), phase, grid)
+
+
+def estimate_beat_times(novelty, frame_rate, duration, tempo_map=False, **tempo_kwargs):
+    """Estimate a beat grid for a take from its onset-strength curve alone.
+
+    Uses a single global tempo, or the piecewise tempo map when ``tempo_map``
+    is set. Returns ``(beat_times, bpm)`` where ``bpm`` is the global tempo.
+    The grid's phase is fitted to the onsets of the take, so timing errors
+    measured against it are relative: a take played steadily early or late
+    still has a mean error of about zero.
+    """
+    bpm = estimate_tempo(novelty, frame_rate, **tempo_kwargs)
+    start = estimate_beat_phase(novelty, frame_rate, bpm)
+    if tempo_map:
+        times, bpms = estimate_tempo_map(novelty, frame_rate, **tempo_kwargs)
+        return beat_times_from_tempo_map(times, bpms, duration, start), bpm
+    return np.arange(start, duration, 60 / bpm), bpm
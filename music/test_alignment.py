@@ -0,0 +1,87 @@
+import unittest
+
+import numpy as np
+
+from .alignment import *
+
+
+def clicks(sr, times, duration, freq=1000, decay=200):
+    """Short decaying tones at the given times over faint noise."""
+    data = np.random.default_rng(3).normal(0, 1e-4, int(sr * duration))
+    t = np.arange(int(0.1 * sr)) / sr
+    tone = np.sin(2 * np.pi * freq * t) * np.exp(-t * decay)
+    for time in times:
+        start = int(round(time * sr))
+        if 0 <= start < len(data):
+            data[start:start + len(tone)] += tone[:len(data) - start]
+    return data
+
+
+class TestCorrelationLag(unittest.TestCase):
+
+    def test_positive_lag_means_signal_is_late(self):
+        reference = np.zeros(100)
+        reference[20] = 1
+        signal = np.zeros(100)
+        signal[27] = 1
+        self.assertAlmostEqual(correlation_lag(reference, signal), 7)
+        self.assertAlmostEqual(correlation_lag(signal, reference), -7)
+
+    def test_max_lag(self):
+        reference = np.zeros(100)
+        reference[[10, 60]] = 1
+        signal = np.zeros(100)
+        signal[[12, 62]] = 1
+        signal[90] = 5
+        self.assertAlmostEqual(correlation_lag(reference, signal, max_lag=5), 2)
+
+
+class TestAlignment(unittest.TestCase):
+
+    def setUp(self):
+        self.sr = 22050
+        self.beats = np.arange(0.25, 20, 0.5)
+
+    def test_estimate_offset(self):
+        metronome = clicks(self.sr, self.beats, 21)
+        guitar = clicks(self.sr, self.beats + 0.123, 21, freq=220, decay=20)
+        self.assertAlmostEqual(estimate_offset(metronome, guitar, self.sr), 0.123, delta=0.002)
+        self.assertAlmostEqual(estimate_offset(guitar, metronome, self.sr), -0.123, delta=0.002)
+
+    def test_estimate_alignment_recovers_drift(self):
+        metronome = clicks(self.sr, self.beats, 21)
+        guitar = clicks(self.sr, 0.05 + self.beats * 1.002, 21, freq=220, decay=20)
+        offset, drift = estimate_alignment(metronome, guitar, self.sr, window_seconds=4)
+        self.assertAlmostEqual(offset, 0.05, delta=0.003)
+        self.assertAlmostEqual(drift, 0.002, delta=0.0003)
+
+    def test_beat_grid_from_clicks(self):
+        rng = np.random.default_rng(4)
+        detected = np.delete(self.beats + rng.normal(0, 0.002, len(self.beats)), [5, 6])
+        grid = beat_grid_from_clicks(detected, duration=20.1)
+        np.testing.assert_allclose(grid, self.beats, atol=0.003)
+
+    def test_beat_grid_needs_two_clicks(self):
+        with self.assertRaises(ValueError):
+            beat_grid_from_clicks([1.0])
+
+    def test_beat_grid_keeps_a_late_player_late(self):
+        metronome = clicks(self.sr, self.beats, 20)
+        guitar = clicks(self.sr, self.beats + 0.2, 20, freq=220, decay=20)
+        beat_times, offset, drift = align_beat_grid(metronome, guitar, self.sr)
+        self.assertEqual((offset, drift), (0.0, 0.0))
+        self.assertEqual(len(beat_times), len(self.beats))
+        np.testing.assert_allclose(beat_times, self.beats, atol=0.015)
+
+    def test_align_beat_grid(self):
+        metronome = clicks(self.sr, self.beats, 20)
+        guitar = clicks(self.sr, self.beats + 0.2, 20, freq=220, decay=20)
+        beat_times, offset, drift = align_beat_grid(metronome, guitar, self.sr, align=True)
+        self.assertAlmostEqual(offset, 0.2, delta=0.003)
+        self.assertEqual(len(beat_times), len(self.beats))
+        # clicks are detected with the same small latency as the guitar onsets
+        np.testing.assert_allclose(beat_times, self.beats + 0.2, atol=0.015)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,257 @@
+import os
+import tempfile
+import unittest
+import wave
+from unittest.mock import patch
+
+import numpy as np
+
+from .analyse_timing import *
+from .analyse_timing import _read_ffmpeg_chunks
+
+
+class TestMatchBeatsToOnsets(unittest.TestCase):
+
+    def test_matches_nearest_onset(self):
+        onsets = np.array([0.02, 0.61, 1.18, 1.9])
+        beats = np.array([0.0, 0.6, 1.2, 1.8])
+        matched, indices, errors = match_beats_to_onsets(onsets, beats)
+        np.testing.assert_allclose(matched, [0.02, 0.61, 1.18, 1.9])
+        np.testing.assert_array_equal(indices, [0, 1, 2, 3])
+        np.testing.assert_allclose(errors, [0.02, 0.01, -0.02, 0.1])
+
+    def test_agrees_with_brute_force(self):
+        rng = np.random.default_rng(0)
+        onsets = np.sort(rng.uniform(0, 60, 500))
+        beats = np.arange(0, 60, 0.6)
+        matched, indices, _ = match_beats_to_onsets(onsets, beats)
+        expected = [np.abs(onsets - beat).argmin() for beat in beats]
+        np.testing.assert_array_equal(indices, expected)
+        np.testing.assert_allclose(matched, onsets[expected])
+
+    def test_unsorted_onsets_index_into_input(self):
+        onsets = np.array([1.2, 0.0, 0.6])
+        matched, indices, _ = match_beats_to_onsets(onsets, [0.1, 0.5, 1.1])
+        np.testing.assert_array_equal(indices, [1, 2, 0])
+        np.testing.assert_allclose(matched, [0.0, 0.6, 1.2])
+
+    def test_ties_prefer_earlier_onset(self):
+        _, indices, _ = match_beats_to_onsets([0.4, 0.6], [0.5])
+        np.testing.assert_array_equal(indices, [0])
+
+    def test_max_distance_gives_nan(self):
+        matched, indices, errors = match_beats_to_onsets([0.0, 2.0], [0.05, 1.0], max_distance=0.1)
+        self.assertAlmostEqual(matched[0], 0.0)
+        self.assertTrue(np.isnan(matched[1]))
+        self.assertTrue(np.isnan(errors[1]))
+        self.assertEqual(indices[1], -1)
+
+    def test_no_onsets(self):
+        matched, indices, errors = match_beats_to_onsets([], [0.0, 0.6])
+        self.assertTrue(np.all(np.isnan(matched)))
+        self.assertTrue(np.all(np.isnan(errors)))
+        np.testing.assert_array_equal(indices, [-1, -1])
+
+    def test_find_closest_peaks(self):
+        sr = 100
+        peaks = np.array([3, 62, 118])
+        closest = find_closest_peaks(peaks, np.array([0.0, 0.6, 1.2]), sr)
+        np.testing.assert_allclose(closest, [0.03, 0.62, 1.18])
+
+
+class TestStreamingAudio(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.sr = 8000
+        self.samples = (rng.uniform(-0.2, 0.2, (10_000, 2)) * 32767).astype('<i2')
+        # a few clicks, one of them straddling a block boundary
+        for i, position in enumerate([700, 4095, 4096 + 2000, 9000]):
+            self.samples[position] = 16000 + 1000 * i
+        handle, self.path = tempfile.mkstemp(suffix='.wav')
+        os.close(handle)
+        with wave.open(self.path, 'wb') as wav:
+            wav.setnchannels(2)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sr)
+            wav.writeframes(self.samples.tobytes())
+        self.mono = self.samples.astype(np.float32).sum(axis=1) / 32768
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_blocks_cover_signal(self):
+        blocks, sr = load_audio_blocks(self.path, block_size=4096, overlap=512)
+        self.assertEqual(sr, self.sr)
+        blocks = list(blocks)
+        self.assertTrue(all(block.dtype == np.float32 for _, block in blocks))
+        self.assertTrue(all(len(block) == 4096 for _, block in blocks[:-1]))
+        self.assertEqual([start for start, _ in blocks], [0, 3584, 7168])
+        for start, block in blocks:
+            np.testing.assert_allclose(block, self.mono[start:start + len(block)], rtol=1e-6)
+        last_start, last_block = blocks[-1]
+        self.assertEqual(last_start + len(last_block), len(self.mono))
+
+    def test_invalid_overlap(self):
+        with self.assertRaises(ValueError):
+            load_audio_blocks(self.path, block_size=1024, overlap=1024)
+
+    def test_streamed_peaks_match_whole_file(self):
+        height = 0.4
+        expected, _ = find_peaks(self.mono, height=height)
+        blocks, _ = load_audio_blocks(self.path, block_size=4096, overlap=512)
+        peaks = detect_peaks_in_blocks(blocks, overlap=512, height=height)
+        np.testing.assert_array_equal(peaks, expected)
+
+    def test_default_overlap_keeps_peaks_at_block_edges(self):
+        height = 0.4
+        expected, _ = find_peaks(self.mono, height=height)
+        blocks, _ = load_audio_blocks(self.path, block_size=DEFAULT_BLOCK_OVERLAP + 512)
+        np.testing.assert_array_equal(detect_peaks_in_blocks(blocks, height=height), expected)
+
+    def test_failed_ffmpeg_decode_raises(self):
+        with tempfile.TemporaryDirectory() as directory:
+            converter = os.path.join(directory, 'ffmpeg')
+            with open(converter, 'w') as f:
+                f.write('#!/bin/sh\necho "Invalid data found when processing input" >&2\nexit 1\n')
+            os.chmod(converter, 0o755)
+            with patch.object(AudioSegment, 'converter', converter):
+                with self.assertRaisesRegex(ValueError, 'exit code 1.*Invalid data'):
+                    list(_read_ffmpeg_chunks(self.path, 2, 1024))
+
+    def test_ffmpeg_error_flood_does_not_block(self):
+        with tempfile.TemporaryDirectory() as directory:
+            converter = os.path.join(directory, 'ffmpeg')
+            with open(converter, 'w') as f:
+                # far more error output than a pipe buffer holds
+                f.write('#!/bin/sh\nyes "Error while decoding frame" | head -c 1000000 >&2\nexit 1\n')
+            os.chmod(converter, 0o755)
+            with patch.object(AudioSegment, 'converter', converter):
+                with self.assertRaisesRegex(ValueError, '(?s)exit code 1.*decoding frame'):
+                    list(_read_ffmpeg_chunks(self.path, 2, 1024))
+
+    def test_float_wav_is_decoded_by_ffmpeg(self):
+        from scipy.io import wavfile
+        wavfile.write(self.path, self.sr, self.mono.astype(np.float32))
+        with patch('music.analyse_timing.mediainfo', return_value={'channels': '1', 'sample_rate': '8000'}), \
+                patch('music.analyse_timing._read_ffmpeg_chunks', return_value=iter([self.mono[:, None]])) as read:
+            pcm, sr = decode_pcm(self.path)
+        read.assert_called_once()
+        self.assertEqual(sr, self.sr)
+        np.testing.assert_array_equal(pcm[:, 0], self.mono)
+
+
+class TestMinMaxEnvelope(unittest.TestCase):
+
+    def test_columns_hold_min_and_max(self):
+        data = np.array([0, 5, -1, 2, 3, -4, 1, 0])
+        edges, mins, maxs = minmax_envelope(data, 4)
+        np.testing.assert_array_equal(edges, [0, 2, 4, 6, 8])
+        np.testing.assert_array_equal(mins, [0, -1, -4, 0])
+        np.testing.assert_array_equal(maxs, [5, 2, 3, 1])
+
+    def test_uneven_columns_cover_every_sample(self):
+        data = np.random.default_rng(0).normal(size=1003)
+        edges, mins, maxs = minmax_envelope(data, 10)
+        self.assertEqual((edges[0], edges[-1]), (0, 1003))
+        self.assertEqual(mins.min(), data.min())
+        self.assertEqual(maxs.max(), data.max())
+
+    def test_zoom_window(self):
+        data = np.arange(100)
+        edges, mins, maxs = minmax_envelope(data, 50, start=10, stop=20)
+        np.testing.assert_array_equal(edges, np.arange(10, 21))
+        np.testing.assert_array_equal(mins, np.arange(10, 20))
+
+    def test_empty_window(self):
+        with self.assertRaises(ValueError):
+            minmax_envelope(np.zeros(10), 5, start=20)
+
+
+def write_take(path, sr, onset_times, duration):
+    """Write a mono 16-bit WAV with a short decaying tone at every onset."""
+    data = np.zeros(int(sr * duration))
+    t = np.arange(int(0.2 * sr)) / sr
+    tone = 0.5 * np.sin(2 * np.pi * 330 * t) * np.exp(-t * 30)
+    for onset in onset_times:
+        start = int(onset * sr)
+        data[start:start + len(tone)] += tone[:len(data) - start]
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sr)
+        wav.writeframes((data * 32767).astype('<i2').tobytes())
+
+
+class TestBatchAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.sr = 22050
+        # 120 bpm, one take played 20 ms late and one 10 ms early
+        for name, offset in (('late.wav', 0.02), ('early.wav', -0.01)):
+            write_take(os.path.join(self.directory.name, name), self.sr, np.arange(0.5, 6, 0.5) + offset, 6.2)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_timing_error_stats(self):
+        stats = timing_error_stats([-0.02, 0.01, 0.03, np.nan])
+        self.assertEqual(stats['beats'], 3)
+        self.assertAlmostEqual(stats['mean_error_before'], -0.02)
+        self.assertAlmostEqual(stats['mean_error_after'], 0.02)
+        self.assertAlmostEqual(stats['std_after'], 0.01)
+        self.assertEqual(stats['std_before'], 0)
+
+    def test_analyse_file(self):
+        result = analyse_file(os.path.join(self.directory.name, 'late.wav'), bpm=120, max_distance=0.1)
+        self.assertAlmostEqual(result['duration'], 6.2, places=3)
+        self.assertEqual(result['onsets'], 11)
+        # the beat at t=0 has no onset
+        self.assertEqual(result['beats'], 11)
+        self.assertAlmostEqual(result['mean_error'], 0.02, delta=0.015)
+        self.assertFalse(result['relative'])
+
+    def test_analyse_file_estimates_tempo(self):
+        result = analyse_file(os.path.join(self.directory.name, 'early.wav'), max_distance=0.1)
+        self.assertAlmostEqual(result['bpm'], 120, delta=1)
+        self.assertEqual(result['beats'], 11)
+        # the grid is fitted to the take, so its 10 ms lead does not show
+        self.assertTrue(result['relative'])
+        self.assertLess(abs(result['mean_error']), 0.012)
+        table = summary_table([result])
+        self.assertIn('early.wav *', table)
+        self.assertIn('errors relative to a beat grid fitted to the take', table)
+
+    def test_store_result_keeps_takes_with_the_same_name_apart(self):
+        paths = []
+        for player, offset in (('alice', 0.02), ('bob', -0.01)):
+            os.mkdir(os.path.join(self.directory.name, player))
+            paths.append(os.path.join(self.directory.name, player, 'take1.wav'))
+            write_take(paths[-1], self.sr, np.arange(0.5, 6, 0.5) + offset, 6.2)
+        with ResultsStore(os.path.join(self.directory.name, 'results')) as store:
+            for path in paths + paths[:1]:
+                store_result(store, analyse_file(path, bpm=120, max_distance=0.1))
+            takes = store.takes()
+        self.assertEqual(sorted(take['file'] for take in takes), sorted(os.path.abspath(path) for path in paths))
+
+    def test_find_audio_files(self):
+        files = find_audio_files(self.directory.name)
+        self.assertEqual([os.path.basename(path) for path in files], ['early.wav', 'late.wav'])
+        self.assertEqual(find_audio_files(os.path.join(self.directory.name, 'l*.wav')), files[1:])
+
+    def test_analyse_batch(self):
+        files = find_audio_files(self.directory.name) + [os.path.join(self.directory.name, 'missing.wav')]
+        results = list(analyse_batch(files, bpm=120, max_distance=0.1, max_workers=2))
+        self.assertEqual(sorted(result['file'] for result in results), sorted(files))
+        failed = [result for result in results if 'error' in result]
+        self.assertEqual([result['file'] for result in failed], files[2:])
+
+        table = summary_table(results)
+        self.assertIn('late.wav', table)
+        self.assertIn('missing.wav: failed', table)
+        self.assertIn('ALL (2 takes)  -    22', table)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import json
+import os
+import tempfile
+import unittest
+import wave
+
+from .assets import *
+from .sample_bank import SampleBank
+from .scale import MajorScale
+
+
+def write_wav(path, frames=10, sample_rate=1000):
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b'\0\0' * frames)
+
+
+class TestAssetNames(unittest.TestCase):
+
+    def test_parse_asset_name(self):
+        self.assertEqual(parse_asset_name('C.wav'), ('note', 'C', None, 0))
+        self.assertEqual(parse_asset_name('FSharp.wav'), ('note', 'F#', None, 0))
+        self.assertEqual(parse_asset_name('Gb.wav'), ('note', 'Gb', None, 0))
+        self.assertEqual(parse_asset_name('BFlatMinor.m4a.wav'), ('chord', 'Bb', 'Minor', 0))
+        self.assertEqual(parse_asset_name('Gdim.m4a.wav'), ('chord', 'G', 'Dim', 0))
+        self.assertEqual(parse_asset_name('Flat3.wav'), ('interval', 'b3', None, 0))
+        self.assertEqual(parse_asset_name('Sharp11.wav'), ('interval', '#11', None, 0))
+        self.assertEqual(parse_asset_name('High5.wav'), ('interval', '5', None, 1))
+        self.assertEqual(parse_asset_name('Low6Flat.wav'), ('interval', 'b6', None, -1))
+        self.assertIsNone(parse_asset_name('Low2Flat 2.wav'))
+        self.assertIsNone(parse_asset_name('m4a_to_wav.sh'))
+
+    def test_asset_key(self):
+        self.assertEqual(asset_key('note', 'Db'), 'Db')
+        self.assertEqual(asset_key('chord', 'F#', 'Major'), 'FSharpMajor')
+        self.assertEqual(asset_key('interval', 'b3', octave=-1), 'b3@-1')
+
+
+class TestAssetIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.audio_dir = self.directory.name
+        for name in ['C.wav', 'DMinor.m4a.wav', 'Flat3.wav', 'High2.wav']:
+            write_wav(os.path.join(self.audio_dir, name))
+        with open(os.path.join(self.audio_dir, 'C copy.wav'), 'wb'):
+            pass
+        with open(os.path.join(self.audio_dir, 'D.wav'), 'wb') as f:
+            f.write(b'not a wav file')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_scan(self):
+        index = AssetIndex.scan(self.audio_dir)
+        self.assertEqual(set(index), {'C', 'DMinor', 'b3', '2@+1'})
+        self.assertEqual(index['DMinor'][:4], ('chord', 'D', 'Minor', 0))
+        self.assertEqual((index['C'].sample_rate, index['C'].frames), (1000, 10))
+        self.assertEqual(set(index.unrecognised), {'C copy.wav', 'D.wav'})
+        self.assertEqual(index.files('interval', octave=0), {'b3': index['b3'].path})
+        self.assertEqual(len(SampleBank(index.files())), 4)
+
+    def test_manifest_is_reused_until_a_file_changes(self):
+        AssetIndex.scan(self.audio_dir)
+        manifest_path = os.path.join(self.audio_dir, MANIFEST_NAME)
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        # a stale entry proves the cached record was used instead of re-reading the file
+        manifest['files']['C.wav']['header'][3] = 99
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f)
+        self.assertEqual(AssetIndex.scan(self.audio_dir)['C'].frames, 99)
+
+        write_wav(os.path.join(self.audio_dir, 'C.wav'), frames=20)
+        self.assertEqual(AssetIndex.scan(self.audio_dir)['C'].frames, 20)
+
+    def test_validate(self):
+        index = AssetIndex.scan(self.audio_dir, manifest=False)
+        self.assertFalse(os.path.exists(os.path.join(self.audio_dir, MANIFEST_NAME)))
+        self.assertIn('EMinor', index.missing_for_scale(MajorScale('C')))
+        self.assertEqual(index.missing_for_scale(MajorScale('C'), kinds=('interval',)), ['1', '2', '3', '4', '5', '6', '7'])
+        with self.assertRaisesRegex(ValueError, 'No audio asset for: .*FSharpMinor'):
+            index.validate([MajorScale('E')], kinds=('chord',))
+
+    def test_library_covers_every_scale(self):
+        scales = all_scales()
+        self.assertEqual(len(scales), 2 * 12 * 13)
+        index = asset_index()
+        index.validate(scales)
+        self.assertEqual(list(index.unrecognised), ['Low2Flat 2.wav'])
+
+
+if __name__ == '__main__':
+    unittest.main()
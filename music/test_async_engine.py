@@ -0,0 +1,161 @@
+import asyncio
+import itertools
+import unittest
+
+import numpy as np
+
+from .async_engine import *
+from .instrumentation import TimingRecorder
+from .sequencer import Sequencer, beat_events
+from .test_sequencer import pcm_sample
+
+
+class PlayObject:
+    def __init__(self):
+        self.stopped = False
+
+    def is_playing(self):
+        return False
+
+    def stop(self):
+        self.stopped = True
+
+
+class Recorder:
+    """Stands in for ``simpleaudio.play_buffer`` and records when each block was handed over."""
+
+    def __init__(self):
+        self.calls = []
+        self.play_objects = []
+
+    def __call__(self, audio_data, num_channels, bytes_per_sample, sample_rate):
+        self.calls.append((asyncio.get_running_loop().time(), len(audio_data)))
+        self.play_objects.append(PlayObject())
+        return self.play_objects[-1]
+
+    @property
+    def starts(self):
+        return np.array([start for start, _ in self.calls])
+
+
+class TestPlaybackSession(unittest.TestCase):
+
+    def setUp(self):
+        self.sequencer = Sequencer({'click': pcm_sample([1.0, 0.5])}, sample_rate=1000, gain=1.0)
+
+    def session(self, events, play_buffer, **kwargs):
+        return PlaybackSession(self.sequencer, events, play_buffer, block_size=50, latency=0, **kwargs)
+
+    def test_blocks_keep_absolute_schedule(self):
+        recorder = Recorder()
+
+        async def main():
+            await self.session(beat_events(['click'] * 4, bpm=600), recorder).start()
+
+        asyncio.run(main())
+        self.assertEqual(len(recorder.calls), 7)
+        np.testing.assert_allclose(recorder.starts - recorder.starts[0], np.arange(7) * 0.05, atol=0.02)
+        self.assertEqual({size for _, size in recorder.calls}, {100})
+
+    def test_generation_is_held_back_by_playback(self):
+        pulled = []
+
+        def keys():
+            for i in itertools.count():
+                pulled.append(i)
+                yield 'click'
+
+        async def main():
+            session = self.session(beat_events(keys(), bpm=600), Recorder(), queue_blocks=2)
+            task = session.start()
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        # about 0.2 s of audio played plus at most a couple of queued blocks
+        self.assertLess(len(pulled), 6)
+
+    def test_cancel_stops_audio(self):
+        recorder = Recorder()
+
+        async def main():
+            session = self.session(beat_events(iter(lambda: 'click', None), bpm=600), recorder)
+            session.start()
+            await asyncio.sleep(0.12)
+            session.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await session.task
+
+        asyncio.run(main())
+        self.assertTrue(recorder.play_objects[-1].stopped)
+
+    def test_pause_and_resume(self):
+        recorder = Recorder()
+
+        async def main():
+            session = self.session(beat_events(['click'] * 4, bpm=600), recorder)
+            task = session.start()
+            await asyncio.sleep(0.07)
+            session.pause()
+            self.assertTrue(session.paused)
+            played = len(recorder.calls)
+            await asyncio.sleep(0.15)
+            self.assertEqual(len(recorder.calls), played)
+            session.resume()
+            await task
+
+        asyncio.run(main())
+        gaps = np.diff(recorder.starts)
+        self.assertEqual(len(recorder.calls), 7)
+        self.assertEqual(np.count_nonzero(gaps > 0.12), 1)
+
+    def test_recorder(self):
+        recorder = TimingRecorder()
+
+        async def main():
+            await self.session(beat_events(['click'] * 4, bpm=600), Recorder(), recorder=recorder).start()
+
+        asyncio.run(main())
+        self.assertEqual(len(recorder), 4)
+        np.testing.assert_allclose(np.diff(recorder.scheduled), 0.1)
+        self.assertLess(recorder.summary()['latency_p99'], 0.02)
+
+    def test_error_in_events_is_raised(self):
+        recorder = Recorder()
+
+        def keys():
+            yield 'click'
+            yield 'click'
+            raise ValueError("no chords in this scale")
+
+        async def main():
+            with self.assertRaisesRegex(ValueError, 'no chords'):
+                await asyncio.wait_for(self.session(beat_events(keys(), bpm=600), recorder).start(), 1)
+
+        asyncio.run(main())
+        self.assertEqual(len(recorder.calls), 2)
+
+    def test_unknown_sample_is_raised(self):
+        async def main():
+            with self.assertRaises(KeyError):
+                await asyncio.wait_for(self.session(beat_events(['click', 'clack'], bpm=600), Recorder()).start(), 1)
+
+        asyncio.run(main())
+
+    def test_concurrent_sessions(self):
+        recorders = [Recorder(), Recorder(), Recorder()]
+
+        async def main():
+            sessions = [self.session(beat_events(['click'] * 4, bpm=600), recorder) for recorder in recorders]
+            await asyncio.gather(*(session.start() for session in sessions))
+
+        asyncio.run(main())
+        for recorder in recorders:
+            self.assertEqual(len(recorder.calls), 7)
+            self.assertLess(recorder.starts[-1] - recorder.starts[0], 0.35)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from . import analyse_timing
+from .audio_cache import AudioCache
+from .test_analyse_timing import write_take
+
+
+class TestAudioCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = AudioCache(os.path.join(self.directory.name, 'cache'), max_bytes=10_000)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def store(self, key, pcm, sample_rate=8000):
+        chunks = [pcm[i:i + 100] for i in range(0, len(pcm), 100)]
+        return list(self.cache.store(key, chunks, sample_rate, pcm.shape[1]))
+
+    def test_miss(self):
+        self.assertIsNone(self.cache.open('missing'))
+
+    def test_store_and_open(self):
+        pcm = np.random.default_rng(0).uniform(-1, 1, (250, 2)).astype(np.float32)
+        passed = self.store('take', pcm)
+        np.testing.assert_array_equal(np.concatenate(passed), pcm)
+        cached, sample_rate = self.cache.open('take')
+        self.assertIsInstance(cached, np.memmap)
+        self.assertEqual(sample_rate, 8000)
+        np.testing.assert_array_equal(cached, pcm)
+
+    def test_interrupted_store_leaves_no_entry(self):
+        stream = self.cache.store('take', [np.zeros((10, 1))] * 3, 8000, 1)
+        next(stream)
+        stream.close()
+        self.assertIsNone(self.cache.open('take'))
+        self.assertEqual(os.listdir(self.cache.cache_dir), [])
+
+    def test_least_recently_used_entry_is_evicted(self):
+        pcm = np.zeros((1000, 1), dtype=np.float32)  # 4000 bytes per entry
+        self.store('a', pcm)
+        self.store('b', pcm)
+        os.utime(self.cache._paths('a')[0], (0, 0))
+        os.utime(self.cache._paths('b')[0], (1, 1))
+        self.cache.open('a')
+        self.store('c', pcm)
+        self.assertIsNone(self.cache.open('b'))
+        self.assertIsNotNone(self.cache.open('a'))
+        self.assertIsNotNone(self.cache.open('c'))
+        self.assertLessEqual(self.cache.size(), self.cache.max_bytes)
+
+    def test_key_is_content_hash(self):
+        for name in ('one.wav', 'two.wav'):
+            write_take(os.path.join(self.directory.name, name), 8000, [0.1], 0.5)
+        keys = {AudioCache.key_for(os.path.join(self.directory.name, name)) for name in ('one.wav', 'two.wav')}
+        self.assertEqual(len(keys), 1)
+
+    def test_second_load_skips_decoding(self):
+        path = os.path.join(self.directory.name, 'take.wav')
+        write_take(path, 8000, [0.1, 0.3], 0.5)
+        cache = AudioCache(os.path.join(self.directory.name, 'cache'))
+        data, sr = analyse_timing.load_audio(path, cache)
+        with patch.object(analyse_timing, '_open_decoder', side_effect=AssertionError("decoded again")):
+            cached, cached_sr = analyse_timing.load_audio(path, cache)
+            blocks, _ = analyse_timing.load_audio_blocks(path, block_size=1024, overlap=0, cache=cache)
+            streamed = np.concatenate([block for _, block in blocks])
+        self.assertEqual((sr, cached_sr), (8000, 8000))
+        np.testing.assert_array_equal(cached, data)
+        np.testing.assert_array_equal(streamed, data)
+
+    def test_cached_and_uncached_loads_agree(self):
+        path = os.path.join(self.directory.name, 'take.wav')
+        write_take(path, 8000, [0.1, 0.3], 0.5)
+        uncached, sr = analyse_timing.load_audio(path)
+        cached, cached_sr = analyse_timing.load_audio(path, AudioCache(os.path.join(self.directory.name, 'cache')))
+        self.assertEqual(uncached.dtype, np.float32)
+        self.assertEqual(sr, cached_sr)
+        np.testing.assert_array_equal(uncached, cached)
+        self.assertLessEqual(np.abs(uncached).max(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
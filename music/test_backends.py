@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+import wave
+
+import numpy as np
+
+from .backends import *
+from .interval_generator import IntervalGenerator
+from .scale import MajorScale
+from .sequencer import Sequencer, beat_events
+from .test_sequencer import pcm_sample
+
+
+class TestBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.sequencer = Sequencer({'click': pcm_sample([1.0, 0.5])}, sample_rate=1000, gain=1.0)
+
+    def test_get_backend(self):
+        self.assertIsInstance(get_backend('null'), NullBackend)
+        play_buffer = NullBackend()
+        self.assertIs(get_backend(play_buffer), play_buffer)
+        with self.assertRaises(ValueError):
+            get_backend('alsa')
+        with self.assertRaisesRegex(ValueError, "'wav'.*path"):
+            get_backend('wav')
+
+    def test_null_backend_counts_blocks(self):
+        backend = NullBackend()
+        t0 = time.monotonic()
+        self.sequencer.play(beat_events(['click'] * 3, bpm=600), backend, block_size=100, latency=0)
+        self.assertEqual([frames for _, frames in backend.timings], [100, 100, 100])
+        # each block starts on its own slot of the absolute schedule, so a pause
+        # (e.g. garbage collection) delays one block without shifting the ones after it
+        lateness = np.array([start for start, _ in backend.timings]) - t0 - np.arange(3) * 0.1
+        self.assertTrue((lateness > -0.005).all())
+        self.assertLess(lateness[-1], 0.02)
+
+    def test_wav_file_backend(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'session.wav')
+            with get_backend('wav', path=path) as backend:
+                self.sequencer.play(beat_events(['click'] * 2, bpm=600), backend, block_size=50, latency=0)
+            with wave.open(path, 'rb') as wav:
+                self.assertEqual((wav.getnchannels(), wav.getsampwidth(), wav.getframerate()), (1, 2, 1000))
+                pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2')
+        self.assertEqual(len(pcm), 150)
+        self.assertEqual(list(np.flatnonzero(pcm > 30000)), [0, 100])
+
+    def test_generator_without_audio_device(self):
+        generator = IntervalGenerator(MajorScale('C'), 600, samples={'1': pcm_sample([1.0])}, backend='null')
+        self.assertNotIn('simpleaudio', sys.modules)
+        self.assertNotIn('pyttsx3', sys.modules)
+        self.assertIsInstance(generator.backend, NullBackend)
+        # samples are converted up front, not on the playback thread
+        self.assertEqual(set(generator.sequencer._buffers), {'1'})
+
+    def test_generator_backend_kwargs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'session.wav')
+            generator = IntervalGenerator(MajorScale('C'), 600, samples={'1': pcm_sample([1.0])}, backend='wav',
+                                          backend_kwargs={'path': path})
+            self.assertEqual(generator.backend.path, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from .chord_progression import *
+from .scale import DorianScale, HarmonicMinorScale, MajorScale, NaturalMinorScale, PentatonicScale, all_scales
+
+
+class TestChordProgression(unittest.TestCase):
+
+    def test_chord_progression(self):
+        progression = ChordProgression(MajorScale('C'))
+        progression.add_chord(1)
+        progression.add_chord(4)
+        progression.add_chord(5, seventh=True)
+        self.assertEqual(progression.get_progression(), 'I (CMajor) - IV (FMajor) - V7 (GDominant7)')
+        with self.assertRaises(ValueError):
+            progression.add_chord(8)
+
+    def test_major_and_minor(self):
+        self.assertEqual(ChordProgression(MajorScale('D')).scale_chords(),
+                         ['DMajor', 'EMinor', 'FSharpMinor', 'GMajor', 'AMajor', 'BMinor', 'CSharpDim'])
+        self.assertEqual(ChordProgression(NaturalMinorScale('D', use_flats=True)).scale_chords(seventh=True),
+                         ['DMinor7', 'EHalfDim7', 'FMajor7', 'GMinor7', 'AMinor7', 'BFlatMajor7', 'CDominant7'])
+
+    def test_modes_and_minor_variants(self):
+        self.assertEqual(ChordProgression(DorianScale('D')).chord_qualities,
+                         ['Minor', 'Minor', 'Major', 'Major', 'Minor', 'Dim', 'Major'])
+        progression = ChordProgression(HarmonicMinorScale('A'))
+        self.assertEqual(progression.chord(3), ('III+', 'CAug'))
+        self.assertEqual(progression.chord(5, seventh=True), ('V7', 'EDominant7'))
+        self.assertEqual(progression.chord(7, seventh=True), ('vii°7', 'GSharpDim7'))
+
+    def test_pentatonic(self):
+        progression = ChordProgression(PentatonicScale('Am'))
+        self.assertEqual(progression.chord_degrees(), [1, 2])
+        self.assertEqual(progression.scale_chords(), ['AMinor', 'CMajor'])
+        self.assertEqual(progression.chord(2), ('bIII', 'CMajor'))
+        self.assertEqual(progression.chord_degrees(seventh=True), [1])
+        with self.assertRaises(ValueError):
+            progression.chord(3)
+
+    def test_table_is_shared(self):
+        self.assertIs(ChordProgression(MajorScale('C')).chords, ChordProgression(MajorScale('F#')).chords)
+        for scale in all_scales():
+            chords = ChordProgression(scale).chords
+            self.assertEqual(len(chords), len(scale.scale_notes))
+            self.assertTrue(all(chord.triad in CHORD_INTERVALS for chord in chords if chord.triad))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+
+from .exercise_plan import *
+from .interval_generator import IntervalGenerator
+from .music_generator import MusicGenerator
+from .scale import MajorScale
+from .test_sequencer import pcm_sample
+
+
+class TestExercisePlan(unittest.TestCase):
+
+    def test_events_and_times(self):
+        plan = ExercisePlan(['C', 'x', 'E'], ['C', None, 'E'], bpm=120, start=1.0)
+        self.assertEqual(len(plan), 3)
+        self.assertEqual(list(plan), [(1.0, 'C'), (2.0, 'E')])
+        np.testing.assert_allclose(plan.beat_times, [1.0, 1.5, 2.0])
+        np.testing.assert_allclose(plan.expected_times(), [1.0, 2.0])
+        with self.assertRaises(ValueError):
+            ExercisePlan(['C'], [], bpm=120)
+
+    def test_random_choices(self):
+        choices = random_choices(['a', 'b', 'c'], 3000, np.random.default_rng(1))
+        self.assertEqual(len(choices), 3000)
+        self.assertTrue(all(900 < choices.count(option) < 1100 for option in 'abc'))
+        with self.assertRaises(ValueError):
+            random_choices([], 1, np.random.default_rng())
+
+    def test_random_sequences(self):
+        sequences = random_sequences(list('abcdefg'), 2, 4, 200, np.random.default_rng(2))
+        self.assertEqual({len(sequence) for sequence in sequences}, {2, 3, 4})
+        self.assertTrue(all(len(set(sequence)) == len(sequence) for sequence in sequences))
+        with self.assertRaises(ValueError):
+            random_sequences(list('abc'), 1, 4, 1, np.random.default_rng())
+
+
+class TestGeneratorPlans(unittest.TestCase):
+
+    def setUp(self):
+        self.scale = MajorScale('C')
+
+    def test_seeded_notes_are_reproducible(self):
+        samples = {note: pcm_sample([1.0]) for note in ['C', 'D', 'E', 'F', 'G', 'A']}
+        generator = MusicGenerator(self.scale, 120, samples=samples, backend='null')
+        plan = generator.plan_notes(64, seed=3)
+        self.assertEqual(plan.labels, generator.plan_notes(64, seed=3).labels)
+        self.assertEqual(MusicGenerator(self.scale, 120, samples=samples, backend='null', seed=3).plan_notes(64).labels,
+                         plan.labels)
+        self.assertTrue(set(plan.labels) <= set(self.scale.build_scale()))
+        # B has no sample, so its beats are silent
+        self.assertEqual([key is None for key in plan.keys], [label == 'B' for label in plan.labels])
+
+    def test_chord_plan(self):
+        chords = ['CMajor', 'DMinor', 'EMinor', 'FMajor', 'GMajor', 'AMinor', 'BDim']
+        generator = MusicGenerator(self.scale, 60, samples={chord: pcm_sample([1.0]) for chord in chords},
+                                   backend='null')
+        plan = generator.plan_chords(100, seed=4)
+        self.assertEqual(set(plan.keys), set(chords))
+        with self.assertRaises(ValueError):
+            MusicGenerator(self.scale, 60, samples={}, backend='null').plan_chords(10)
+
+    def test_interval_sequence_plan(self):
+        samples = {interval: pcm_sample([1.0]) for interval in self.scale.get_intervals()}
+        generator = IntervalGenerator(self.scale, 60, samples=samples, backend='null')
+        plan = generator.plan_interval_sequences(1, 3, 50, seed=5)
+        self.assertEqual(len(plan), 50)
+        self.assertEqual(plan.labels, generator.plan_interval_sequences(1, 3, 50, seed=5).labels)
+        runs = ''.join('.' if label is None else 'x' for label in plan.labels).split('.')
+        self.assertTrue(all(1 <= len(run) <= 3 for run in runs[:-1]))
+        self.assertEqual(len(plan.expected_times()), 50 - plan.labels.count(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
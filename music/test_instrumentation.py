@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from .backends import NullBackend
+from .instrumentation import *
+from .sequencer import Sequencer, beat_events
+from .test_sequencer import pcm_sample
+
+
+class TestTimingRecorder(unittest.TestCase):
+
+    def test_ring_buffer(self):
+        recorder = TimingRecorder(capacity=4)
+        for i in range(6):
+            recorder.record(i, i + 0.01)
+        self.assertEqual(len(recorder), 4)
+        self.assertEqual(recorder.total, 6)
+        np.testing.assert_array_equal(recorder.scheduled, [2, 3, 4, 5])
+        self.assertEqual(recorder.summary()['dropped'], 2)
+
+    def test_summary(self):
+        recorder = TimingRecorder(capacity=1000)
+        scheduled = np.arange(1000) * 0.5
+        # 10 ms late, drifting by 1 ms per 100 s, with one 50 ms outlier
+        lateness = 0.010 + scheduled * 1e-5
+        lateness[500] += 0.05
+        for s, late in zip(scheduled, lateness):
+            recorder.record(s, s + late)
+        summary = recorder.summary()
+        self.assertEqual(summary['events'], 1000)
+        self.assertAlmostEqual(summary['latency_p50'], 0.0125, places=4)
+        self.assertLess(summary['jitter_p95'], 0.003)
+        self.assertGreater(summary['max_latency'], 0.06)
+        self.assertAlmostEqual(summary['drift'], 1e-5, delta=2e-6)
+        self.assertIn('Drift: 0.6', recorder.format_summary())
+        self.assertEqual(TimingRecorder().summary(), {'events': 0, 'dropped': 0})
+
+    def test_events_are_placed_within_blocks(self):
+        recorder = TimingRecorder()
+        events = list(recorder.track([(0.0, 'a'), (0.03, 'b'), (0.12, 'c')]))
+        self.assertEqual(len(events), 3)
+        recorder.block_started(10.0, 10.002, 0, 100, 1000)
+        recorder.block_started(10.1, 10.105, 100, 200, 1000)
+        np.testing.assert_allclose(recorder.scheduled, [10.0, 10.03, 10.12])
+        np.testing.assert_allclose(recorder.actual - recorder.scheduled, [0.002, 0.002, 0.005])
+        np.testing.assert_allclose(recorder.block_errors, [0.002, 0.005])
+        self.assertAlmostEqual(recorder.summary()['max_block_error'], 0.005)
+        self.assertIn('Block start error (ms)', recorder.format_summary())
+
+    def test_sequencer_play(self):
+        recorder = TimingRecorder()
+        sequencer = Sequencer({'click': pcm_sample([1.0])}, sample_rate=1000)
+        sequencer.play(beat_events(['click'] * 6, bpm=1200), NullBackend(), block_size=100, latency=0.01,
+                       recorder=recorder)
+        self.assertEqual(len(recorder), 6)
+        np.testing.assert_allclose(np.diff(recorder.scheduled), 0.05)
+        self.assertLess(recorder.summary()['latency_p99'], 0.02)
+        self.assertEqual(recorder.blocks, 3)
+        self.assertLess(recorder.summary()['block_error_p99'], 0.02)
+
+    def test_dump(self):
+        recorder = TimingRecorder()
+        recorder.record(1.0, 1.001)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'timings.json')
+            recorder.dump(path)
+            with open(path) as f:
+                dumped = json.load(f)
+        self.assertEqual(dumped['scheduled'], [1.0])
+        self.assertEqual(dumped['summary']['events'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+
+import numpy as np
+
+from .markov_progression import *
+from .scale import MajorScale, NaturalMinorScale, PentatonicScale
+
+
+class TestProgressionModel(unittest.TestCase):
+
+    def test_sample_shape_and_codes(self):
+        codes = get_model().sample(1000, 16, rng=0)
+        self.assertEqual(codes.shape, (1000, 16))
+        self.assertEqual(codes.dtype, np.int8)
+        self.assertTrue(((codes >= 0) & (codes < 7)).all())
+        self.assertTrue((codes[:, 0] == 0).all())
+        self.assertTrue((get_model().sample(1000, 16, rng=0) == codes).all())
+        self.assertEqual(get_model().sample(3, 0).shape, (3, 0))
+
+    def test_transitions_follow_the_matrix(self):
+        codes = get_model('common_practice').sample(20000, 2, rng=1)
+        after_i = codes[codes[:, 0] == 0, 1]
+        frequencies = np.bincount(after_i, minlength=7) / len(after_i)
+        expected = np.array(TRANSITIONS['common_practice'][0]) / sum(TRANSITIONS['common_practice'][0])
+        np.testing.assert_allclose(frequencies, expected, atol=0.02)
+        # never a transition of weight 0
+        pairs = get_model().sample(2000, 32, rng=2)
+        weights = np.array(TRANSITIONS['common_practice'])
+        self.assertTrue((weights[pairs[:, :-1], pairs[:, 1:]] > 0).all())
+
+    def test_blues_stays_on_primary_chords(self):
+        codes = get_model('blues').sample(500, 12, rng=3)
+        self.assertEqual(set(np.unique(get_model('blues').decode(codes))), {1, 4, 5})
+
+    def test_invalid_models(self):
+        with self.assertRaises(ValueError):
+            get_model('bebop')
+        with self.assertRaises(ValueError):
+            ProgressionModel([[1, 0]])
+        with self.assertRaises(ValueError):
+            ProgressionModel([[1, -1], [1, 1]])
+        self.assertIs(get_model('blues'), get_model('blues'))
+
+    def test_restricted(self):
+        model = ProgressionModel([[0, 1, 0], [0, 0, 1], [1, 0, 0]], start=[1, 0, 0]).restricted([0, 1])
+        self.assertEqual(model.labels, (1, 2))
+        # the second chord only led to the third, so it continues uniformly
+        codes = model.sample(200, 3, rng=4)
+        self.assertTrue((codes[:, 0] == 0).all())
+        self.assertTrue((codes[:, 1] == 1).all())
+        self.assertEqual(set(codes[:, 2]), {0, 1})
+
+
+class TestScaleProgressions(unittest.TestCase):
+
+    def test_sample_progressions(self):
+        degrees = sample_progressions(MajorScale('G'), 100, 8, rng=5)
+        self.assertEqual(degrees.shape, (100, 8))
+        self.assertTrue(((degrees >= 1) & (degrees <= 7)).all())
+        chords = chord_names(MajorScale('G'), degrees)
+        self.assertTrue((chords[:, 0] == 'GMajor').all())
+        self.assertEqual(chord_names(NaturalMinorScale('A'), np.array([5]), seventh=True).tolist(), ['EMinor7'])
+
+    def test_pentatonic_uses_degrees_with_chords(self):
+        scale = PentatonicScale('Am')
+        self.assertEqual(scale_model(scale).labels, (1, 2))
+        degrees = sample_progressions(scale, 200, 8, rng=6)
+        self.assertEqual(set(np.unique(degrees)), {1, 2})
+        self.assertTrue(set(np.unique(chord_names(scale, degrees))) <= {'AMinor', 'CMajor'})
+
+    def test_restricted_model_does_not_get_stuck(self):
+        # blues keeps only I -> I among the chords of a minor pentatonic
+        np.testing.assert_array_equal(scale_model(PentatonicScale('Am'), 'blues').transitions, np.ones((2, 2)))
+        degrees = sample_progressions(PentatonicScale('Am'), 200, 6, 'blues', rng=7)
+        self.assertTrue((degrees[:, 0] == 1).all())
+        self.assertEqual(set(np.unique(degrees[:, 1:])), {1, 2})
+        # rows that still lead elsewhere are kept as they are
+        np.testing.assert_array_equal(scale_model(MajorScale('C'), 'blues').transitions, TRANSITIONS['blues'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+
+from .onset_detection import *
+
+
+def plucks(sr, onset_times, amplitudes, duration):
+    """A decaying tone for every onset, over low-level noise."""
+    rng = np.random.default_rng(2)
+    data = rng.normal(0, 1e-4, int(sr * duration))
+    t = np.arange(int(0.4 * sr)) / sr
+    for onset, amplitude in zip(onset_times, amplitudes):
+        start = int(onset * sr)
+        tone = amplitude * np.sin(2 * np.pi * 220 * t) * np.exp(-t * 20)
+        data[start:start + len(tone)] += tone[:len(data) - start]
+    return data
+
+
+class TestFrameSignal(unittest.TestCase):
+
+    def test_frames_are_strided_views(self):
+        data = np.arange(10)
+        frames = frame_signal(data, frame_length=4, hop_length=3)
+        np.testing.assert_array_equal(frames, [[0, 1, 2, 3], [3, 4, 5, 6], [6, 7, 8, 9]])
+        self.assertTrue(np.shares_memory(frames, data))
+
+    def test_short_signal(self):
+        self.assertEqual(frame_signal(np.zeros(3), frame_length=4, hop_length=2).shape, (0, 4))
+
+
+class TestDetectOnsets(unittest.TestCase):
+
+    def setUp(self):
+        self.sr = 22050
+        self.onset_times = np.array([0.5, 1.1, 1.7, 2.3, 2.9])
+        # one loud strum among quiet notes
+        self.data = plucks(self.sr, self.onset_times, [0.05, 1.0, 0.04, 0.05, 0.03], duration=3.5)
+
+    def test_finds_quiet_notes_next_to_loud_one(self):
+        for method in ('flux', 'energy'):
+            with self.subTest(method=method):
+                onsets = detect_onsets(self.data, method=method) / self.sr
+                self.assertEqual(len(onsets), len(self.onset_times))
+                np.testing.assert_allclose(onsets, self.onset_times, atol=0.025)
+
+    def test_blocks_match_whole_signal(self):
+        block_size, overlap = 10_000, 1_000
+        blocks = [(start, self.data[start:start + block_size])
+                  for start in range(0, len(self.data) - overlap, block_size - overlap)]
+        for method in ('flux', 'energy'):
+            with self.subTest(method=method):
+                np.testing.assert_allclose(novelty_curve_from_blocks(blocks, overlap, method),
+                                           novelty_curve(self.data, method), atol=1e-6)
+                np.testing.assert_array_equal(detect_onsets_in_blocks(blocks, overlap, method),
+                                              detect_onsets(self.data, method))
+
+    def test_novelty_is_decimated(self):
+        novelty = novelty_curve(self.data, hop_length=512)
+        self.assertEqual(len(novelty), len(self.data) // 512 + 1)
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            novelty_curve(self.data, method='phase')
+
+    def test_silence_has_no_onsets(self):
+        self.assertEqual(len(detect_onsets(np.zeros(self.sr))), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+import wave
+
+import numpy as np
+
+from .packed_bank import *
+from .sample_bank import SampleBank
+
+
+def write_wav(path, values, sample_rate, channels=1):
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes((np.asarray(values) * 32767).astype('<i2').tobytes())
+
+
+class TestPackedBank(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.base_dir = self.directory.name
+        self.bank_path = os.path.join(self.base_dir, 'samples.bank')
+        # 100 ms of silence, then 100 ms of tone, then silence again
+        tone = np.concatenate([np.zeros(4800), np.full(4800, 0.5), np.zeros(4800)])
+        write_wav(os.path.join(self.base_dir, 'a.wav'), tone, 48000)
+        write_wav(os.path.join(self.base_dir, 'b.wav'), np.repeat(np.full(2205, 0.25), 2), 22050, channels=2)
+        self.files = {'a': 'a.wav', 'b': 'b.wav', 'broken': 'missing.wav'}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_trim_silence(self):
+        data = np.concatenate([np.zeros(100), [0.5, 0.5], np.zeros(100)])
+        np.testing.assert_array_equal(trim_silence(data, 1000, pad_seconds=0.005), [0, 0, 0, 0, 0, 0.5, 0.5])
+        self.assertEqual(len(trim_silence(np.zeros(10), 1000)), 0)
+
+    def test_build_and_open(self):
+        failed = build_packed_bank(self.files, self.bank_path, base_dir=self.base_dir)
+        self.assertEqual(failed, {'broken': 'missing.wav'})
+        bank = PackedSampleBank(self.bank_path)
+        self.assertEqual(set(bank), {'a', 'b'})
+
+        a, b = bank['a'], bank['b']
+        self.assertIsInstance(a.audio_data, memoryview)
+        self.assertEqual((a.num_channels, a.bytes_per_sample, a.sample_rate), (1, 2, 48000))
+        # the silence is trimmed apart from the lead-in
+        self.assertEqual(len(a.audio_data) // 2, 4800 + int(TRIM_PAD_SECONDS * 48000))
+        # resampled from 22050 Hz stereo to 48000 Hz mono
+        pcm = np.frombuffer(b.audio_data, dtype='<i2') / 32767
+        self.assertAlmostEqual(len(pcm) / 48000, 0.1, delta=0.002)
+        self.assertAlmostEqual(float(np.median(pcm)), 0.25, places=3)
+        with self.assertRaises(KeyError):
+            bank['broken']
+
+    def test_load_samples_falls_back_when_stale(self):
+        files = {'a': 'a.wav', 'b': 'b.wav'}
+        self.assertIsInstance(load_samples(files, self.bank_path, self.base_dir), SampleBank)
+        build_packed_bank(files, self.bank_path, base_dir=self.base_dir)
+        self.assertIsInstance(load_samples(files, self.bank_path, self.base_dir), PackedSampleBank)
+        self.assertIsInstance(load_samples({'a': 'b.wav'}, self.bank_path, self.base_dir), SampleBank)
+
+        write_wav(os.path.join(self.base_dir, 'a.wav'), np.full(10, 0.5), 48000)
+        os.utime(os.path.join(self.base_dir, 'a.wav'), ns=(0, 0))
+        self.assertIsInstance(load_samples(files, self.bank_path, self.base_dir), SampleBank)
+
+    def test_not_a_bank(self):
+        with open(self.bank_path, 'wb') as f:
+            f.write(b'x' * 64)
+        with self.assertRaises(ValueError):
+            PackedSampleBank(self.bank_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
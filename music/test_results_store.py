@@ -0,0 +1,124 @@
+import datetime
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from .results_store import ResultsStore
+
+
+class TestResultsStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = ResultsStore(self.directory.name)
+        self.expected = np.arange(0, 3, 0.5)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def add(self, take_id, offset, day, **kwargs):
+        actual = self.expected + offset
+        self.store.append(take_id, self.expected, actual, datetime.datetime(2024, 1, day), bpm=120, **kwargs)
+
+    def test_beats_round_trip(self):
+        actual = self.expected + [0.01, -0.02, np.nan, 0.0, 0.03, 0.01]
+        self.store.append('take', self.expected, actual)
+        beats = self.store.beats('take')
+        np.testing.assert_array_equal(beats['beat_index'], np.arange(6))
+        np.testing.assert_array_equal(beats['expected'], self.expected)
+        np.testing.assert_array_equal(beats['actual'], actual)
+        np.testing.assert_allclose(beats['error'], actual - self.expected)
+        self.assertEqual(self.store.takes()[0]['beats'], 5)
+
+    def test_unknown_take(self):
+        with self.assertRaises(KeyError):
+            self.store.beats('missing')
+
+    def test_duplicate_take(self):
+        self.add('take', 0.01, 1)
+        with self.assertRaises(ValueError):
+            self.add('take', 0.02, 1)
+        self.add('take', 0.02, 1, replace=True)
+        np.testing.assert_allclose(self.store.beats('take')['error'], 0.02)
+        self.assertEqual(len(self.store.takes()), 1)
+
+    def test_mismatched_lengths(self):
+        with self.assertRaises(ValueError):
+            self.store.append('take', [0.0, 0.5], [0.0])
+
+    def test_query_by_date(self):
+        self.add('a', 0.01, 1)
+        self.add('b', 0.02, 8)
+        self.add('c', 0.03, 15)
+        result = self.store.query(since=datetime.datetime(2024, 1, 5), until=datetime.datetime(2024, 1, 15))
+        self.assertEqual(set(result['take_id']), {'b'})
+        np.testing.assert_allclose(result['error'], 0.02)
+        self.assertEqual([take['take_id'] for take in self.store.takes()], ['a', 'b', 'c'])
+
+    def test_trend(self):
+        self.add('a', 0.01, 1)
+        self.add('b', 0.03, 2)
+        self.add('c', -0.02, 20)
+        trend = self.store.trend('month')
+        self.assertEqual(len(trend), 1)
+        self.assertEqual(trend[0]['takes'], 3)
+        errors = np.concatenate([np.full(6, 0.01), np.full(6, 0.03), np.full(6, -0.02)])
+        self.assertAlmostEqual(trend[0]['mean_error'], errors.mean())
+        self.assertAlmostEqual(trend[0]['std_deviation'], errors.std())
+        self.assertEqual([row['takes'] for row in self.store.trend('day')], [1, 1, 1])
+
+    def test_vacuum_drops_replaced_rows(self):
+        self.add('a', 0.01, 1)
+        self.add('b', 0.02, 2)
+        self.add('a', 0.03, 1, replace=True)
+        self.assertEqual(self.store.vacuum(), 6)
+        self.assertEqual(self.store.vacuum(), 0)
+        self.assertEqual(os.path.getsize(self.store._column_path('error')), 12 * 8)
+        np.testing.assert_allclose(self.store.beats('a')['error'], 0.03)
+        np.testing.assert_allclose(self.store.beats('b')['error'], 0.02)
+        self.add('c', 0.04, 3)
+        self.assertEqual(list(self.store.query()['take_id']), ['a'] * 6 + ['b'] * 6 + ['c'] * 6)
+
+    def test_repeated_replacement_stays_bounded(self):
+        self.add('b', 0.02, 2)
+        for i in range(20):
+            self.add('a', i / 100, 1, replace=True)
+        self.assertLessEqual(os.path.getsize(self.store._column_path('error')), 4 * 6 * 8)
+        np.testing.assert_allclose(self.store.beats('a')['error'], 0.19)
+        np.testing.assert_allclose(self.store.beats('b')['error'], 0.02)
+
+    def test_persists_and_recovers_from_partial_append(self):
+        self.add('a', 0.01, 1)
+        path = self.store._column_path('error')
+        self.store.close()
+        # rows written by an append that crashed before updating the index
+        with open(path, 'ab') as f:
+            f.write(np.zeros(3).tobytes())
+        self.store = ResultsStore(self.directory.name)
+        self.add('b', 0.02, 2)
+        np.testing.assert_allclose(self.store.beats('b')['error'], 0.02)
+        self.assertEqual(len(self.store.query()['error']), 12)
+
+    def test_vacuum_interrupted_before_switching_keeps_old_rows(self):
+        self.add('a', 0.01, 1)
+        self.add('b', 0.02, 2)
+        self.add('a', 0.03, 1, replace=True)
+        # compacted columns written under the next generation, but the index never switched to them
+        for name in ('beat_index', 'expected', 'actual', 'error'):
+            with open(self.store._column_path(name, 1), 'wb') as f:
+                f.write(b'garbage')
+        self.store.close()
+        self.store = ResultsStore(self.directory.name)
+        self.assertFalse(os.path.exists(self.store._column_path('error', 1)))
+        np.testing.assert_allclose(self.store.beats('a')['error'], 0.03)
+        np.testing.assert_allclose(self.store.beats('b')['error'], 0.02)
+        self.assertEqual(self.store.vacuum(), 6)
+        np.testing.assert_allclose(self.store.beats('a')['error'], 0.03)
+        self.assertFalse(os.path.exists(self.store._column_path('error', 0)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+import wave
+
+from .sample_bank import *
+
+
+class TestSampleBank(unittest.TestCase):
+
+    def setUp(self):
+        self.bank = SampleBank({'C': 'audio/C.wav', 'CMajor': 'audio/CMajor.m4a.wav', 'CFlatDim': 'audio/CFlatDim.m4a.wav'})
+
+    def test_loads_samples_up_front(self):
+        self.assertEqual(set(self.bank), {'C', 'CMajor'})
+        self.assertEqual(len(self.bank), 2)
+        with wave.open(os.path.join(MUSIC_DIR, 'audio', 'C.wav'), 'rb') as wav:
+            expected = Sample(wav.readframes(wav.getnframes()), wav.getnchannels(), wav.getsampwidth(),
+                              wav.getframerate())
+        self.assertEqual(self.bank['C'], expected)
+        self.assertIsInstance(self.bank['C'].audio_data, bytes)
+
+    def test_missing_file(self):
+        self.assertEqual(self.bank.missing, {'CFlatDim': 'audio/CFlatDim.m4a.wav'})
+        with self.assertRaisesRegex(KeyError, 'CFlatDim.m4a.wav'):
+            self.bank['CFlatDim']
+        with self.assertRaises(KeyError):
+            self.bank['unknown']
+
+    def test_read_only(self):
+        with self.assertRaises(TypeError):
+            self.bank['C'] = self.bank['CMajor']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 from .scale import *
@@ -9,12 +10,12 @@ class TestScale(unittest.TestCase):
         scale = Scale('C')
         self.assertEqual(scale.root, 'C')
         self.assertFalse(scale.use_flats)
-        self.assertEqual(scale.notes, Scale.SHARP_NOTES)
+        self.assertEqual(scale.notes, tuple(Scale.SHARP_NOTES))
 
         scale = Scale('F', use_flats=True)
         self.assertEqual(scale.root, 'F')
         self.assertTrue(scale.use_flats)
-        self.assertEqual(scale.notes, Scale.FLAT_NOTES)
+        self.assertEqual(scale.notes, tuple(Scale.FLAT_NOTES))
 
     def test_invalid_initialization(self):
         with self.assertRaises(ValueError):
@@ -218,6 +219,74 @@ class TestScaleComparisons(unittest.TestCase):
         #                      {'E', 'F#', 'G', 'A', 'B', 'C', 'D', 'Eb', 'Ab', 'Bb'})
 
 
+class TestScaleMask(unittest.TestCase):
+
+    def test_mask(self):
+        self.assertEqual(MajorScale('C').mask, 0b101010110101)
+        self.assertEqual(MajorScale('Ab', use_flats=True).mask, MajorScale('G#').mask)
+        self.assertEqual(bin(PentatonicScale('Am').mask).count('1'), 5)
+
+    def test_spell(self):
+        self.assertEqual(Scale.spell(0b10000010), {'C#', 'G'})
+        self.assertEqual(Scale.spell(0b10000010, use_flats=True), {'Db', 'G'})
+
+    def test_mixed_spellings(self):
+        major_g = MajorScale('G')
+        phrygian_e = PhrygianScale('E', use_flats=True)
+        self.assertEqual(phrygian_e.union(major_g), {'E', 'F', 'Gb', 'G', 'A', 'B', 'C', 'D'})
+        self.assertEqual(major_g.union(phrygian_e), {'E', 'F', 'F#', 'G', 'A', 'B', 'C', 'D'})
+        self.assertEqual(major_g.intersection(MajorScale('D', use_flats=True)), {'G', 'A', 'B', 'D', 'E', 'F#'})
+        self.assertEqual(MajorScale('F#').what_do_i_have_that_you_do_not(MajorScale('Gb', use_flats=True)), set())
+
+
+class TestScaleInstances(unittest.TestCase):
+
+    def test_interned(self):
+        self.assertIs(MajorScale('C'), MajorScale('C'))
+        self.assertIsNot(MajorScale('C'), MajorScale('C', use_flats=True))
+        self.assertIsNot(MajorScale('C'), IonianScale('C'))
+        self.assertIs(PentatonicScale('Am'), PentatonicScale('Am'))
+        self.assertIsNot(PentatonicScale('Am'), PentatonicScale('A'))
+
+    def test_immutable(self):
+        scale = MajorScale('C')
+        with self.assertRaises(AttributeError):
+            scale.root = 'D'
+        with self.assertRaises(AttributeError):
+            scale.extra = 1
+        self.assertFalse(hasattr(scale, '__dict__'))
+        scale.build_scale().append('X')
+        self.assertEqual(scale.build_scale(), ['C', 'D', 'E', 'F', 'G', 'A', 'B'])
+        with self.assertRaises(AttributeError):
+            scale.notes.append('Z')
+        with self.assertRaises(TypeError):
+            scale.intervals[0] = 'Z'
+        self.assertEqual(len(Scale.SHARP_NOTES), 12)
+        self.assertEqual(Scale.INTERVALS_SHARP[0], '1')
+
+    def test_cached_lookups(self):
+        scale = MajorScale('G')
+        self.assertEqual(scale.scale_notes, ('G', 'A', 'B', 'C', 'D', 'E', 'F#'))
+        self.assertEqual(scale.scale_intervals, ('1', '2', '3', '4', '5', '6', '7'))
+        self.assertEqual(scale.note_for_interval['7'], 'F#')
+        self.assertEqual(scale.degree_of_note['G'], 1)
+        self.assertEqual(scale.degree_of_note['D'], 5)
+        self.assertEqual(PentatonicScale('Dm', use_flats=True).scale_intervals, ('1', 'b3', '4', '5', 'b7'))
+
+    def test_pickle_returns_the_shared_instance(self):
+        for scale in (LocrianScale('Bb', use_flats=True), PentatonicScale('F#m')):
+            self.assertIs(pickle.loads(pickle.dumps(scale)), scale)
+
+    def test_pentatonic_conversion_keeps_its_type(self):
+        self.assertIs(PentatonicScale('Am').to_flats(), PentatonicScale('Am', use_flats=True))
+        self.assertIs(PentatonicScale('Ebm', use_flats=True).to_sharps(), PentatonicScale('D#m'))
+
+    def test_conversion_of_roots_spelled_against_the_mode(self):
+        self.assertIs(MajorScale('Bb').to_flats(), MajorScale('Bb', use_flats=True))
+        self.assertIs(MajorScale('A#', use_flats=True).to_sharps(), MajorScale('A#'))
+        self.assertIs(PentatonicScale('Bbm').to_flats(), PentatonicScale('Bbm', use_flats=True))
+
+
 class TestScaleConversion(unittest.TestCase):
 
     def test_convert_to_flats(self):
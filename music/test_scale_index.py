@@ -0,0 +1,60 @@
+import unittest
+
+from .scale import MajorScale, NaturalMinorScale, PentatonicScale, all_scales
+from .scale_index import *
+
+
+def names(scales):
+    return {(scale.__class__.__name__, scale.root) for scale in scales}
+
+
+class TestScaleIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ScaleIndex()
+
+    def test_notes_mask(self):
+        self.assertEqual(notes_mask(['C', 'E', 'G']), 0b10010001)
+        self.assertEqual(notes_mask(['Db', 'C#', 13]), 0b10)
+        self.assertEqual(notes_mask(MajorScale('C').mask), MajorScale('C').mask)
+
+    def test_registry(self):
+        self.assertEqual(len(self.index), len(all_scales()))
+        self.assertEqual(len(self.index), 2 * 12 * 13)
+
+    def test_exact(self):
+        found = names(self.index.exact(MajorScale('C').build_scale()))
+        self.assertIn(('MajorScale', 'C'), found)
+        self.assertIn(('NaturalMinorScale', 'A'), found)
+        self.assertIn(('DorianScale', 'D'), found)
+        self.assertNotIn(('MajorScale', 'G'), found)
+
+    def test_containing(self):
+        found = self.index.scales_containing(['F#', 'C'])
+        self.assertTrue(all(scale.mask & notes_mask(['F#', 'C']) == notes_mask(['F#', 'C']) for scale in found))
+        self.assertIn(('LydianScale', 'C'), names(found))
+        self.assertNotIn(('MajorScale', 'C'), names(found))
+        self.assertIs(self.index.scales_containing(['C', 'F#']), found)
+        self.assertEqual(len(self.index.scales_containing([])), len(self.index))
+
+    def test_within(self):
+        found = names(self.index.scales_within(MajorScale('C').build_scale()))
+        self.assertIn(('PentatonicScale', 'C'), found)
+        self.assertIn(('MajorScale', 'C'), found)
+        self.assertNotIn(('HarmonicMinorScale', 'A'), found)
+
+    def test_best_fit(self):
+        melody = ['E', 'G#', 'B', 'E', 'C#', 'F#', 'E']
+        scale, score = self.index.best_fit(melody, limit=1)[0]
+        self.assertEqual(score, 1.0)
+        # the smallest scale covering the melody, on its first note
+        self.assertEqual((scale.__class__.__name__, scale.root), ('PentatonicScale', 'E'))
+        scores = [score for _, score in self.index.best_fit(melody + ['F'], limit=50)]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        # no scale has both F and F#
+        self.assertAlmostEqual(scores[0], 7 / 8)
+        self.assertEqual(self.index.best_fit([]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+import numpy as np
+
+from .scale import DorianScale, MajorScale, PentatonicScale, all_scales
+from .scale_matrix import *
+
+
+class TestScaleMatrix(unittest.TestCase):
+
+    def test_single_scale(self):
+        matrix, lengths = scale_matrix('D', 'Dorian')
+        self.assertEqual(matrix.shape, (WIDTH,))
+        self.assertEqual(list(spell(matrix)), DorianScale('D').build_scale())
+        self.assertEqual(lengths, 7)
+
+    def test_names_classes_and_codes(self):
+        by_name, _ = scale_matrix(['C', 'Eb', 'D#'], ['Major', MajorScale, TYPE_NAMES.index('Major')])
+        self.assertTrue((by_name[0] == MajorScale('C').scale_degrees).all())
+        self.assertTrue((by_name[1] == by_name[2]).all())
+        self.assertTrue((scale_matrix([0, 15], 'Major')[0] == by_name[[0, 2]]).all())
+        with self.assertRaises(ValueError):
+            scale_matrix('C', 'Bebop')
+
+    def test_pentatonic_padding(self):
+        matrix, lengths = scale_matrix('A', 'PentatonicMinor')
+        self.assertEqual(lengths, 5)
+        self.assertEqual(list(matrix[5:]), [PAD, PAD])
+        self.assertEqual(list(spell(matrix)), PentatonicScale('Am').build_scale() + ['', ''])
+
+    def test_all_keys_matches_scales(self):
+        matrix, lengths = all_keys()
+        self.assertEqual(matrix.shape, (12, len(TYPE_NAMES), WIDTH))
+        table = {(scale.__class__.__name__, scale.mask) for scale in all_scales()}
+        for names, row_lengths, row_masks in zip(spell(matrix, use_flats=True), lengths, masks(matrix)):
+            for type_name, notes, length, mask in zip(TYPE_NAMES, names, row_lengths, row_masks):
+                class_name = 'PentatonicScale' if type_name.startswith('Pentatonic') else type_name + 'Scale'
+                self.assertIn((class_name, mask), table)
+                self.assertEqual(list(notes[length:]), [''] * (WIDTH - length))
+        c_major = matrix[0, TYPE_NAMES.index('Major')]
+        self.assertEqual(list(spell(c_major)), MajorScale('C').build_scale())
+
+    def test_transpose(self):
+        matrix, _ = scale_matrix('C', ['Major', 'Pentatonic'])
+        up = transpose(matrix, [[2], [7]])
+        self.assertEqual(up.shape, (2, 2, WIDTH))
+        expected, _ = scale_matrix([['D'], ['G']], ['Major', 'Pentatonic'])
+        self.assertTrue((up == expected).all())
+        self.assertTrue((transpose(matrix, 12) == matrix).all())
+
+    def test_masks(self):
+        matrix, _ = scale_matrix(['G', 'F#'], [MajorScale, 'Pentatonic'])
+        self.assertEqual(list(masks(matrix)), [MajorScale('G').mask, PentatonicScale('F#').mask])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import tempfile
+import unittest
+import wave
+
+import numpy as np
+
+from .exercise_plan import ExercisePlan
+from .instrumentation import TimingRecorder
+from .sample_bank import Sample
+from .sequencer import *
+
+
+def pcm_sample(values, sample_rate=1000, channels=1):
+    data = (np.asarray(values, dtype=float) * 32767).astype('<i2')
+    return Sample(data.tobytes(), channels, 2, sample_rate)
+
+
+class TestSequencer(unittest.TestCase):
+
+    def setUp(self):
+        self.samples = {'click': pcm_sample([1.0, 0.5]), 'long': pcm_sample(np.full(250, 0.25))}
+        self.sequencer = Sequencer(self.samples, sample_rate=1000, gain=1.0)
+
+    def test_sample_to_float(self):
+        stereo = pcm_sample([0.5, -0.5, 0.25, 0.25], channels=2)
+        np.testing.assert_allclose(sample_to_float(stereo, 1000), [0, 0.25], atol=1e-4)
+        self.assertEqual(len(sample_to_float(pcm_sample(np.zeros(441), 44100), 48000)), 480)
+
+    def test_24_bit_sample_to_float(self):
+        values = np.array([0.5, -0.25, 0.0])
+        packed = (values * 2 ** 23).astype('<i4').view(np.uint8).reshape((-1, 4))[:, :3]
+        sample = Sample(packed.tobytes(), 1, 3, 1000)
+        np.testing.assert_allclose(sample_to_float(sample, 1000), values, atol=1e-6)
+
+    def test_preload_converts_every_sample(self):
+        self.sequencer.preload()
+        self.assertEqual(set(self.sequencer._buffers), {'click', 'long'})
+        buffer = self.sequencer._buffers['long']
+        self.sequencer.render([(0.0, 'long')])
+        self.assertIs(self.sequencer.buffer('long'), buffer)
+
+    def test_beat_events(self):
+        events = list(beat_events(['click', None, 'long'], bpm=120, start=1.0))
+        self.assertEqual(events, [(1.0, 'click'), (2.0, 'long')])
+
+    def test_events_start_on_exact_samples(self):
+        mix = self.sequencer.render(beat_events(['click'] * 4, bpm=600))
+        self.assertEqual(list(np.flatnonzero(mix > 0.9)), [0, 100, 200, 300])
+
+    def test_render_keeps_trailing_rests(self):
+        plan = ExercisePlan(['click', None, None], ['click', None, None], bpm=600)
+        self.assertEqual(len(self.sequencer.render(plan)), 300)
+        self.assertEqual(len(self.sequencer.render([(0.0, 'click')], duration=0.5)), 500)
+        self.assertEqual(len(self.sequencer.render([(0.0, 'long')], duration=0.1)), 250)
+        self.assertEqual(len(self.sequencer.render([])), 0)
+
+    def test_overlapping_samples_are_mixed(self):
+        mix = self.sequencer.render([(0.0, 'long'), (0.1, 'click')])
+        self.assertAlmostEqual(mix[50], 0.25, places=3)
+        self.assertAlmostEqual(mix[100], 1.25, places=3)
+        self.assertAlmostEqual(mix[101], 0.75, places=3)
+
+    def test_samples_carry_across_blocks(self):
+        blocks = list(self.sequencer.stream([(0.19, 'long')], block_size=100))
+        self.assertEqual(len(blocks), 5)
+        mix = np.concatenate(blocks)
+        np.testing.assert_allclose(mix[190:440], 0.25, atol=1e-4)
+        self.assertEqual(np.count_nonzero(mix), 250)
+
+    def test_infinite_events_are_read_lazily(self):
+        stream = self.sequencer.stream(beat_events(iter(lambda: 'click', None), bpm=600), block_size=250)
+        blocks = [next(stream) for _ in range(4)]
+        self.assertEqual(len(np.flatnonzero(np.concatenate(blocks) > 0.9)), 10)
+
+    def test_render_to_wav(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'exercise.wav')
+            self.sequencer.render_to_file(beat_events(['click', 'long'], bpm=600), path)
+            with wave.open(path, 'rb') as wav:
+                self.assertEqual((wav.getnchannels(), wav.getsampwidth(), wav.getframerate()), (1, 2, 1000))
+                pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2')
+        self.assertEqual(len(pcm), 350)
+        self.assertEqual(list(np.flatnonzero(pcm > 30000)), [0])
+        np.testing.assert_allclose(pcm[100:350] / 32767, 0.25, atol=1e-3)
+
+    def test_play_keeps_absolute_schedule(self):
+        calls = []
+
+        class PlayObject:
+            def wait_done(self):
+                pass
+
+        def play_buffer(audio_data, num_channels, bytes_per_sample, sample_rate):
+            calls.append((time.monotonic(), len(audio_data)))
+            return PlayObject()
+
+        self.sequencer.play(beat_events(['click'] * 5, bpm=600), play_buffer, block_size=100, latency=0)
+        starts = np.array([start for start, _ in calls])
+        np.testing.assert_allclose(starts - starts[0], np.arange(len(calls)) * 0.1, atol=0.02)
+        self.assertEqual({size for _, size in calls}, {200})
+
+    def test_play_starts_whole_samples_on_mixing_backends(self):
+        calls = []
+
+        class PlayObject:
+            def is_playing(self):
+                return False
+
+            def wait_done(self):
+                pass
+
+        class MixingBackend:
+            mixes_streams = True
+
+            def __call__(self, audio_data, num_channels, bytes_per_sample, sample_rate):
+                calls.append((time.monotonic(), audio_data))
+                return PlayObject()
+
+        recorder = TimingRecorder()
+        self.sequencer.play(beat_events(['long', 'click', 'long'], bpm=600), MixingBackend(), latency=0,
+                            recorder=recorder)
+        # each event gets its whole sample, however long, instead of a slice of a block
+        self.assertEqual([data for _, data in calls], [to_pcm16(self.sequencer.buffer(key))
+                                                       for key in ('long', 'click', 'long')])
+        starts = np.array([start for start, _ in calls])
+        np.testing.assert_allclose(starts - starts[0], [0, 0.1, 0.2], atol=0.02)
+        self.assertEqual(recorder.total, 3)
+        self.assertEqual(recorder.blocks, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from .synthesis import *
+from .test_sequencer import pcm_sample
+
+
+def dominant_frequency(data, sample_rate):
+    spectrum = np.abs(np.fft.rfft(data * np.hanning(len(data))))
+    return np.argmax(spectrum) * sample_rate / len(data)
+
+
+class TestSynthesis(unittest.TestCase):
+
+    def test_pitches(self):
+        self.assertAlmostEqual(float(midi_frequency(69)), 440.0)
+        self.assertEqual(chord_pitches('C', 'Major'), (60, 64, 67))
+        self.assertEqual(chord_pitches('Bb', 'Dominant7'), (70, 74, 77, 80))
+        self.assertEqual(key_pitches('F#'), (66,))
+        self.assertEqual(key_pitches('FSharpMinor7'), (66, 69, 73, 76))
+        self.assertEqual(key_pitches('DFlatDim'), (61, 64, 67))
+        with self.assertRaises(ValueError):
+            key_pitches('CPowerChord')
+        with self.assertRaises(ValueError):
+            chord_pitches('C', 'Minor9')
+
+    def test_methods_sound_at_the_right_pitch(self):
+        for method in METHODS:
+            with self.subTest(method=method):
+                data = render_pitches((69,), 1.0, 8000, method)
+                self.assertEqual(data.dtype, np.float32)
+                self.assertAlmostEqual(float(np.abs(data).max()), PEAK, places=5)
+                self.assertAlmostEqual(dominant_frequency(data, 8000), 440, delta=8)
+
+    def test_render_cache(self):
+        render_pitches.cache_clear()
+        first = render_pitches((60, 64, 67), 0.5, 8000)
+        self.assertIs(render_pitches((60, 64, 67), 0.5, 8000), first)
+        self.assertEqual(render_pitches.cache_info().hits, 1)
+        self.assertFalse(first.flags.writeable)
+        self.assertIsNot(render_pitches((60, 64, 67), 0.5, 16000), first)
+
+    def test_fallback(self):
+        recorded = pcm_sample([1.0])
+        samples = SynthesisFallback({'CMajor': recorded}, duration=0.5, sample_rate=8000)
+        self.assertIs(samples['CMajor'], recorded)
+        self.assertIn('GMajor7', samples)
+        self.assertNotIn('GPowerChord', samples)
+        self.assertNotIn(None, samples)
+        with self.assertLogs('music.synthesis', 'INFO') as logs:
+            synthesized = samples['GMajor7']
+        self.assertIn('GMajor7', logs.output[0])
+        self.assertEqual(samples.synthesized, ('GMajor7',))
+        self.assertEqual((synthesized.num_channels, synthesized.sample_rate), (1, 8000))
+        self.assertEqual(len(synthesized.audio_data), 2 * 4000)
+        self.assertIs(samples['GMajor7'], synthesized)
+        self.assertEqual(list(samples), ['CMajor'])
+        with self.assertRaises(KeyError):
+            samples['GPowerChord']
+
+
+if __name__ == '__main__':
+    unittest.main()
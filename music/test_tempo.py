@@ -0,0 +1,67 @@
+import unittest
+
+import numpy as np
+
+from .tempo import *
+
+FRAME_RATE = 22050 / 256
+
+
+def pulses(beat_times, duration):
+    """Onset-strength curve with a short decaying pulse at every beat."""
+    novelty = np.zeros(int(duration * FRAME_RATE))
+    for time in beat_times:
+        frame = int(round(time * FRAME_RATE))
+        novelty[frame:frame + 3] += [1.0, 0.5, 0.25][:len(novelty) - frame]
+    return novelty
+
+
+class TestTempo(unittest.TestCase):
+
+    def test_autocorrelation_matches_direct(self):
+        x = np.random.default_rng(0).normal(size=50)
+        expected = [np.dot(x[:len(x) - lag], x[lag:]) for lag in range(10)]
+        np.testing.assert_allclose(autocorrelation(x, 9), expected)
+
+    def test_estimate_tempo(self):
+        for bpm in (72, 100, 137):
+            with self.subTest(bpm=bpm):
+                novelty = pulses(np.arange(0.3, 30, 60 / bpm), 30)
+                self.assertAlmostEqual(estimate_tempo(novelty, FRAME_RATE), bpm, delta=1)
+
+    def test_too_short(self):
+        with self.assertRaises(ValueError):
+            estimate_tempo(np.zeros(10), FRAME_RATE)
+
+    def test_tempo_map_follows_change(self):
+        beats = np.concatenate((np.arange(0, 20, 0.6), np.arange(20, 40, 0.5)))
+        times, bpms = estimate_tempo_map(pulses(beats, 40), FRAME_RATE)
+        np.testing.assert_allclose(bpms[times < 15], 100, atol=1.5)
+        np.testing.assert_allclose(bpms[times > 25], 120, atol=1.5)
+
+    def test_beat_phase(self):
+        novelty = pulses(np.arange(0.37, 20, 0.6), 20)
+        self.assertAlmostEqual(estimate_beat_phase(novelty, FRAME_RATE, 100), 0.37, delta=1 / FRAME_RATE)
+
+    def test_beat_times_from_constant_map(self):
+        beat_times = beat_times_from_tempo_map([0, 10], [120, 120], 5, start=0.25)
+        np.testing.assert_allclose(beat_times, np.arange(0.25, 5, 0.5), atol=1e-3)
+
+    def test_beat_times_from_changing_map(self):
+        # 60 bpm, then 120 bpm after a sharp change
+        beat_times = beat_times_from_tempo_map([0, 4, 4.001, 10], [60, 60, 120, 120], 8)
+        np.testing.assert_allclose(beat_times[:5], [0, 1, 2, 3, 4], atol=1e-2)
+        np.testing.assert_allclose(np.diff(beat_times[5:]), 0.5, atol=1e-2)
+
+    def test_estimate_beat_times(self):
+        beats = np.arange(0.2, 30, 60 / 90)
+        novelty = pulses(beats, 30)
+        for tempo_map in (False, True):
+            with self.subTest(tempo_map=tempo_map):
+                beat_times, bpm = estimate_beat_times(novelty, FRAME_RATE, 30, tempo_map=tempo_map)
+                self.assertAlmostEqual(bpm, 90, delta=1)
+                np.testing.assert_allclose(beat_times[:len(beats)], beats, atol=0.03)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 
 from music.chord_progression import ChordProgression
-from music.scale import Scale, PentatonicScale, MajorScale, MinorScale
+from music.scale import Scale, PentatonicScale, MajorScale, NaturalMinorScale
 
 
 class TestScale(unittest.TestCase):
@@ -9,7 +9,7 @@ class TestScale(unittest.TestCase):
     def test_valid_scale_initialization(self):
         scale = Scale('C')
         self.assertEqual(scale.root, 'C')
-        self.assertEqual(scale.notes, Scale.SHARP_NOTES)
+        self.assertEqual(scale.notes, tuple(Scale.SHARP_NOTES))
 
     def test_invalid_scale_initialization(self):
         with self.assertRaises(ValueError):
@@ -18,14 +18,14 @@ class TestScale(unittest.TestCase):
     def test_scale_with_flats(self):
         scale = Scale('Bb', use_flats=True)
         self.assertEqual(scale.root, 'Bb')
-        self.assertEqual(scale.notes, Scale.FLAT_NOTES)
+        self.assertEqual(scale.notes, tuple(Scale.FLAT_NOTES))
 
     def test_major_scale_build(self):
         scale = MajorScale('C')
         self.assertEqual(scale.build_scale(), ['C', 'D', 'E', 'F', 'G', 'A', 'B'])
 
     def test_minor_scale_build(self):
-        scale = MinorScale('A')
+        scale = NaturalMinorScale('A')
         self.assertEqual(scale.build_scale(), ['A', 'B', 'C', 'D', 'E', 'F', 'G'])
 
     def test_pentatonic_major_scale_build(self):